@@ -0,0 +1,350 @@
+"""
+Análise das falhas de todas as repetições: por endpoint, assinatura do erro
+e instante, alinhadas com o User Count do stats_history.
+
+Classifica cada erro numa assinatura (conexão recusada, timeout, conexão
+encerrada, sem resposta, HTTP 5xx, HTTP 4xx, outro) e responde, por cenário,
+com que assinatura o colapso começa e com quantos usuários ativos.
+
+Fontes, todas lidas em streaming (csv.reader, uma linha por vez):
+- {cenario}_{n}_failures.csv       totais por endpoint e erro (Locust)
+- {cenario}_{n}_exceptions.csv     exceções do código do locustfile (Locust)
+- {cenario}_{n}_stats_history.csv  User Count e falhas acumuladas por segundo
+- {cenario}_{n}_falhas_tempo.csv   falhas por segundo, endpoint e assinatura
+                                   (gravado pelo locustfile desde esta versão)
+
+A memória é limitada pelo número de endpoints × assinaturas × baldes de
+tempo, não pelo número de linhas ou de repetições.
+
+Gera results/falhas_resumo.csv, results/falhas_inicio.csv e
+results/falhas_por_tempo.csv.
+
+Uso:
+    python analisar_falhas.py
+    python analisar_falhas.py --balde 10 --limiar-colapso 0.5
+    python analisar_falhas.py --verificar-classificacao
+"""
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+import time
+from statistics import median
+
+from cenarios import CENARIOS
+
+SUFIXO_TEMPO = "_falhas_tempo.csv"
+ASSINATURAS = ["conexao_recusada", "timeout", "conexao_encerrada", "sem_resposta", "http_5xx", "http_4xx", "outro"]
+
+_STATUS = re.compile(r"Status (\d{3}|0)\b|'(\d{3}) (?:Client|Server) Error")
+_PADROES = [
+    ("conexao_recusada", re.compile(r"refused|Errno 111|10061|NewConnectionError", re.I)),
+    ("timeout", re.compile(r"timed? ?out|Timeout", re.I)),
+    ("conexao_encerrada", re.compile(r"reset|RemoteDisconnected|BrokenPipe|aborted|closed", re.I)),
+]
+
+
+def classificar(erro):
+    """Assinatura de uma mensagem de erro do Locust (repr da exceção)."""
+    for assinatura, padrao in _PADROES:
+        if padrao.search(erro):
+            return assinatura
+    status = _STATUS.search(erro)
+    if status:
+        codigo = int(status.group(1) or status.group(2))
+        if codigo == 0:
+            return "sem_resposta"
+        if codigo >= 500:
+            return "http_5xx"
+        if codigo >= 400:
+            return "http_4xx"
+    return "outro"
+
+
+# ====================================================================
+# Registro por segundo durante a execução (usado pelo locustfile)
+# ====================================================================
+class FalhasPorSegundo:
+    """{segundo: {endpoint: {assinatura: ocorrências}}}; drenado a cada relatório nos workers."""
+
+    def __init__(self):
+        self.segundos = {}
+        self._assinaturas = {}   # cache de classificar() por mensagem
+
+    def registrar(self, nome, exception):
+        mensagem = repr(exception)
+        assinatura = self._assinaturas.get(mensagem)
+        if assinatura is None:
+            if len(self._assinaturas) > 1000:
+                self._assinaturas.clear()
+            assinatura = self._assinaturas[mensagem] = classificar(mensagem)
+        por_nome = self.segundos.setdefault(int(time.time()), {}).setdefault(nome, {})
+        por_nome[assinatura] = por_nome.get(assinatura, 0) + 1
+
+    def drenar(self):
+        segundos, self.segundos = self.segundos, {}
+        return segundos
+
+    def mesclar(self, segundos):
+        for segundo, por_nome in segundos.items():
+            destino = self.segundos.setdefault(int(segundo), {})
+            for nome, contagens in por_nome.items():
+                d = destino.setdefault(nome, {})
+                for assinatura, n in contagens.items():
+                    d[assinatura] = d.get(assinatura, 0) + n
+
+    def salvar(self, caminho):
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["Timestamp", "Name", "Assinatura", "Ocorrencias"])
+            for segundo in sorted(self.segundos):
+                for nome, contagens in sorted(self.segundos[segundo].items()):
+                    for assinatura, n in sorted(contagens.items()):
+                        escritor.writerow([segundo, nome, assinatura, n])
+
+
+def registrar(events, caminho_artefato):
+    """Grava {prefixo}_falhas_tempo.csv nas execuções com --csv."""
+    from locust.runners import WorkerRunner
+
+    falhas = FalhasPorSegundo()
+
+    @events.request.add_listener
+    def _ao_requisitar(name, exception, **kwargs):
+        if exception is not None:
+            falhas.registrar(name, exception)
+
+    @events.report_to_master.add_listener
+    def _enviar_ao_master(client_id, data, **kwargs):
+        data["falhas_tempo"] = falhas.drenar()
+
+    @events.worker_report.add_listener
+    def _receber_do_worker(client_id, data, **kwargs):
+        falhas.mesclar(data.get("falhas_tempo", {}))
+
+    @events.quitting.add_listener
+    def _salvar_falhas(environment, **kwargs):
+        caminho = caminho_artefato(environment, SUFIXO_TEMPO)
+        if caminho and not isinstance(environment.runner, WorkerRunner):
+            falhas.salvar(caminho)
+
+
+# ====================================================================
+# Análise das repetições
+# ====================================================================
+def _linhas(caminho):
+    """Dicionários das linhas de um CSV, um por vez."""
+    with open(caminho, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def _numero(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def ler_historico(caminho, limiar_colapso):
+    """
+    Percorre o stats_history (só as linhas Aggregated) e retorna
+    ({timestamp: user count}, início, primeira falha, início do colapso),
+    com os eventos como (segundos desde o início, usuários) ou None.
+    """
+    usuarios = {}
+    inicio = primeira = colapso = None
+    anterior_req = anterior_falhas = 0.0
+    for linha in _linhas(caminho):
+        if linha.get("Name") != "Aggregated":
+            continue
+        ts = int(_numero(linha["Timestamp"]))
+        n_usuarios = int(_numero(linha["User Count"]))
+        usuarios[ts] = n_usuarios
+        if inicio is None:
+            inicio = ts
+        req, falhas = _numero(linha["Total Request Count"]), _numero(linha["Total Failure Count"])
+        delta_req, delta_falhas = req - anterior_req, falhas - anterior_falhas
+        anterior_req, anterior_falhas = req, falhas
+        if delta_falhas > 0 and primeira is None:
+            primeira = (ts - inicio, n_usuarios)
+        if delta_req > 0 and delta_falhas / delta_req >= limiar_colapso and colapso is None:
+            colapso = (ts - inicio, n_usuarios)
+    return usuarios, inicio, primeira, colapso
+
+
+def analisar(pasta="results", balde_s=10, limiar_colapso=0.5):
+    resumo = {}     # (cenario, endpoint, assinatura) -> [ocorrências, execuções]
+    excecoes = {}   # (cenario, mensagem) -> ocorrências
+    inicio_falhas = []
+    por_tempo = {}  # (cenario, balde, assinatura) -> [ocorrências, soma de usuários, amostras]
+
+    for cenario in CENARIOS:
+        for arquivo in sorted(glob.glob(os.path.join(pasta, f"{cenario}_*_failures.csv"))):
+            for linha in _linhas(arquivo):
+                chave = (cenario, linha["Name"], classificar(linha["Error"]))
+                acumulado = resumo.setdefault(chave, [0, 0])
+                acumulado[0] += int(_numero(linha["Occurrences"]))
+                acumulado[1] += 1
+
+        for arquivo in sorted(glob.glob(os.path.join(pasta, f"{cenario}_*_exceptions.csv"))):
+            for linha in _linhas(arquivo):
+                chave = (cenario, linha["Message"][:200])
+                excecoes[chave] = excecoes.get(chave, 0) + int(_numero(linha["Count"]))
+
+        for historico in sorted(glob.glob(os.path.join(pasta, f"{cenario}_*_stats_history.csv"))):
+            prefixo = historico[:-len("_stats_history.csv")]
+            repeticao = prefixo.rsplit("_", 1)[1]
+            usuarios, inicio, primeira, colapso = ler_historico(historico, limiar_colapso)
+            registro = {
+                "Cenário": cenario.upper(), "Repetição": repeticao,
+                "Primeira Falha (s)": primeira[0] if primeira else "",
+                "Usuários na Primeira Falha": primeira[1] if primeira else "",
+                "Colapso (s)": colapso[0] if colapso else "",
+                "Usuários no Colapso": colapso[1] if colapso else "",
+                "Primeira Assinatura": "",
+            }
+
+            tempo = prefixo + SUFIXO_TEMPO
+            if os.path.exists(tempo) and inicio is not None:
+                primeiro_ts = None
+                for linha in _linhas(tempo):
+                    ts, assinatura = int(linha["Timestamp"]), linha["Assinatura"]
+                    n = int(linha["Ocorrencias"])
+                    if primeiro_ts is None or ts < primeiro_ts:
+                        primeiro_ts, registro["Primeira Assinatura"] = ts, assinatura
+                    balde = (ts - inicio) // balde_s * balde_s
+                    acumulado = por_tempo.setdefault((cenario, balde, assinatura), [0, 0, 0])
+                    acumulado[0] += n
+                    acumulado[1] += usuarios.get(ts, 0)
+                    acumulado[2] += 1
+            inicio_falhas.append(registro)
+
+    return resumo, excecoes, inicio_falhas, por_tempo
+
+
+def _salvar(caminho, linhas):
+    if not linhas:
+        return
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=list(linhas[0]))
+        escritor.writeheader()
+        escritor.writerows(linhas)
+    print(f"✓ Salvo em: {caminho}")
+
+
+def verificar_classificacao(timeout_s=1.0):
+    """
+    Roda as tarefas do locustfile (no PERFIL_CLIENTE atual) contra uma porta
+    fechada e contra uma porta que aceita a conexão e nunca responde, e
+    confere se cada falha cai em conexao_recusada e timeout. Retorna True se
+    todas caíram na assinatura esperada.
+    """
+    import functools
+    import socket
+
+    from locust.clients import HttpSession
+    from locust.env import Environment
+
+    import locustfile
+
+    fechada = socket.socket()
+    fechada.bind(("127.0.0.1", 0))          # sem listen: o kernel recusa
+    muda = socket.socket()
+    muda.bind(("127.0.0.1", 0))
+    muda.listen(64)                          # aceita pelo backlog e nunca lê
+    casos = [("conexao_recusada", fechada.getsockname()[1]), ("timeout", muda.getsockname()[1])]
+
+    classe = locustfile.PetClinicUser
+    classe.network_timeout = classe.connection_timeout = timeout_s   # perfil rapido
+    ok = True
+    try:
+        for esperada, porta in casos:
+            host = f"http://127.0.0.1:{porta}"
+            classe.host = host
+            env = Environment(user_classes=[classe], host=host)
+            usuario = classe(env)
+            if isinstance(usuario.client, HttpSession):  # perfil padrao: requests sem timeout próprio
+                usuario.client.request = functools.partial(usuario.client.request, timeout=timeout_s)
+            obtidas = []
+            env.events.request.add_listener(
+                lambda name, exception, **kwargs: exception is not None and obtidas.append((name, exception)))
+            usuario.get_owners_list()
+            usuario.buscar_owner(1)
+            usuario.get_vets()
+            usuario.criar_owner(12345)
+            for nome, excecao in obtidas:
+                assinatura = classificar(repr(excecao))
+                ok = ok and assinatura == esperada
+                print(f"{'✓' if assinatura == esperada else '✗'} {nome:<24} {assinatura:<18} (esperada: {esperada})")
+    finally:
+        fechada.close()
+        muda.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Falhas por endpoint, assinatura e instante, com o User Count.")
+    parser.add_argument("--pasta", default="results")
+    parser.add_argument("--balde", type=int, default=10, help="largura (s) dos baldes de tempo")
+    parser.add_argument("--limiar-colapso", type=float, default=0.5,
+                        help="fração de falhas em um segundo que marca o início do colapso")
+    parser.add_argument("--verificar-classificacao", action="store_true",
+                        help="confere a assinatura das falhas das tarefas contra uma porta fechada e uma que não responde")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("ANÁLISE DE FALHAS - LOCUST PETCLINIC")
+    print("=" * 60)
+
+    if args.verificar_classificacao:
+        return 0 if verificar_classificacao() else 1
+
+    resumo, excecoes, inicio_falhas, por_tempo = analisar(args.pasta, args.balde, args.limiar_colapso)
+
+    for cenario in CENARIOS:
+        linhas = sorted(((e, a, v) for (c, e, a), v in resumo.items() if c == cenario), key=lambda x: -x[2][0])
+        execucoes = [r for r in inicio_falhas if r["Cenário"] == cenario.upper()]
+        if not linhas and not execucoes:
+            continue
+        print(f"\n{'─'*60}")
+        print(f"CENÁRIO {cenario.upper()}")
+        print(f"{'─'*60}")
+        total = sum(v[0] for _, _, v in linhas)
+        print(f"Falhas: {total} em {len(execucoes)} execuções")
+        for endpoint, assinatura, (n, _) in linhas[:10]:
+            print(f"  {endpoint:<24} {assinatura:<18} {n:>9} ({n / total:.1%})")
+
+        primeiras = [r["Usuários na Primeira Falha"] for r in execucoes if r["Usuários na Primeira Falha"] != ""]
+        colapsos = [r["Usuários no Colapso"] for r in execucoes if r["Usuários no Colapso"] != ""]
+        if primeiras:
+            print(f"Primeira falha: mediana de {median(primeiras):.0f} usuários ({len(primeiras)} execuções)")
+        if colapsos:
+            print(f"Colapso (≥ {args.limiar_colapso:.0%} de falhas no segundo): mediana de "
+                  f"{median(colapsos):.0f} usuários ({len(colapsos)} execuções)")
+        assinaturas = [r["Primeira Assinatura"] for r in execucoes if r["Primeira Assinatura"]]
+        if assinaturas:
+            contagem = {a: assinaturas.count(a) for a in set(assinaturas)}
+            print("Assinatura da primeira falha: " +
+                  ", ".join(f"{a} ({n})" for a, n in sorted(contagem.items(), key=lambda x: -x[1])))
+
+        for (c, mensagem), n in sorted(excecoes.items(), key=lambda x: -x[1]):
+            if c == cenario:
+                print(f"  Exceção ({n}×): {mensagem.splitlines()[0][:100]}")
+
+    print()
+    _salvar(os.path.join(args.pasta, "falhas_resumo.csv"), [
+        {"Cenário": c.upper(), "Endpoint": e, "Assinatura": a, "Ocorrências": n, "Execuções": execucoes}
+        for (c, e, a), (n, execucoes) in sorted(resumo.items())
+    ])
+    _salvar(os.path.join(args.pasta, "falhas_inicio.csv"), inicio_falhas)
+    _salvar(os.path.join(args.pasta, "falhas_por_tempo.csv"), [
+        {"Cenário": c.upper(), "Início do Balde (s)": b, "Assinatura": a, "Ocorrências": n,
+         "Usuários Médios": round(soma / amostras, 1) if amostras else ""}
+        for (c, b, a), (n, soma, amostras) in sorted(por_tempo.items())
+    ])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Tamanho das respostas e métricas normalizadas pelo payload.
+
+A lista de owners cresce a cada POST do create_owner, então a latência de
+GET /owners (lista) depende também de quantas execuções vieram antes. Este
+módulo:
+
+- durante a execução (registrado pelo locustfile), grava por segundo e
+  endpoint o número de respostas, os bytes, a latência e, na lista, o
+  número de owners em {prefixo}_payload.csv;
+- na análise, reporta por cenário e endpoint a latência por KB (das
+  respostas com sucesso) e o throughput em bytes/s, o crescimento da lista
+  entre repetições e, com os *_payload.csv, a regressão latência × KB da
+  lista: a parte fixa (intercepto) indica custo de computação, a parte
+  proporcional ao tamanho indica serialização/transferência, e bytes/s
+  perto da banda informada (--banda-mbps) indicam limite de rede.
+
+Gera results/payload_resumo.csv e results/payload_crescimento.csv.
+
+Uso:
+    python analisar_payload.py
+    python analisar_payload.py --banda-mbps 1000
+"""
+import argparse
+import csv
+import glob
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from cenarios import CENARIOS
+
+SUFIXO = "_payload.csv"
+ENDPOINT_LISTA = "GET /owners (lista)"
+MARCADOR_OWNER = b'"firstName"'
+CAMPOS = ["respostas", "bytes", "soma_ms", "max_bytes", "owners", "amostras_owners"]
+
+
+# ====================================================================
+# Registro por segundo durante a execução (usado pelo locustfile)
+# ====================================================================
+class PayloadPorSegundo:
+    """{segundo: {endpoint: [respostas, bytes, soma_ms, max_bytes, owners, amostras_owners]}}."""
+
+    def __init__(self):
+        self.segundos = {}
+
+    def registrar(self, nome, tempo_ms, tamanho, owners=None):
+        por_nome = self.segundos.setdefault(int(time.time()), {})
+        c = por_nome.get(nome)
+        if c is None:
+            c = por_nome[nome] = [0, 0, 0.0, 0, 0, 0]
+        c[0] += 1
+        c[1] += tamanho
+        c[2] += tempo_ms
+        if tamanho > c[3]:
+            c[3] = tamanho
+        if owners is not None:
+            c[4] += owners
+            c[5] += 1
+
+    def drenar(self):
+        segundos, self.segundos = self.segundos, {}
+        return segundos
+
+    def mesclar(self, segundos):
+        for segundo, por_nome in segundos.items():
+            destino = self.segundos.setdefault(int(segundo), {})
+            for nome, origem in por_nome.items():
+                c = destino.setdefault(nome, [0, 0, 0.0, 0, 0, 0])
+                for i, v in enumerate(origem):
+                    c[i] = max(c[i], v) if i == 3 else c[i] + v
+
+    def salvar(self, caminho):
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["Timestamp", "Name"] + CAMPOS)
+            for segundo in sorted(self.segundos):
+                for nome, c in sorted(self.segundos[segundo].items()):
+                    escritor.writerow([segundo, nome, c[0], c[1], round(c[2], 3), c[3], c[4], c[5]])
+
+
+def registrar(events, caminho_artefato):
+    """
+    Grava {prefixo}_payload.csv nas execuções com --csv (só respostas com
+    sucesso). Sem --csv o listener de requisições nem é registrado: contar
+    os owners percorre o corpo inteiro de cada resposta da lista.
+    """
+    from locust.runners import WorkerRunner
+
+    payload = PayloadPorSegundo()
+
+    @events.init.add_listener
+    def _iniciar_payload(environment, **kwargs):
+        # Os workers do --processes não recebem o --csv, mas enviam ao master que grava
+        if isinstance(environment.runner, WorkerRunner) or caminho_artefato(environment, SUFIXO):
+            events.request.add_listener(_ao_requisitar)
+
+    def _ao_requisitar(name, response_time, response_length, exception, response=None, **kwargs):
+        if exception is not None:
+            return
+        owners = None
+        if name == ENDPOINT_LISTA and response is not None:
+            owners = (response.content or b"").count(MARCADOR_OWNER)
+        payload.registrar(name, response_time, response_length or 0, owners)
+
+    @events.report_to_master.add_listener
+    def _enviar_ao_master(client_id, data, **kwargs):
+        data["payload"] = payload.drenar()
+
+    @events.worker_report.add_listener
+    def _receber_do_worker(client_id, data, **kwargs):
+        payload.mesclar(data.get("payload", {}))
+
+    @events.quitting.add_listener
+    def _salvar_payload(environment, **kwargs):
+        caminho = caminho_artefato(environment, SUFIXO)
+        if caminho and not isinstance(environment.runner, WorkerRunner):
+            payload.salvar(caminho)
+
+
+# ====================================================================
+# Análise das repetições
+# ====================================================================
+def _repeticao(arquivo):
+    encontrado = re.search(r"_(\d+)_stats\.csv$", arquivo)
+    return int(encontrado.group(1)) if encontrado else 0
+
+
+def sucesso_por_endpoint(arquivo):
+    """{endpoint: (respostas, bytes, soma_ms)} de um *_payload.csv, com 'Aggregated'; {} se não existe."""
+    totais = {}
+    if not os.path.exists(arquivo):
+        return totais
+    with open(arquivo, newline="", encoding="utf-8") as f:
+        for linha in csv.DictReader(f):
+            for nome in (linha["Name"], "Aggregated"):
+                respostas, tamanho, soma_ms = totais.get(nome, (0, 0, 0.0))
+                totais[nome] = (respostas + int(linha["respostas"]), tamanho + int(linha["bytes"]),
+                                soma_ms + float(linha["soma_ms"]))
+    return totais
+
+
+def resumo_stats(pasta="results", excluir=()):
+    """
+    Por cenário e endpoint: bytes médios, latência, ms/KB e bytes/s (médias
+    entre repetições), sem os stats.csv em `excluir`. O ms/KB vem só das respostas com sucesso do
+    *_payload.csv da execução (o Average Content Size do stats.csv inclui as
+    falhas, com corpos pequenos); sem ele, do stats.csv.
+    """
+    from ingestao_resultados import carregar_stats
+
+    excluidos = {os.path.basename(a) for a in excluir}
+    arquivos = {c: [a for a in glob.glob(os.path.join(pasta, f"{c}_*_stats.csv"))
+                    if os.path.basename(a) not in excluidos]
+                for c in CENARIOS}
+    dados, _, _ = carregar_stats([a for lista in arquivos.values() for a in lista])
+
+    linhas, crescimento = [], []
+    for cenario, lista in arquivos.items():
+        por_endpoint = {}
+        for arquivo in sorted(lista, key=_repeticao):
+            stats = dados.get(arquivo)
+            if not stats:
+                continue
+            sucesso = sucesso_por_endpoint(arquivo[:-len('_stats.csv')] + SUFIXO)
+            for (metodo, nome), linha in list(stats['endpoints'].items()) + [(('', 'Aggregated'), stats['agregado'])]:
+                if not linha or not linha['Request Count']:
+                    continue
+                bytes_medio = linha['Average Content Size']
+                respostas, tamanho, soma_ms = sucesso.get(nome, (0, 0, 0.0))
+                if respostas and tamanho:
+                    ms_por_kb = (soma_ms / respostas) / (tamanho / respostas / 1024)
+                elif sucesso:
+                    ms_por_kb = np.nan  # nenhuma resposta com sucesso no endpoint
+                else:
+                    ms_por_kb = linha['Average Response Time'] / (bytes_medio / 1024) if bytes_medio else np.nan
+                por_endpoint.setdefault((metodo, nome), []).append({
+                    'bytes': bytes_medio,
+                    'ms': linha['Average Response Time'],
+                    'ms_por_kb': ms_por_kb,
+                    'bytes_por_s': linha['Requests/s'] * bytes_medio,
+                })
+                if nome == ENDPOINT_LISTA:
+                    crescimento.append({'Cenário': cenario.upper(), 'Repetição': _repeticao(arquivo),
+                                        'Bytes Médios da Lista': round(bytes_medio),
+                                        'Tempo Médio (ms)': round(linha['Average Response Time'], 2)})
+
+        for (metodo, nome), execucoes in sorted(por_endpoint.items(),
+                                                key=lambda x: (x[0][1] == 'Aggregated', x[0][1], x[0][0])):
+            df = pd.DataFrame(execucoes)
+            linhas.append({
+                'Cenário': cenario.upper(),
+                'Método': metodo,
+                'Endpoint': nome,
+                'Execuções': len(df),
+                'Bytes Médios': df['bytes'].mean(),
+                'Tempo Médio (ms)': df['ms'].mean(),
+                'ms por KB': df['ms_por_kb'].mean(),
+                'KB/s': df['bytes_por_s'].mean() / 1024,
+                'Mbit/s': df['bytes_por_s'].mean() * 8 / 1e6,
+            })
+    return linhas, crescimento
+
+
+def regressao_lista(pasta="results"):
+    """
+    Ajuste tempo médio (ms) = a + b × KB da lista, por cenário, com os segundos
+    de todos os *_payload.csv. Retorna {cenario: (a, b, KB médio, pontos, owners médios)}.
+    """
+    resultado = {}
+    for cenario in CENARIOS:
+        kb, ms, owners = [], [], []
+        for arquivo in glob.glob(os.path.join(pasta, f"{cenario}_*{SUFIXO}")):
+            with open(arquivo, newline="", encoding="utf-8") as f:
+                for linha in csv.DictReader(f):
+                    if linha["Name"] != ENDPOINT_LISTA or not int(linha["respostas"]):
+                        continue
+                    n = int(linha["respostas"])
+                    kb.append(int(linha["bytes"]) / n / 1024)
+                    ms.append(float(linha["soma_ms"]) / n)
+                    if int(linha["amostras_owners"]):
+                        owners.append(int(linha["owners"]) / int(linha["amostras_owners"]))
+        if len(kb) >= 3 and np.ptp(kb) > 0:
+            b, a = np.polyfit(kb, ms, 1)
+            resultado[cenario] = (a, b, float(np.mean(kb)), len(kb), float(np.mean(owners)) if owners else np.nan)
+    return resultado
+
+
+def _salvar(caminho, linhas):
+    if linhas:
+        pd.DataFrame(linhas).to_csv(caminho, index=False)
+        print(f"✓ Salvo em: {caminho}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência por KB e throughput em bytes/s por cenário.")
+    parser.add_argument("--pasta", default="results")
+    parser.add_argument("--banda-mbps", type=float, help="banda do enlace até o gateway, para indicar limite de rede")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PAYLOAD DAS RESPOSTAS - LOCUST PETCLINIC")
+    print("=" * 60)
+
+    linhas, crescimento = resumo_stats(args.pasta)
+    regressoes = regressao_lista(args.pasta)
+
+    for cenario in CENARIOS:
+        do_cenario = [l for l in linhas if l['Cenário'] == cenario.upper()]
+        if not do_cenario:
+            continue
+        print(f"\n{'─'*60}")
+        print(f"CENÁRIO {cenario.upper()}")
+        print(f"{'─'*60}")
+        print(f"{'Endpoint':<24} {'KB médio':>9} {'ms médio':>9} {'ms/KB':>8} {'KB/s':>9} {'Mbit/s':>8}")
+        for l in do_cenario:
+            print(f"{l['Endpoint']:<24} {l['Bytes Médios'] / 1024:>9.1f} {l['Tempo Médio (ms)']:>9.1f} "
+                  f"{l['ms por KB']:>8.2f} {l['KB/s']:>9.1f} {l['Mbit/s']:>8.2f}")
+
+        lista = [c for c in crescimento if c['Cenário'] == cenario.upper()]
+        if len(lista) >= 3:
+            reps = [c['Repetição'] for c in lista]
+            kb = [c['Bytes Médios da Lista'] / 1024 for c in lista]
+            ms = [c['Tempo Médio (ms)'] for c in lista]
+            inclinacao = np.polyfit(reps, kb, 1)[0]
+            correlacao = np.corrcoef(kb, ms)[0, 1] if np.ptp(kb) > 0 and np.ptp(ms) > 0 else np.nan
+            print(f"Lista entre repetições: {kb[0]:.1f} → {kb[-1]:.1f} KB ({inclinacao:+.2f} KB/repetição), "
+                  f"correlação tamanho × latência {correlacao:+.2f}")
+
+        if cenario in regressoes:
+            a, b, kb_medio, pontos, owners = regressoes[cenario]
+            # Inclinação negativa = latência não cresce com o tamanho (ruído ou outro gargalo)
+            proporcional = max(b, 0.0) * kb_medio
+            parcela = proporcional / (max(a, 0.0) + proporcional) if max(a, 0.0) + proporcional > 0 else 0.0
+            print(f"Lista (por segundo, {pontos} pontos): {a:.1f} ms fixos + {b:.3f} ms/KB "
+                  f"(≈{owners:.0f} owners, {kb_medio:.1f} KB) → {parcela:.0%} da latência proporcional ao tamanho")
+            agregado = next((l for l in do_cenario if l['Endpoint'] == 'Aggregated'), None)
+            if args.banda_mbps and agregado and agregado['Mbit/s'] >= 0.8 * args.banda_mbps:
+                indicacao = "rede (bytes/s perto da banda)"
+            elif parcela >= 0.5:
+                indicacao = "serialização/transferência (latência cresce com o tamanho)"
+            else:
+                indicacao = "computação/overhead fixo por requisição"
+            print(f"Indicação: limitado por {indicacao}")
+
+    print()
+    _salvar(os.path.join(args.pasta, "payload_resumo.csv"), linhas)
+    _salvar(os.path.join(args.pasta, "payload_crescimento.csv"), crescimento)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Compara o custo de CPU do gerador por requisição entre os perfis de cliente
+HTTP do locustfile (PERFIL_CLIENTE=padrao / rapido).
+
+Sobe o stub_petclinic.py num processo separado (para a CPU do servidor não
+entrar na conta) e, para cada perfil, roda o PetClinicUser sem tempo de
+espera num subprocesso próprio, medindo o tempo de CPU do processo do Locust.
+
+Uso:
+    python benchmark_clientes.py
+    python benchmark_clientes.py --usuarios 20 --duracao 20 --owners 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+PORTA_STUB = 8089
+
+
+def iniciar_stub(porta, owners):
+    """Sobe o stub e espera ele responder."""
+    processo = subprocess.Popen(
+        [sys.executable, 'stub_petclinic.py', '--porta', str(porta), '--owners', str(owners)],
+        # Clientes que fecham a conexão no meio da resposta geram tracebacks
+        # no stderr do stub que só poluiriam a saída do benchmark
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    limite = time.monotonic() + 15
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{porta}/api/vet/vets", timeout=1).read()
+            return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.terminate()
+    raise RuntimeError("stub do PetClinic não respondeu")
+
+
+def medir_perfil(host, usuarios, duracao):
+    """
+    Executado no subprocesso: o perfil já está em PERFIL_CLIENTE, então o
+    locustfile importado usa a classe base correspondente.
+    """
+    import gevent
+    from locust import constant
+    from locust.env import Environment
+
+    import locustfile
+
+    locustfile.PetClinicUser.wait_time = constant(0)
+    env = Environment(user_classes=[locustfile.PetClinicUser], host=host)
+    runner = env.create_local_runner()
+
+    runner.start(usuarios, spawn_rate=usuarios)
+    gevent.sleep(2)  # aquecimento: seed do pool e conexões abertas
+    env.stats.reset_all()
+    cpu_inicio, t_inicio = time.process_time(), time.monotonic()
+    gevent.sleep(duracao)
+    cpu, decorrido = time.process_time() - cpu_inicio, time.monotonic() - t_inicio
+    requisicoes = env.stats.total.num_requests
+    falhas = env.stats.total.num_failures
+    runner.quit()
+    locustfile.encerrar_logger()
+
+    return {
+        'requisicoes': requisicoes,
+        'falhas': falhas,
+        'req_por_segundo': requisicoes / decorrido,
+        'cpu_ms_por_req': cpu * 1000 / requisicoes if requisicoes else float('nan'),
+        'utilizacao_cpu': cpu / decorrido,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU do gerador por requisição em cada perfil de cliente.")
+    parser.add_argument('--perfis', nargs='+', default=['padrao', 'rapido'])
+    parser.add_argument('--usuarios', type=int, default=10)
+    parser.add_argument('--duracao', type=float, default=10, help="segundos medidos por perfil")
+    parser.add_argument('--owners', type=int, default=500, help="tamanho da lista servida pelo stub")
+    parser.add_argument('--porta', type=int, default=PORTA_STUB)
+    parser.add_argument('--medir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    host = f"http://127.0.0.1:{args.porta}"
+
+    if args.medir:
+        # Modo interno: uma medição, resultado em JSON na última linha
+        print(json.dumps(medir_perfil(host, args.usuarios, args.duracao)))
+        return
+
+    print("=" * 60)
+    print("BENCHMARK DOS PERFIS DE CLIENTE HTTP")
+    print("=" * 60)
+    print(f"Stub com {args.owners} owners, {args.usuarios} usuários sem espera, {args.duracao:.0f} s por perfil")
+
+    stub = iniciar_stub(args.porta, args.owners)
+    resultados = {}
+    try:
+        for perfil in args.perfis:
+            print(f"\n▶ Medindo perfil {perfil}...")
+            ambiente = dict(os.environ, PERFIL_CLIENTE=perfil)
+            saida = subprocess.run(
+                [sys.executable, __file__, '--medir', perfil, '--usuarios', str(args.usuarios),
+                 '--duracao', str(args.duracao), '--porta', str(args.porta)],
+                env=ambiente, capture_output=True, text=True,
+            )
+            if saida.returncode != 0:
+                print(f"✗ Falha ao medir {perfil}:\n{saida.stderr[-2000:]}")
+                continue
+            resultados[perfil] = json.loads(saida.stdout.strip().splitlines()[-1])
+    finally:
+        stub.terminate()
+
+    print(f"\n{'Perfil':<10} {'Req':>8} {'Falhas':>7} {'Req/s':>9} {'CPU ms/req':>11} {'Req/s por núcleo':>17}")
+    for perfil, r in resultados.items():
+        por_nucleo = 1000 / r['cpu_ms_por_req'] if r['cpu_ms_por_req'] else float('nan')
+        print(f"{perfil:<10} {r['requisicoes']:>8} {r['falhas']:>7} {r['req_por_segundo']:>9.1f} "
+              f"{r['cpu_ms_por_req']:>11.3f} {por_nucleo:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
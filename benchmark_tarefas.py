@@ -0,0 +1,182 @@
+"""
+Custo de cada tarefa do PetClinicUser no gerador, sem precisar do sistema real.
+
+Sobe o stub_petclinic.py num processo separado (a CPU do servidor fica fora
+da conta) e chama cada tarefa diretamente, em sequência, num único usuário
+do locustfile. Para cada tamanho de lista de owners (--owners) mede:
+
+- CPU ms por chamada e req/s máximas por núcleo (1000 / CPU ms por requisição)
+- memória: pico transitório por chamada (tracemalloc) e quanto fica retido
+  (ex.: IDs acrescentados ao pool)
+- perfil do mix ponderado pelos pesos das tarefas (cProfile), com as funções
+  de maior tempo próprio: logging, json, random e o cliente HTTP aparecem
+  separados
+
+create_owner roda por último porque faz a lista crescer. O perfil do cliente
+e o logging seguem as variáveis do locustfile (PERFIL_CLIENTE, LOG_NIVEL,
+LOG_AMOSTRA_SUCESSO...), então basta rodar de novo com outro valor para
+comparar.
+
+Uso:
+    python benchmark_tarefas.py
+    python benchmark_tarefas.py --owners 500 5000 --iteracoes 300
+    PERFIL_CLIENTE=rapido python benchmark_tarefas.py --top 25
+"""
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import random
+import time
+import tracemalloc
+
+from benchmark_clientes import PORTA_STUB, iniciar_stub
+
+ORDEM_TAREFAS = ['get_owners_list', 'get_owner_by_id', 'get_vets', 'create_owner']
+
+
+def criar_usuario(host):
+    """Um PetClinicUser fora do runner, com o pool de IDs já semeado."""
+    from locust.env import Environment
+
+    import locustfile
+
+    env = Environment(user_classes=[locustfile.PetClinicUser], host=host)
+    env.create_local_runner()  # só para registrar as estatísticas; nenhum usuário é disparado
+    locustfile.PetClinicUser.host = host
+    locustfile.POOL_OWNERS.ids = type(locustfile.POOL_OWNERS.ids)("q")
+    locustfile.POOL_OWNERS.semeado = False
+    usuario = locustfile.PetClinicUser(env)
+    usuario.on_start()
+    return env, usuario
+
+
+def tarefas(usuario):
+    """{nome: (chamável, peso)} na ordem de ORDEM_TAREFAS."""
+    pesos = {}
+    for funcao in type(usuario).tasks:
+        pesos[funcao.__name__] = pesos.get(funcao.__name__, 0) + 1
+    return {nome: (getattr(usuario, nome), pesos[nome]) for nome in ORDEM_TAREFAS if nome in pesos}
+
+
+def medir_tarefa(env, tarefa, iteracoes, aquecimento=20):
+    """CPU, tempo de parede, requisições e memória de `iteracoes` chamadas."""
+    for _ in range(aquecimento):
+        tarefa()
+
+    requisicoes = env.stats.total.num_requests
+    cpu, parede = time.process_time(), time.perf_counter()
+    for _ in range(iteracoes):
+        tarefa()
+    cpu, parede = time.process_time() - cpu, time.perf_counter() - parede
+    requisicoes = env.stats.total.num_requests - requisicoes
+
+    # Segunda passada com tracemalloc (que deixa as chamadas bem mais lentas)
+    amostras = max(1, iteracoes // 10)
+    picos = []
+    tracemalloc.start()
+    retido = tracemalloc.get_traced_memory()[0]
+    for _ in range(amostras):
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        tarefa()
+        picos.append(tracemalloc.get_traced_memory()[1] - antes)
+    retido = tracemalloc.get_traced_memory()[0] - retido
+    tracemalloc.stop()
+
+    return {
+        'cpu_ms_por_chamada': cpu * 1000 / iteracoes,
+        'ms_por_chamada': parede * 1000 / iteracoes,
+        'req_por_chamada': requisicoes / iteracoes,
+        'cpu_ms_por_req': cpu * 1000 / requisicoes if requisicoes else float('nan'),
+        'kb_pico': sum(picos) / len(picos) / 1024,
+        'kb_retido': retido / amostras / 1024,
+    }
+
+
+def perfilar_mix(env, chamaveis, iteracoes, semente=1):
+    """cProfile de `iteracoes` tarefas sorteadas pelos pesos. Retorna (perfil, CPU ms por requisição)."""
+    sorteio = random.Random(semente)
+    nomes = list(chamaveis)
+    pesos = [chamaveis[n][1] for n in nomes]
+    sequencia = sorteio.choices(nomes, weights=pesos, k=iteracoes)
+
+    requisicoes = env.stats.total.num_requests
+    perfil = cProfile.Profile()
+    cpu = time.process_time()
+    perfil.enable()
+    for nome in sequencia:
+        chamaveis[nome][0]()
+    perfil.disable()
+    cpu = time.process_time() - cpu
+    requisicoes = env.stats.total.num_requests - requisicoes
+    return perfil, cpu * 1000 / requisicoes if requisicoes else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU, memória e req/s por núcleo de cada tarefa do locustfile.")
+    parser.add_argument('--owners', type=int, nargs='+', default=[500, 5000], help="tamanhos da lista servida pelo stub")
+    parser.add_argument('--iteracoes', type=int, default=200, help="chamadas medidas por tarefa")
+    parser.add_argument('--iteracoes-mix', type=int, default=1000, help="tarefas sorteadas no perfil do mix")
+    parser.add_argument('--top', type=int, default=15, help="funções listadas no perfil")
+    parser.add_argument('--porta', type=int, default=PORTA_STUB)
+    parser.add_argument('--saida', default='results', help="pasta dos .prof e do resumo")
+    args = parser.parse_args()
+
+    import locustfile
+
+    host = f"http://127.0.0.1:{args.porta}"
+    os.makedirs(args.saida, exist_ok=True)
+
+    print("=" * 60)
+    print("BENCHMARK DAS TAREFAS DO LOCUSTFILE")
+    print("=" * 60)
+    print(f"Perfil de cliente {locustfile.PERFIL_CLIENTE}, {args.iteracoes} chamadas por tarefa")
+
+    linhas = []
+    for owners in args.owners:
+        print(f"\n{'─'*60}")
+        print(f"STUB COM {owners} OWNERS")
+        print(f"{'─'*60}")
+        stub = iniciar_stub(args.porta, owners)
+        try:
+            env, usuario = criar_usuario(host)
+            chamaveis = tarefas(usuario)
+
+            medidas = {nome: medir_tarefa(env, tarefa, args.iteracoes) for nome, (tarefa, _) in chamaveis.items()}
+            perfil, cpu_ms_mix = perfilar_mix(env, chamaveis, args.iteracoes_mix)
+
+            # Tabela depois das medições, para não se misturar com o log do locustfile
+            print(f"\n{'Tarefa':<18} {'Peso':>4} {'CPU ms':>8} {'ms':>8} {'Req/s/núcleo':>13} "
+                  f"{'KB pico':>9} {'KB retido':>10}")
+            for nome, r in medidas.items():
+                peso = chamaveis[nome][1]
+                por_nucleo = 1000 / r['cpu_ms_por_req'] if r['cpu_ms_por_req'] else float('nan')
+                print(f"{nome:<18} {peso:>4} {r['cpu_ms_por_chamada']:>8.3f} {r['ms_por_chamada']:>8.3f} "
+                      f"{por_nucleo:>13.0f} {r['kb_pico']:>9.1f} {r['kb_retido']:>10.2f}")
+                linhas.append(dict(r, owners=owners, tarefa=nome, peso=peso, req_por_s_nucleo=por_nucleo))
+            print(f"Mix ponderado: {cpu_ms_mix:.3f} CPU ms/req → {1000 / cpu_ms_mix:.0f} req/s por núcleo "
+                  f"(com o custo do cProfile)")
+            arquivo_perfil = os.path.join(args.saida, f"perfil_tarefas_{locustfile.PERFIL_CLIENTE}_{owners}.prof")
+            perfil.dump_stats(arquivo_perfil)
+
+            texto = io.StringIO()
+            pstats.Stats(perfil, stream=texto).sort_stats('tottime').print_stats(args.top)
+            print(texto.getvalue().split("\n\n", 1)[-1].rstrip())
+            print(f"✓ Perfil salvo em: {arquivo_perfil} (abrir com python -m pstats ou snakeviz)")
+        finally:
+            stub.terminate()
+            stub.wait()
+
+    locustfile.encerrar_logger()
+
+    if linhas:
+        import pandas as pd
+        arquivo_saida = os.path.join(args.saida, f"benchmark_tarefas_{locustfile.PERFIL_CLIENTE}.csv")
+        pd.DataFrame(linhas).to_csv(arquivo_saida, index=False)
+        print(f"\n✓ Resumo salvo em: {arquivo_saida}")
+
+
+if __name__ == "__main__":
+    main()
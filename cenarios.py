@@ -0,0 +1,6 @@
+# Parâmetros dos cenários de teste (mesmos valores da tabela do README e dos .bat)
+CENARIOS = {
+    'leve': {'usuarios': 50, 'spawn_rate': 5, 'duracao': '10m', 'aquecimento_s': 60},
+    'moderado': {'usuarios': 100, 'spawn_rate': 10, 'duracao': '10m', 'aquecimento_s': 60},
+    'pico': {'usuarios': 200, 'spawn_rate': 20, 'duracao': '5m', 'aquecimento_s': 30},
+}
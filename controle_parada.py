@@ -0,0 +1,182 @@
+"""
+Controle de parada durante a execução do Locust (master ou processo único).
+
+Duas funções, ambas desligadas por padrão:
+
+- parada por convergência (PARADA_ADAPTATIVA=1): depois que a carga alvo é
+  atingida e o aquecimento passa, as estatísticas são divididas em lotes de
+  PARADA_LOTE_S segundos (método das médias em lotes). Quando os intervalos
+  de confiança da média e do p95 dos lotes ficam mais estreitos que
+  PARADA_PRECISAO (relativo) e os lotes são aproximadamente independentes,
+  a execução termina. O --run-time continua valendo como limite máximo.
+- aborto por falhas (ABORTO_TAXA_FALHA=0.5): termina a execução quando a
+  taxa de falha dos últimos ABORTO_JANELA_S segundos passa do limite.
+
+O motivo da parada e os intervalos finais vão para {prefixo}_controle.json.
+"""
+import json
+import math
+import os
+import time
+from collections import deque
+
+import gevent
+from locust.runners import WorkerRunner
+
+import histograma_latencia
+from estatistica import autocorrelacao_lag1, intervalo_confianca
+
+PARADA_ADAPTATIVA = os.getenv("PARADA_ADAPTATIVA", "0") == "1"
+PARADA_PRECISAO = float(os.getenv("PARADA_PRECISAO", "0.05"))     # meia-largura / média
+PARADA_CONFIANCA = float(os.getenv("PARADA_CONFIANCA", "0.95"))
+PARADA_LOTE_S = float(os.getenv("PARADA_LOTE_S", "10"))
+PARADA_LOTES_MIN = int(os.getenv("PARADA_LOTES_MIN", "10"))
+PARADA_AQUECIMENTO_S = float(os.getenv("PARADA_AQUECIMENTO_S", "60"))
+AUTOCORRELACAO_MAX = 0.5
+
+ABORTO_TAXA_FALHA = float(os.getenv("ABORTO_TAXA_FALHA", "0"))    # 0 = desligado
+ABORTO_JANELA_S = float(os.getenv("ABORTO_JANELA_S", "30"))
+ABORTO_MIN_REQ = int(os.getenv("ABORTO_MIN_REQ", "100"))
+
+SUFIXO = "_controle.json"
+
+
+class ControleParada:
+    """Acompanha environment.stats.total a cada segundo e decide a parada."""
+
+    def __init__(self, environment, logger=None):
+        self.environment = environment
+        self.logger = logger
+        self.inicio = time.time()
+        self.t_alvo = None
+        self.lotes = []             # (média ms, p95 ms, requisições) de cada lote
+        self._inicio_lote = None    # (t, requisições, soma dos tempos, histograma)
+        self._janela = deque()      # (t, requisições, falhas) para o aborto
+        self.motivo = "tempo_limite"
+        self.taxa_falha_janela = math.nan
+
+    def _alvo(self):
+        opcoes = self.environment.parsed_options
+        return getattr(opcoes, "num_users", None) or getattr(self.environment.runner, "target_user_count", 0)
+
+    def passo(self, agora):
+        """Avalia o estado atual; retorna True quando a execução deve parar."""
+        total = self.environment.stats.total
+
+        if ABORTO_TAXA_FALHA > 0:
+            self._janela.append((agora, total.num_requests, total.num_failures))
+            while self._janela[0][0] < agora - ABORTO_JANELA_S:
+                self._janela.popleft()
+            _, req0, falhas0 = self._janela[0]
+            req = total.num_requests - req0
+            if req >= ABORTO_MIN_REQ:
+                self.taxa_falha_janela = (total.num_failures - falhas0) / req
+                if self.taxa_falha_janela > ABORTO_TAXA_FALHA:
+                    self.motivo = "aborto_falhas"
+                    return True
+
+        if not PARADA_ADAPTATIVA:
+            return False
+        if self.t_alvo is None:
+            if self.environment.runner.user_count >= self._alvo() > 0:
+                self.t_alvo = agora
+            return False
+        if agora < self.t_alvo + PARADA_AQUECIMENTO_S:
+            return False
+
+        if self._inicio_lote is None:
+            self._inicio_lote = (agora, total.num_requests, total.total_response_time, dict(total.response_times))
+            return False
+        t0, req0, soma0, hist0 = self._inicio_lote
+        if agora - t0 < PARADA_LOTE_S:
+            return False
+
+        req = total.num_requests - req0
+        if req > 0:
+            hist = histograma_latencia.diferenca(total.response_times, hist0)
+            self.lotes.append(((total.total_response_time - soma0) / req, histograma_latencia.percentil(hist, 0.95),
+                               req))
+        self._inicio_lote = (agora, total.num_requests, total.total_response_time, dict(total.response_times))
+        return self.convergiu()
+
+    def intervalos(self):
+        media = intervalo_confianca([l[0] for l in self.lotes], PARADA_CONFIANCA)
+        p95 = intervalo_confianca([l[1] for l in self.lotes], PARADA_CONFIANCA)
+        return media, p95
+
+    def convergiu(self):
+        if len(self.lotes) < PARADA_LOTES_MIN:
+            return False
+        (media, ic_media), (p95, ic_p95) = self.intervalos()
+        if not (ic_media <= PARADA_PRECISAO * media and ic_p95 <= PARADA_PRECISAO * p95):
+            return False
+        if abs(autocorrelacao_lag1([l[0] for l in self.lotes])) > AUTOCORRELACAO_MAX:
+            return False
+        self.motivo = "convergencia"
+        return True
+
+    def laco(self):
+        while True:
+            gevent.sleep(1)
+            if self.passo(time.time()):
+                self.registrar_parada()
+                self.environment.runner.quit()
+                return
+
+    def registrar_parada(self):
+        if not self.logger:
+            return
+        if self.motivo == "aborto_falhas":
+            self.logger.error(f"Execução abortada: taxa de falha {self.taxa_falha_janela:.1%} nos últimos "
+                              f"{ABORTO_JANELA_S:.0f} s (limite {ABORTO_TAXA_FALHA:.0%})")
+        else:
+            (media, ic_media), (p95, ic_p95) = self.intervalos()
+            self.logger.info(f"Convergência após {len(self.lotes)} lotes: média {media:.1f} ± {ic_media:.1f} ms, "
+                             f"p95 {p95:.0f} ± {ic_p95:.0f} ms")
+
+    def resumo(self):
+        (media, ic_media), (p95, ic_p95) = self.intervalos()
+        total = self.environment.stats.total
+
+        def numero(v):
+            return None if math.isnan(v) else round(v, 3)
+
+        return {
+            "motivo": self.motivo,
+            "duracao_s": round(time.time() - self.inicio, 1),
+            "parada_adaptativa": PARADA_ADAPTATIVA,
+            "aborto_taxa_falha": ABORTO_TAXA_FALHA,
+            "lotes": len(self.lotes),
+            "lote_s": PARADA_LOTE_S,
+            "media_ms": numero(media),
+            "ic_media_ms": numero(ic_media),
+            "p95_ms": numero(p95),
+            "ic_p95_ms": numero(ic_p95),
+            "confianca": PARADA_CONFIANCA,
+            "taxa_falha_total": numero(total.num_failures / total.num_requests) if total.num_requests else None,
+        }
+
+
+def registrar(events, logger=None):
+    """Registra o controle nos eventos do Locust (só tem efeito se ligado por variável)."""
+    estado = {}
+
+    @events.test_start.add_listener
+    def _iniciar_controle(environment, **kwargs):
+        if isinstance(environment.runner, WorkerRunner):
+            return
+        if not (PARADA_ADAPTATIVA or ABORTO_TAXA_FALHA > 0) or "controle" in estado:
+            return
+        estado["controle"] = ControleParada(environment, logger)
+        estado["greenlet"] = gevent.spawn(estado["controle"].laco)
+
+    @events.quitting.add_listener
+    def _salvar_controle(environment, **kwargs):
+        controle = estado.get("controle")
+        if controle is None:
+            return
+        estado["greenlet"].kill(block=False)
+        prefixo = getattr(environment.parsed_options, "csv_prefix", None) if environment.parsed_options else None
+        if prefixo:
+            with open(prefixo + SUFIXO, "w", encoding="utf-8") as f:
+                json.dump(controle.resumo(), f, ensure_ascii=False, indent=2)
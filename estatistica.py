@@ -0,0 +1,96 @@
+"""
+Funções estatísticas usadas pelo controle de parada e pelo processamento
+dos resultados, sem depender do SciPy (só da biblioteca padrão).
+"""
+import math
+from statistics import NormalDist, fmean, stdev
+
+
+def t_critico(graus_liberdade, confianca=0.95):
+    """
+    Valor crítico bilateral da t de Student. Exato para 1 e 2 graus de
+    liberdade; acima disso, expansão de Cornish-Fisher a partir da normal
+    (erro < 0,2% já com 3 graus de liberdade).
+    """
+    p = 1 - (1 - confianca) / 2
+    v = graus_liberdade
+    if v < 1:
+        return math.nan
+    if v == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if v == 2:
+        return (2 * p - 1) * math.sqrt(2 / (4 * p * (1 - p)))
+    z = NormalDist().inv_cdf(p)
+    return (z
+            + (z**3 + z) / (4 * v)
+            + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+            + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+            + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / (92160 * v**4))
+
+
+def intervalo_confianca(valores, confianca=0.95):
+    """(média, meia-largura) do intervalo de confiança t para a média."""
+    valores = [v for v in valores if not math.isnan(v)]
+    if len(valores) < 2:
+        return (valores[0] if valores else math.nan), math.nan
+    return fmean(valores), t_critico(len(valores) - 1, confianca) * stdev(valores) / math.sqrt(len(valores))
+
+
+def autocorrelacao_lag1(valores):
+    """Autocorrelação de defasagem 1 (independência aproximada dos lotes)."""
+    if len(valores) < 3:
+        return math.nan
+    media = fmean(valores)
+    desvios = [v - media for v in valores]
+    denominador = sum(d * d for d in desvios)
+    if denominador == 0:
+        return 0.0
+    return sum(a * b for a, b in zip(desvios, desvios[1:])) / denominador
+
+
+def mann_whitney(a, b):
+    """
+    Teste U de Mann-Whitney bilateral pela aproximação normal (com correção
+    de empates e de continuidade), adequado para 30 repetições por grupo.
+    Retorna (U de a, valor-p).
+    """
+    a = [v for v in a if not math.isnan(v)]
+    b = [v for v in b if not math.isnan(v)]
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return math.nan, math.nan
+
+    # Postos médios no conjunto combinado
+    valores = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    postos = [0.0] * len(valores)
+    empates = 0.0
+    i = 0
+    while i < len(valores):
+        j = i
+        while j + 1 < len(valores) and valores[j + 1][0] == valores[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            postos[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        empates += t**3 - t
+        i = j + 1
+
+    soma_a = sum(p for p, (_, grupo) in zip(postos, valores) if grupo == 0)
+    u = soma_a - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variancia = n1 * n2 / 12 * ((n + 1) - empates / (n * (n - 1)))
+    if variancia <= 0:
+        return u, 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variancia)
+    return u, min(1.0, 2 * (1 - NormalDist().cdf(max(z, 0.0))))
+
+
+def holm(valores_p):
+    """Valores-p ajustados por Holm-Bonferroni (mesma ordem da entrada)."""
+    ordem = sorted(range(len(valores_p)), key=lambda i: valores_p[i])
+    ajustados = [math.nan] * len(valores_p)
+    maximo = 0.0
+    for posicao, i in enumerate(ordem):
+        maximo = max(maximo, min(1.0, (len(valores_p) - posicao) * valores_p[i]))
+        ajustados[i] = maximo
+    return ajustados
@@ -0,0 +1,356 @@
+"""
+Executa a campanha completa (30 repetições × 3 cenários) substituindo o
+executar_todos.bat, com:
+
+- manifesto (results/manifesto_campanha.jsonl) das execuções concluídas,
+  para retomar a campanha de onde parou após uma queda;
+- resfriamento guiado por health check em vez de "timeout /t 60" fixo;
+- execuções simultâneas opcionais contra alvos independentes (--alvos);
+- modo distribuído master/workers do Locust (--processos);
+- parada por convergência e aborto por taxa de falha dentro da execução
+  (--parada-adaptativa, --aborto-taxa-falha; ver controle_parada.py);
+- reset, carga e verificação dos dados antes de cada repetição
+  (--resetar; ver reset_semear.py);
+- funciona em Linux/macOS (executar_campanha.sh) e Windows.
+
+Uso:
+    python executar_campanha.py
+    python executar_campanha.py --cenarios pico --repeticoes 5
+    python executar_campanha.py --alvos http://localhost:8080 http://localhost:8081
+    python executar_campanha.py --cenarios pico --processos -1
+    python executar_campanha.py --parada-adaptativa --aborto-taxa-falha 0.5
+    python executar_campanha.py --resetar
+"""
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import requests
+
+import reset_semear
+from cenarios import CENARIOS
+
+MANIFESTO = os.path.join('results', 'manifesto_campanha.jsonl')
+ENDPOINT_SAUDE = '/api/vet/vets'
+
+
+def prefixo_csv(cenario, repeticao):
+    return f"results/{cenario}_{repeticao}"
+
+
+def carregar_concluidas(manifesto=MANIFESTO):
+    """Conjunto de (cenario, repeticao) já concluídas segundo o manifesto."""
+    concluidas = set()
+    if not os.path.exists(manifesto):
+        return concluidas
+    with open(manifesto, encoding='utf-8') as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                # Linha truncada por uma queda no meio da escrita
+                continue
+            if registro.get('status') == 'concluida':
+                concluidas.add((registro['cenario'], registro['repeticao']))
+    return concluidas
+
+
+def comando_locust(cenario, repeticao, host, duracao=None, processos=None, porta_master=None):
+    """
+    Comando do processo principal do Locust. Com `processos`, roda em modo
+    distribuído: no Linux/macOS via --processes (fork); no Windows como
+    --master, com os workers criados por comandos_workers().
+    """
+    config = CENARIOS[cenario]
+    comando = [
+        sys.executable, '-m', 'locust',
+        '-f', 'locustfile.py',
+        f"--host={host}",
+        '--users', str(config['usuarios']),
+        '--spawn-rate', str(config['spawn_rate']),
+        '--run-time', duracao or config['duracao'],
+        f"--csv={prefixo_csv(cenario, repeticao)}",
+        '--headless',
+    ]
+    if processos:
+        if hasattr(os, 'fork'):
+            comando += ['--processes', str(processos)]
+            if porta_master:
+                # Os filhos do fork conectam em --master-port; com alvos em
+                # paralelo cada execução precisa da sua porta
+                comando += ['--master-bind-port', str(porta_master), '--master-port', str(porta_master)]
+        else:
+            comando += ['--master', '--expect-workers', str(numero_workers(processos)),
+                        '--master-bind-port', str(porta_master)]
+    return comando
+
+
+def ambiente_controle(cenario, parada_adaptativa=False, aborto_taxa_falha=None):
+    """Variáveis de ambiente do controle_parada.py para a execução do cenário."""
+    ambiente = dict(os.environ)
+    if parada_adaptativa:
+        ambiente['PARADA_ADAPTATIVA'] = '1'
+        ambiente['PARADA_AQUECIMENTO_S'] = str(CENARIOS[cenario]['aquecimento_s'])
+    if aborto_taxa_falha:
+        ambiente['ABORTO_TAXA_FALHA'] = str(aborto_taxa_falha)
+    return ambiente
+
+
+def motivo_parada(cenario, repeticao):
+    """Motivo gravado pelo controle_parada.py ('convergencia', 'aborto_falhas'...), se houver."""
+    try:
+        with open(prefixo_csv(cenario, repeticao) + '_controle.json', encoding='utf-8') as f:
+            return json.load(f).get('motivo')
+    except (OSError, ValueError):
+        return None
+
+
+def numero_workers(processos):
+    """-1 significa um worker por núcleo, como no --processes do Locust."""
+    return (os.cpu_count() or 1) if processos == -1 else processos
+
+
+def comandos_workers(processos, porta_master):
+    """Workers a iniciar manualmente quando não há fork (Windows)."""
+    if not processos or hasattr(os, 'fork'):
+        return []
+    comando = [sys.executable, '-m', 'locust', '-f', 'locustfile.py', '--worker',
+               '--master-host', '127.0.0.1', '--master-port', str(porta_master)]
+    return [comando] * numero_workers(processos)
+
+
+def verificar_saude(host, timeout=5):
+    """Retorna o tempo de resposta (s) do endpoint de saúde, ou None se falhar."""
+    inicio = time.monotonic()
+    try:
+        with urllib.request.urlopen(host + ENDPOINT_SAUDE, timeout=timeout) as resposta:
+            resposta.read()
+            if resposta.status != 200:
+                return None
+    except (urllib.error.URLError, OSError):
+        return None
+    return time.monotonic() - inicio
+
+
+def aguardar_resfriamento(host, minimo, maximo, latencia_max, consecutivas=3, intervalo=2):
+    """
+    Espera o alvo se recuperar: pelo menos `minimo` segundos e até
+    `consecutivas` health checks seguidos abaixo de `latencia_max`, no
+    máximo `maximo` segundos. Retorna o tempo gasto.
+    """
+    inicio = time.monotonic()
+    seguidas = 0
+    while True:
+        decorrido = time.monotonic() - inicio
+        if decorrido >= maximo:
+            print(f"⚠ [{host}] alvo não estabilizou em {maximo:.0f} s, seguindo mesmo assim")
+            return decorrido
+        latencia = verificar_saude(host)
+        seguidas = seguidas + 1 if latencia is not None and latencia <= latencia_max else 0
+        if seguidas >= consecutivas and decorrido >= minimo:
+            return decorrido
+        time.sleep(intervalo)
+
+
+class Campanha:
+    """Fila de execuções consumida por uma thread por alvo."""
+
+    def __init__(self, execucoes, alvos, args):
+        self.fila = queue.Queue()
+        for execucao in execucoes:
+            self.fila.put(execucao)
+        self.alvos = alvos
+        self.args = args
+        self._trava_manifesto = threading.Lock()
+        self.processos = {}
+        self.interrompida = False
+
+    def registrar(self, registro):
+        with self._trava_manifesto:
+            with open(self.args.manifesto, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def preparar_dados(self, cenario, repeticao, host):
+        """
+        Reset/carga/verificação antes da repetição; False se os dados divergem
+        da referência ou se o reset/carga falhou (erro HTTP, conexão, timeout).
+        """
+        inicio = datetime.now().isoformat(timespec='seconds')
+        try:
+            ok, estado = reset_semear.preparar(host, owners=self.args.owners_semente, resetar=self.args.resetar)
+            # Sem estado, o reset ou a espera pelo sistema falhou antes da verificação
+            motivo = 'dados_divergentes' if estado is not None else 'reset_falhou'
+        except requests.RequestException as e:
+            ok, estado, motivo = False, None, 'reset_falhou'
+            print(f"✗ [{host}] Reset/carga falhou: {e}")
+        if not ok:
+            self.registrar({
+                'cenario': cenario,
+                'repeticao': repeticao,
+                'alvo': host,
+                'inicio': inicio,
+                'status': 'falhou',
+                'motivo': motivo,
+                'dados': estado,
+            })
+            detalhe = "dados diferentes da referência" if motivo == 'dados_divergentes' else "reset/carga falhou"
+            print(f"✗ [{host}] {cenario}_{repeticao} não executada: {detalhe}")
+        return ok
+
+    def executar(self, cenario, repeticao, host):
+        # Cada alvo simultâneo usa uma porta própria para o master
+        porta_master = 5557 + 2 * self.alvos.index(host)
+        processos = self.args.processos
+        comando = comando_locust(cenario, repeticao, host, self.args.duracao, processos, porta_master)
+        saida = None
+        if len(self.alvos) > 1:
+            # Com execuções simultâneas cada uma escreve no seu próprio log
+            os.makedirs('logs', exist_ok=True)
+            saida = open(os.path.join('logs', f"campanha_{cenario}_{repeticao}.log"), 'w', encoding='utf-8')
+
+        ambiente = ambiente_controle(cenario, self.args.parada_adaptativa, self.args.aborto_taxa_falha)
+        inicio = datetime.now()
+        print(f"▶ [{host}] Execução {repeticao} do cenário {cenario.upper()}")
+        redirecionar = {'stdout': saida, 'stderr': subprocess.STDOUT if saida else None}
+        try:
+            processo = subprocess.Popen(comando, env=ambiente, **redirecionar)
+            workers = [subprocess.Popen(c, **redirecionar) for c in comandos_workers(processos, porta_master)]
+            self.processos[host] = [processo] + workers
+            codigo = processo.wait()
+            # Os workers encerram sozinhos quando o master termina
+            for worker in workers:
+                try:
+                    worker.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    worker.terminate()
+        finally:
+            self.processos.pop(host, None)
+            if saida:
+                saida.close()
+
+        # O stats.csv precisa ser desta execução, não de uma campanha anterior
+        stats = prefixo_csv(cenario, repeticao) + '_stats.csv'
+        concluida = (os.path.exists(stats) and os.path.getmtime(stats) >= inicio.timestamp()
+                     and not self.interrompida)
+        parada = motivo_parada(cenario, repeticao) if concluida else None
+        self.registrar({
+            'cenario': cenario,
+            'repeticao': repeticao,
+            'alvo': host,
+            'inicio': inicio.isoformat(timespec='seconds'),
+            'fim': datetime.now().isoformat(timespec='seconds'),
+            'codigo_saida': codigo,
+            'status': 'concluida' if concluida else 'falhou',
+            'parada': parada,
+        })
+        simbolo = "✓" if concluida else "✗"
+        detalhe = f", parada: {parada}" if parada else ""
+        print(f"{simbolo} [{host}] {cenario}_{repeticao} terminou (código {codigo}{detalhe})")
+
+    def trabalhador(self, host):
+        while not self.interrompida:
+            try:
+                cenario, repeticao = self.fila.get_nowait()
+            except queue.Empty:
+                return
+            if self.args.resetar and not self.preparar_dados(cenario, repeticao, host):
+                continue
+            self.executar(cenario, repeticao, host)
+            if not self.fila.empty() and not self.interrompida:
+                gasto = aguardar_resfriamento(host, self.args.resfriamento_min, self.args.resfriamento_max,
+                                              self.args.latencia_saude)
+                print(f"  [{host}] resfriamento: {gasto:.0f} s")
+
+    def rodar(self):
+        threads = [threading.Thread(target=self.trabalhador, args=(host,), daemon=True) for host in self.alvos]
+        for t in threads:
+            t.start()
+        try:
+            while any(t.is_alive() for t in threads):
+                for t in threads:
+                    t.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.interrompida = True
+            print("\n⚠ Interrompido: encerrando execuções em andamento (não entram no manifesto como concluídas)")
+            for processos in list(self.processos.values()):
+                for processo in processos:
+                    processo.terminate()
+            for t in threads:
+                t.join()
+            return 130
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa a campanha de testes de carga com retomada.")
+    parser.add_argument('--cenarios', nargs='+', choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument('--repeticoes', type=int, default=30)
+    parser.add_argument('--alvos', nargs='+', default=['http://localhost:8080'],
+                        help="um ou mais hosts independentes; com mais de um, as execuções rodam em paralelo")
+    parser.add_argument('--duracao', help="sobrescreve o --run-time dos cenários (ex.: 30s para um teste rápido)")
+    parser.add_argument('--processos', type=int,
+                        help="modo distribuído: número de workers do Locust por execução (-1 = um por núcleo)")
+    parser.add_argument('--parada-adaptativa', action='store_true',
+                        help="encerra cada execução quando os ICs da média e do p95 convergem "
+                             "(o --run-time vira limite máximo)")
+    parser.add_argument('--aborto-taxa-falha', type=float,
+                        help="aborta a execução quando a taxa de falha dos últimos 30 s passa deste valor (ex.: 0.5)")
+    parser.add_argument('--resetar', action='store_true',
+                        help="antes de cada repetição reinicia os serviços com dados, recria o conjunto "
+                             "determinístico e confere owners/bytes contra a referência")
+    parser.add_argument('--owners-semente', type=int, default=50, help="owners do conjunto determinístico")
+    parser.add_argument('--manifesto', default=MANIFESTO)
+    parser.add_argument('--resfriamento-min', type=float, default=10,
+                        help="segundos mínimos entre execuções no mesmo alvo")
+    parser.add_argument('--resfriamento-max', type=float, default=120,
+                        help="espera máxima pela estabilização do alvo")
+    parser.add_argument('--latencia-saude', type=float, default=0.5,
+                        help="tempo máximo (s) do health check para considerar o alvo estável")
+    parser.add_argument('--simular', action='store_true', help="apenas lista o que seria executado")
+    args = parser.parse_args()
+
+    if args.resetar and len(args.alvos) > 1:
+        parser.error("--resetar reinicia um único docker compose; use com um alvo só")
+
+    os.makedirs('results', exist_ok=True)
+    concluidas = carregar_concluidas(args.manifesto)
+    execucoes = [(c, i) for c in args.cenarios for i in range(1, args.repeticoes + 1)
+                 if (c, i) not in concluidas]
+
+    print("=" * 60)
+    print("CAMPANHA DE TESTES - LOCUST PETCLINIC")
+    print("=" * 60)
+    print(f"Execuções pendentes: {len(execucoes)} ({len(concluidas)} já concluídas no manifesto)")
+    print(f"Alvos: {', '.join(args.alvos)}")
+
+    if args.simular:
+        for cenario, repeticao in execucoes:
+            print("  " + " ".join(comando_locust(cenario, repeticao, args.alvos[0], args.duracao,
+                                                 args.processos, 5557)))
+        return 0
+    if not execucoes:
+        print("✓ Nada a fazer")
+        return 0
+
+    codigo = Campanha(execucoes, args.alvos, args).rodar()
+    print("\n" + "=" * 60)
+    print("CAMPANHA CONCLUÍDA!" if codigo == 0 else "CAMPANHA INTERROMPIDA (rode de novo para retomar)")
+    print("=" * 60)
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
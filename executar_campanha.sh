@@ -0,0 +1,4 @@
+#!/usr/bin/env sh
+# Executa a campanha completa (equivalente Linux/macOS do executar_todos.bat).
+# Argumentos extras são repassados, ex.: ./executar_campanha.sh --cenarios pico
+cd "$(dirname "$0")" && exec python3 executar_campanha.py "$@"
@@ -0,0 +1,248 @@
+"""
+Métricas ao vivo durante as execuções do Locust.
+
+Um listener de events.request mantém em memória, por endpoint, contadores
+acumulados, um histograma com buckets fixos e uma janela móvel dos últimos
+segundos (p50/p95/p99 e taxa de falha atuais). O caminho da requisição só
+incrementa dicionários; a exposição fica em greenlets à parte:
+
+- METRICAS_PORTA=9646        endpoint HTTP no formato do Prometheus (/metrics)
+- METRICAS_ARQUIVO=arq.jsonl uma linha JSON por intervalo (push em lote)
+
+Sem nenhum dos dois nada é registrado e as requisições não pagam pela
+contagem. No /metrics as latências saem em segundos, como o Prometheus espera.
+
+No modo distribuído os workers enviam o que acumularam no relatório
+periódico ao master (report_to_master), e só o master expõe as métricas.
+"""
+import bisect
+import json
+import os
+import time
+
+import gevent
+from gevent.pywsgi import WSGIServer
+from locust.runners import WorkerRunner
+
+METRICAS_PORTA = int(os.getenv("METRICAS_PORTA", "0"))
+METRICAS_ARQUIVO = os.getenv("METRICAS_ARQUIVO")
+METRICAS_INTERVALO_S = float(os.getenv("METRICAS_INTERVALO_S", "5"))
+JANELA_S = int(os.getenv("METRICAS_JANELA_S", "10"))
+
+# Limites superiores (ms) dos buckets do histograma acumulado
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+QUANTIS = [0.5, 0.95, 0.99]
+
+
+def arredondar(tempo_ms):
+    """Mesmo arredondamento de 2 dígitos significativos do Locust."""
+    if tempo_ms < 100:
+        return round(tempo_ms)
+    if tempo_ms < 1000:
+        return int(round(tempo_ms, -1))
+    if tempo_ms < 10000:
+        return int(round(tempo_ms, -2))
+    return int(round(tempo_ms, -3))
+
+
+def _rotulo(valor):
+    """Valor de rótulo do Prometheus: \\, " e quebra de linha escapados."""
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _novo_acumulado():
+    return {"n": 0, "falhas": 0, "soma_ms": 0.0, "buckets": [0] * (len(BUCKETS_MS) + 1)}
+
+
+def _novo_segundo():
+    return {"n": 0, "falhas": 0, "tempos": {}}
+
+
+class MetricasAoVivo:
+    """Contadores por endpoint e janela móvel por segundo."""
+
+    def __init__(self):
+        self.acumulado = {}
+        self.janela = {}
+
+    def registrar(self, nome, tempo_ms, falhou, segundo=None):
+        segundo = int(time.time()) if segundo is None else segundo
+
+        a = self.acumulado.get(nome)
+        if a is None:
+            a = self.acumulado[nome] = _novo_acumulado()
+        a["n"] += 1
+        a["soma_ms"] += tempo_ms
+        a["buckets"][bisect.bisect_left(BUCKETS_MS, tempo_ms)] += 1
+
+        por_nome = self.janela.get(segundo)
+        if por_nome is None:
+            por_nome = self.janela[segundo] = {}
+            self._podar(segundo)
+        s = por_nome.get(nome)
+        if s is None:
+            s = por_nome[nome] = _novo_segundo()
+        s["n"] += 1
+        chave = arredondar(tempo_ms)
+        s["tempos"][chave] = s["tempos"].get(chave, 0) + 1
+
+        if falhou:
+            a["falhas"] += 1
+            s["falhas"] += 1
+
+    def _podar(self, agora):
+        for segundo in [s for s in self.janela if s <= agora - JANELA_S]:
+            del self.janela[segundo]
+
+    def drenar(self):
+        """Retorna o que foi acumulado desde a última chamada e zera (workers)."""
+        dados = {"acumulado": self.acumulado, "janela": self.janela}
+        self.acumulado, self.janela = {}, {}
+        return dados
+
+    def mesclar(self, dados):
+        """Soma o que um worker enviou (master)."""
+        for nome, origem in dados.get("acumulado", {}).items():
+            a = self.acumulado.setdefault(nome, _novo_acumulado())
+            a["n"] += origem["n"]
+            a["falhas"] += origem["falhas"]
+            a["soma_ms"] += origem["soma_ms"]
+            a["buckets"] = [x + y for x, y in zip(a["buckets"], origem["buckets"])]
+        for segundo, por_nome in dados.get("janela", {}).items():
+            destino = self.janela.setdefault(int(segundo), {})
+            for nome, origem in por_nome.items():
+                s = destino.setdefault(nome, _novo_segundo())
+                s["n"] += origem["n"]
+                s["falhas"] += origem["falhas"]
+                for ms, n in origem["tempos"].items():
+                    s["tempos"][int(ms)] = s["tempos"].get(int(ms), 0) + n
+        self._podar(int(time.time()))
+
+    def resumo_janela(self):
+        """{endpoint: {n, falhas, taxa_falha, p50, p95, p99}} dos últimos JANELA_S segundos."""
+        limite = int(time.time()) - JANELA_S
+        combinado = {}
+        for segundo, por_nome in list(self.janela.items()):
+            if segundo <= limite:
+                continue
+            for nome, s in por_nome.items():
+                for chave in (nome, "Aggregated"):
+                    c = combinado.setdefault(chave, _novo_segundo())
+                    c["n"] += s["n"]
+                    c["falhas"] += s["falhas"]
+                    for ms, n in s["tempos"].items():
+                        c["tempos"][ms] = c["tempos"].get(ms, 0) + n
+
+        resumo = {}
+        for nome, c in combinado.items():
+            ordenados = sorted(c["tempos"].items())
+            item = {"n": c["n"], "falhas": c["falhas"], "taxa_falha": c["falhas"] / c["n"] if c["n"] else 0.0}
+            for q in QUANTIS:
+                alvo, acumulado = q * c["n"], 0
+                for ms, n in ordenados:
+                    acumulado += n
+                    if acumulado >= alvo:
+                        item[f"p{int(q * 100)}"] = ms
+                        break
+            resumo[nome] = item
+        return resumo
+
+    def prometheus(self, usuarios=None):
+        """
+        Texto no formato de exposição do Prometheus (cada família contígua),
+        com latências em segundos e nomes de endpoint escapados.
+        """
+        acumulado = [(_rotulo(nome), a) for nome, a in sorted(self.acumulado.items())]
+        janela = [(_rotulo(nome), item) for nome, item in sorted(self.resumo_janela().items())]
+
+        linhas = ["# TYPE petclinic_requisicoes_total counter"]
+        linhas += [f'petclinic_requisicoes_total{{endpoint="{nome}"}} {a["n"]}' for nome, a in acumulado]
+        linhas.append("# TYPE petclinic_falhas_total counter")
+        linhas += [f'petclinic_falhas_total{{endpoint="{nome}"}} {a["falhas"]}' for nome, a in acumulado]
+
+        linhas.append("# TYPE petclinic_latencia_segundos histogram")
+        for nome, a in acumulado:
+            contagem = 0
+            for limite, n in zip([f"{ms / 1000:g}" for ms in BUCKETS_MS] + ["+Inf"], a["buckets"]):
+                contagem += n
+                linhas.append(f'petclinic_latencia_segundos_bucket{{endpoint="{nome}",le="{limite}"}} {contagem}')
+            linhas.append(f'petclinic_latencia_segundos_sum{{endpoint="{nome}"}} {a["soma_ms"] / 1000:.6f}')
+            linhas.append(f'petclinic_latencia_segundos_count{{endpoint="{nome}"}} {a["n"]}')
+
+        linhas.append("# TYPE petclinic_latencia_janela_segundos gauge")
+        for nome, item in janela:
+            for q in QUANTIS:
+                chave = f"p{int(q * 100)}"
+                if chave in item:
+                    linhas.append(f'petclinic_latencia_janela_segundos{{endpoint="{nome}",quantil="{q}"}} '
+                                  f'{item[chave] / 1000:g}')
+        linhas.append("# TYPE petclinic_taxa_falha_janela gauge")
+        linhas += [f'petclinic_taxa_falha_janela{{endpoint="{nome}"}} {item["taxa_falha"]:.4f}' for nome, item in janela]
+
+        if usuarios is not None:
+            linhas.append("# TYPE petclinic_usuarios gauge")
+            linhas.append(f"petclinic_usuarios {usuarios}")
+        return "\n".join(linhas) + "\n"
+
+
+METRICAS = MetricasAoVivo()
+
+
+def _servir_http(environment, porta):
+    def aplicacao(env, start_response):
+        if env.get("PATH_INFO") != "/metrics":
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"use /metrics\n"]
+        usuarios = environment.runner.user_count if environment.runner else None
+        corpo = METRICAS.prometheus(usuarios).encode()
+        start_response("200 OK", [("Content-Type", "text/plain; version=0.0.4")])
+        return [corpo]
+
+    servidor = WSGIServer(("127.0.0.1", porta), aplicacao, log=None)
+    servidor.start()
+    return servidor
+
+
+def _gravar_lotes(environment, caminho, intervalo):
+    while True:
+        gevent.sleep(intervalo)
+        linha = {
+            "timestamp": int(time.time()),
+            "usuarios": environment.runner.user_count if environment.runner else None,
+            "janela": METRICAS.resumo_janela(),
+        }
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+
+
+def registrar(events, logger=None):
+    """
+    Registra os listeners do exportador nos eventos do Locust, só com
+    METRICAS_PORTA ou METRICAS_ARQUIVO (nos workers também: sem destino, nada
+    é contado por requisição nem enviado no relatório).
+    """
+    if not (METRICAS_PORTA or METRICAS_ARQUIVO):
+        return
+
+    @events.request.add_listener
+    def _ao_requisitar(name, response_time, exception, **kwargs):
+        METRICAS.registrar(name, response_time, exception is not None)
+
+    @events.report_to_master.add_listener
+    def _enviar_ao_master(client_id, data, **kwargs):
+        data["metricas_ao_vivo"] = METRICAS.drenar()
+
+    @events.worker_report.add_listener
+    def _receber_do_worker(client_id, data, **kwargs):
+        METRICAS.mesclar(data.get("metricas_ao_vivo", {}))
+
+    @events.init.add_listener
+    def _iniciar_exportacao(environment, **kwargs):
+        if isinstance(environment.runner, WorkerRunner):
+            return
+        if METRICAS_PORTA:
+            _servir_http(environment, METRICAS_PORTA)
+            if logger:
+                logger.info(f"Métricas ao vivo em http://127.0.0.1:{METRICAS_PORTA}/metrics")
+        if METRICAS_ARQUIVO:
+            gevent.spawn(_gravar_lotes, environment, METRICAS_ARQUIVO, METRICAS_INTERVALO_S)
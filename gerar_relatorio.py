@@ -0,0 +1,208 @@
+"""
+Pipeline do relatório: processamento → gráficos → tabelas, refazendo só as
+etapas cujas entradas mudaram.
+
+Cada etapa tem um conjunto de arquivos de entrada (padrões glob) e o código
+que a executa. A assinatura da etapa é o SHA-256 dos conteúdos das entradas
+e desse código; ela fica em results/.cache_relatorio.json e a etapa só roda
+de novo quando a assinatura muda ou alguma saída sumiu. Para não reler todo
+o results/ a cada chamada, o hash de cada arquivo é reaproveitado enquanto
+data de modificação e tamanho forem os mesmos.
+
+As etapas se encadeiam pelas saídas: se o processamento rodar de novo e o
+resumo_final.csv sair idêntico, gráficos e tabelas continuam em cache.
+Tabela LaTeX e resumo são gravados num temporário e trocados de uma vez.
+
+Uso:
+    python gerar_relatorio.py
+    python gerar_relatorio.py --etapas graficos tabelas
+    python gerar_relatorio.py --forcar
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+from cenarios import CENARIOS
+from graficos_30_repeticoes import GRAFICOS, PASTA_GRAFICOS
+
+PASTA_RESULTADOS = 'results'
+ARQUIVO_CACHE = os.path.join(PASTA_RESULTADOS, '.cache_relatorio.json')
+ARQUIVO_RESUMO = os.path.join(PASTA_RESULTADOS, 'resumo_final.csv')
+ARQUIVO_TABELA = os.path.join(PASTA_RESULTADOS, 'tabela_resultados.tex')
+
+# Incrementar ao mudar a forma de calcular as assinaturas
+VERSAO_CACHE = 1
+
+
+def _etapa_processamento():
+    from processar_resultados import processar_resultados_locust
+    processar_resultados_locust()
+
+
+def _etapa_graficos():
+    from graficos_30_repeticoes import carregar_dados, gerar_graficos
+    gerados, reaproveitados = gerar_graficos(carregar_dados())
+    print(f"✓ {len(gerados)} gráficos gerados, {len(reaproveitados)} reaproveitados em {PASTA_GRAFICOS}/")
+
+
+def _etapa_tabelas():
+    import pandas as pd
+    from processar_resultados import tabela_latex
+
+    resumo = pd.read_csv(ARQUIVO_RESUMO).to_dict('records')
+    salvar_atomico(ARQUIVO_TABELA, tabela_latex(resumo))
+    print(f"✓ Tabela LaTeX salva em: {ARQUIVO_TABELA}")
+
+
+# (nome, função, entradas, código, saídas)
+ETAPAS = [
+    ('processamento', _etapa_processamento,
+     [os.path.join(PASTA_RESULTADOS, f"{c}_*") for c in CENARIOS],
+     ['processar_resultados.py', 'ingestao_resultados.py', 'regime_permanente.py', 'historico_colunar.py',
+      'histograma_latencia.py', 'analisar_payload.py', 'monitor_gerador.py', 'estatistica.py', 'cenarios.py'],
+     [ARQUIVO_RESUMO]),
+    ('graficos', _etapa_graficos,
+     [ARQUIVO_RESUMO, os.path.join(PASTA_RESULTADOS, 'capacidade_saturacao.csv')],
+     ['graficos_30_repeticoes.py'],
+     [os.path.join(PASTA_GRAFICOS, g[0]) for g in GRAFICOS]),
+    ('tabelas', _etapa_tabelas,
+     [ARQUIVO_RESUMO],
+     ['processar_resultados.py'],
+     [ARQUIVO_TABELA]),
+]
+
+
+def salvar_atomico(caminho, texto):
+    """Grava num temporário e troca de uma vez (quem lê nunca vê o arquivo pela metade)."""
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    os.replace(temporario, caminho)
+
+
+class HashesArquivos:
+    """SHA-256 por arquivo, recalculado só quando data de modificação ou tamanho mudam."""
+
+    def __init__(self, anteriores=None):
+        self.anteriores = anteriores or {}
+        self.atuais = {}
+        self.calculados = 0
+        self.reaproveitados = 0
+
+    def hash(self, caminho):
+        info = os.stat(caminho)
+        anterior = self.atuais.get(caminho) or self.anteriores.get(caminho)
+        if anterior and anterior['mtime'] == info.st_mtime_ns and anterior['tamanho'] == info.st_size:
+            digest = anterior['sha256']
+            self.reaproveitados += 1
+        else:
+            sha = hashlib.sha256()
+            with open(caminho, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(bloco)
+            digest = sha.hexdigest()
+            self.calculados += 1
+        self.atuais[caminho] = {'mtime': info.st_mtime_ns, 'tamanho': info.st_size, 'sha256': digest}
+        return digest
+
+
+def assinatura(hashes, entradas, codigo):
+    """Hash das entradas existentes (caminho + conteúdo) e do código da etapa."""
+    arquivos = sorted({a for padrao in entradas for a in glob.glob(padrao) if os.path.isfile(a)})
+    # Temporários de gravações atômicas em andamento não são entrada
+    arquivos = [a for a in arquivos if not a.endswith('.tmp')]
+    sha = hashlib.sha256()
+    for caminho in arquivos + [c for c in codigo if os.path.exists(c)]:
+        sha.update(caminho.encode() + b'\0' + hashes.hash(caminho).encode() + b'\n')
+    return sha.hexdigest(), len(arquivos)
+
+
+def carregar_cache(arquivo=ARQUIVO_CACHE):
+    try:
+        with open(arquivo, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {'etapas': {}, 'arquivos': {}}
+    if cache.get('versao') != VERSAO_CACHE:
+        return {'etapas': {}, 'arquivos': {}}
+    return cache
+
+
+def salvar_cache(cache, arquivo=ARQUIVO_CACHE):
+    salvar_atomico(arquivo, json.dumps(dict(cache, versao=VERSAO_CACHE), indent=1))
+
+
+def gerar(etapas=None, forcar=False):
+    """Executa as etapas pedidas (todas por padrão), na ordem. Retorna {etapa: 'executada'|'em cache'|'falhou'}."""
+    cache = carregar_cache()
+    hashes = HashesArquivos(cache['arquivos'])
+    situacao = {}
+
+    for nome, funcao, entradas, codigo, saidas in ETAPAS:
+        if etapas and nome not in etapas:
+            continue
+        print(f"\n{'─'*60}")
+        print(f"ETAPA: {nome.upper()}")
+        print(f"{'─'*60}")
+
+        atual, n_entradas = assinatura(hashes, entradas, codigo)
+        saidas_ok = all(os.path.exists(s) for s in saidas)
+        if not forcar and cache['etapas'].get(nome) == atual and saidas_ok:
+            print(f"• Sem mudanças nas {n_entradas} entradas, etapa em cache")
+            situacao[nome] = 'em cache'
+            continue
+        if n_entradas == 0:
+            print("⚠ Nenhuma entrada encontrada, etapa ignorada")
+            situacao[nome] = 'falhou'
+            continue
+
+        print(f"▶ {n_entradas} entradas, executando...")
+        inicio = time.monotonic()
+        try:
+            funcao()
+        except Exception as e:
+            print(f"✗ Etapa {nome} falhou: {e}")
+            situacao[nome] = 'falhou'
+            # As seguintes dependem desta; o cache fica como estava para tentar de novo
+            break
+        cache['etapas'][nome] = atual
+        situacao[nome] = 'executada'
+        print(f"✓ Etapa {nome} concluída em {time.monotonic() - inicio:.1f} s")
+
+    # Só os arquivos vistos nesta chamada: execuções removidas saem do cache
+    cache['arquivos'] = {**cache['arquivos'], **hashes.atuais} if etapas else hashes.atuais
+    salvar_cache(cache)
+    print(f"\n({hashes.calculados} arquivos lidos para hash, {hashes.reaproveitados} pelo cache)")
+    return situacao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o relatório (processamento, gráficos e tabelas) de forma incremental.")
+    parser.add_argument('--etapas', nargs='+', choices=[e[0] for e in ETAPAS], help="apenas estas etapas")
+    parser.add_argument('--forcar', action='store_true', help="executa as etapas mesmo sem mudanças")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RELATÓRIO - LOCUST PETCLINIC")
+    print("=" * 60)
+
+    if not os.path.exists(PASTA_RESULTADOS):
+        print(f"❌ ERRO: Pasta '{PASTA_RESULTADOS}' não encontrada!")
+        return 1
+
+    situacao = gerar(args.etapas, args.forcar)
+
+    print("\n" + "=" * 60)
+    for nome, estado in situacao.items():
+        simbolo = {'executada': '✓', 'em cache': '•', 'falhou': '✗'}[estado]
+        print(f"{simbolo} {nome}: {estado}")
+    print("=" * 60)
+    return 1 if 'falhou' in situacao.values() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
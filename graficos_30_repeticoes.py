@@ -1,6 +1,17 @@
+import matplotlib
+matplotlib.use('Agg')  # backend sem janela: permite renderizar em processos paralelos
+
 import matplotlib.pyplot as plt
 import numpy as np
+import argparse
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cenarios import CENARIOS
 
 # Configurar estilo dos gráficos
 plt.style.use('seaborn-v0_8-darkgrid')
@@ -9,222 +20,366 @@ plt.rcParams['font.size'] = 11
 plt.rcParams['axes.titlesize'] = 14
 plt.rcParams['axes.labelsize'] = 12
 
-# Criar pasta para salvar gráficos
-os.makedirs('graficos_30rep', exist_ok=True)
+PASTA_GRAFICOS = 'graficos_30rep'
+ARQUIVO_RESUMO = os.path.join('results', 'resumo_final.csv')
+ARQUIVO_CACHE = os.path.join(PASTA_GRAFICOS, '.cache_graficos.json')
+# Curva medida pela busca de capacidade (locustfile_capacidade.py --csv=results/capacidade)
+ARQUIVO_SATURACAO = os.path.join('results', 'capacidade_saturacao.csv')
+
+# Incrementar ao mudar o visual de algum gráfico, para invalidar o cache
+VERSAO_GRAFICOS = 1
+
+
+def carregar_capacidade(arquivo_saturacao=ARQUIVO_SATURACAO):
+    """Pontos da curva de saturação ordenados por usuários, ou None sem a busca de capacidade."""
+    if not os.path.exists(arquivo_saturacao):
+        return None
+    curva = pd.read_csv(arquivo_saturacao).sort_values('usuarios')
+    return {
+        'usuarios': [int(u) for u in curva['usuarios']],
+        'throughput': [round(float(v), 2) for v in curva['req_por_segundo']],
+        'sustentavel': [bool(v) for v in curva['sustentavel']],
+    }
+
+
+def carregar_dados(arquivo_resumo=ARQUIVO_RESUMO):
+    """
+    Lê as médias das 30 repetições do resumo_final.csv gerado por
+    processar_resultados.py. Sem o resumo, calcula as médias direto dos
+    *_stats.csv (com o cache de ingestao_resultados).
+    """
+    if os.path.exists(arquivo_resumo):
+        df = pd.read_csv(arquivo_resumo)
+        df['cenario'] = df['Cenário'].str.lower()
+    else:
+        from ingestao_resultados import arquivos_cenario, carregar_agregados
+
+        arquivos = {c: arquivos_cenario(c) for c in CENARIOS}
+        agregados, _, _ = carregar_agregados([a for lista in arquivos.values() for a in lista])
+        linhas = []
+        for cenario, lista in arquivos.items():
+            runs = pd.DataFrame([agregados[a] for a in lista if agregados.get(a)])
+            if runs.empty:
+                continue
+            linhas.append({
+                'cenario': cenario,
+                'Usuários': CENARIOS[cenario]['usuarios'],
+                'Tempo Médio (ms)': runs['Average Response Time'].mean(),
+                'Tempo Máximo (ms)': runs['Max Response Time'].mean(),
+                'Req/s': runs['Requests/s'].mean(),
+                'Total Requisições': runs['Request Count'].mean(),
+                'Total Falhas': runs['Failure Count'].mean(),
+                '% Sucesso': ((1 - runs['Failure Count'] / runs['Request Count']) * 100).mean(),
+            })
+        df = pd.DataFrame(linhas)
+
+    # Mantém a ordem leve → moderado → pico
+    df = df.set_index('cenario').reindex([c for c in CENARIOS if c in set(df['cenario'])])
+
+    return {
+        'cenarios': [f"{c.capitalize()}\n({int(u)} users)" for c, u in zip(df.index, df['Usuários'])],
+        'usuarios': [int(u) for u in df['Usuários']],
+        'tempo_medio': [round(float(v), 2) for v in df['Tempo Médio (ms)']],
+        'tempo_max': [round(float(v), 2) for v in df['Tempo Máximo (ms)']],
+        'throughput': [round(float(v), 2) for v in df['Req/s']],
+        'taxa_sucesso': [round(float(v), 2) for v in df['% Sucesso']],
+        'total_requisicoes': [int(round(v)) for v in df['Total Requisições']],
+        'total_falhas': [int(round(v)) for v in df['Total Falhas']],
+        'capacidade': carregar_capacidade(),
+    }
 
-# Dados das 30 repetições
-cenarios = ['Leve\n(50 users)', 'Moderado\n(100 users)', 'Pico\n(200 users)']
-usuarios = [50, 100, 200]
-tempo_medio = [788.56, 337.41, 256.13]
-tempo_max = [9407.83, 10105.49, 10113.20]
-throughput = [17.90, 41.14, 81.18]
-taxa_sucesso = [18.03, 1.47, 0.86]
-total_requisicoes = [10384, 24619, 24269]
-total_falhas = [8746, 24258, 24061]
-
-print("Gerando gráficos das 30 repetições...")
 
 # ====================================================================
 # GRÁFICO 1: Tempos de Resposta (Médio e Máximo)
 # ====================================================================
-fig, ax = plt.subplots(figsize=(10, 6))
-
-x = np.arange(len(cenarios))
-width = 0.35
-
-bars1 = ax.bar(x - width/2, tempo_medio, width, label='Tempo Médio', 
-               color='#2E86AB', alpha=0.8, edgecolor='black', linewidth=1.2)
-bars2 = ax.bar(x + width/2, tempo_max, width, label='Tempo Máximo', 
-               color='#A23B72', alpha=0.8, edgecolor='black', linewidth=1.2)
-
-ax.set_xlabel('Cenário de Teste', fontweight='bold')
-ax.set_ylabel('Tempo de Resposta (ms)', fontweight='bold')
-ax.set_title('Tempos de Resposta - Média de 30 Repetições', fontweight='bold', pad=20)
-ax.set_xticks(x)
-ax.set_xticklabels(cenarios)
-ax.legend(loc='upper right', fontsize=11)
-ax.grid(axis='y', alpha=0.3)
-
-# Adicionar valores nas barras
-for bar in bars1:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height,
-            f'{height:.1f}',
-            ha='center', va='bottom', fontweight='bold', fontsize=9)
-
-for bar in bars2:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height,
-            f'{height:.0f}',
-            ha='center', va='bottom', fontweight='bold', fontsize=9)
-
-plt.tight_layout()
-plt.savefig('graficos_30rep/tempos_resposta_30rep.png', dpi=300, bbox_inches='tight')
-print("✓ Gráfico 1 salvo: tempos_resposta_30rep.png")
-plt.close()
+def grafico_tempos_resposta(d, caminho):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    x = np.arange(len(d['cenarios']))
+    width = 0.35
+
+    bars1 = ax.bar(x - width/2, d['tempo_medio'], width, label='Tempo Médio',
+                   color='#2E86AB', alpha=0.8, edgecolor='black', linewidth=1.2)
+    bars2 = ax.bar(x + width/2, d['tempo_max'], width, label='Tempo Máximo',
+                   color='#A23B72', alpha=0.8, edgecolor='black', linewidth=1.2)
+
+    ax.set_xlabel('Cenário de Teste', fontweight='bold')
+    ax.set_ylabel('Tempo de Resposta (ms)', fontweight='bold')
+    ax.set_title('Tempos de Resposta - Média de 30 Repetições', fontweight='bold', pad=20)
+    ax.set_xticks(x)
+    ax.set_xticklabels(d['cenarios'])
+    ax.legend(loc='upper right', fontsize=11)
+    ax.grid(axis='y', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for bar in bars1:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.1f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    for bar in bars2:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.0f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.close()
+
 
 # ====================================================================
 # GRÁFICO 2: Throughput (Requisições por Segundo)
 # ====================================================================
-fig, ax = plt.subplots(figsize=(10, 6))
+def grafico_throughput(d, caminho):
+    fig, ax = plt.subplots(figsize=(10, 6))
 
-bars = ax.bar(cenarios, throughput, color=['#06A77D', '#F77F00', '#D62828'], 
-              alpha=0.8, edgecolor='black', linewidth=1.2)
+    bars = ax.bar(d['cenarios'], d['throughput'], color=['#06A77D', '#F77F00', '#D62828'],
+                  alpha=0.8, edgecolor='black', linewidth=1.2)
 
-ax.set_xlabel('Cenário de Teste', fontweight='bold')
-ax.set_ylabel('Requisições por Segundo (req/s)', fontweight='bold')
-ax.set_title('Throughput do Sistema - Média de 30 Repetições', fontweight='bold', pad=20)
-ax.grid(axis='y', alpha=0.3)
+    ax.set_xlabel('Cenário de Teste', fontweight='bold')
+    ax.set_ylabel('Requisições por Segundo (req/s)', fontweight='bold')
+    ax.set_title('Throughput do Sistema - Média de 30 Repetições', fontweight='bold', pad=20)
+    ax.grid(axis='y', alpha=0.3)
 
-# Adicionar valores nas barras
-for bar in bars:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height,
-            f'{height:.2f}',
-            ha='center', va='bottom', fontweight='bold', fontsize=10)
+    # Adicionar valores nas barras
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.2f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=10)
+
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.close()
 
-plt.tight_layout()
-plt.savefig('graficos_30rep/throughput_30rep.png', dpi=300, bbox_inches='tight')
-print("✓ Gráfico 2 salvo: throughput_30rep.png")
-plt.close()
 
 # ====================================================================
 # GRÁFICO 3: Taxa de Sucesso
 # ====================================================================
-fig, ax = plt.subplots(figsize=(10, 6))
+def grafico_taxa_sucesso(d, caminho):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    bars = ax.bar(d['cenarios'], d['taxa_sucesso'], color=['#E63946', '#F77F00', '#06A77D'],
+                  alpha=0.8, edgecolor='black', linewidth=1.2)
 
-bars = ax.bar(cenarios, taxa_sucesso, color=['#E63946', '#F77F00', '#06A77D'], 
-              alpha=0.8, edgecolor='black', linewidth=1.2)
+    ax.set_xlabel('Cenário de Teste', fontweight='bold')
+    ax.set_ylabel('Taxa de Sucesso (%)', fontweight='bold')
+    ax.set_title('Taxa de Sucesso das Requisições - Média de 30 Repetições', fontweight='bold', pad=20)
+    ax.set_ylim(0, 100)
+    ax.grid(axis='y', alpha=0.3)
 
-ax.set_xlabel('Cenário de Teste', fontweight='bold')
-ax.set_ylabel('Taxa de Sucesso (%)', fontweight='bold')
-ax.set_title('Taxa de Sucesso das Requisições - Média de 30 Repetições', fontweight='bold', pad=20)
-ax.set_ylim(0, 100)
-ax.grid(axis='y', alpha=0.3)
+    # Linha de referência em 100%
+    ax.axhline(y=100, color='green', linestyle='--', linewidth=2, alpha=0.5, label='100% Sucesso')
+    ax.legend(loc='upper right')
 
-# Linha de referência em 100%
-ax.axhline(y=100, color='green', linestyle='--', linewidth=2, alpha=0.5, label='100% Sucesso')
-ax.legend(loc='upper right')
+    # Adicionar valores nas barras
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.2f}%',
+                ha='center', va='bottom', fontweight='bold', fontsize=10)
 
-# Adicionar valores nas barras
-for bar in bars:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height,
-            f'{height:.2f}%',
-            ha='center', va='bottom', fontweight='bold', fontsize=10)
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.close()
 
-plt.tight_layout()
-plt.savefig('graficos_30rep/taxa_sucesso_30rep.png', dpi=300, bbox_inches='tight')
-print("✓ Gráfico 3 salvo: taxa_sucesso_30rep.png")
-plt.close()
 
 # ====================================================================
 # GRÁFICO 4: Requisições vs Falhas
 # ====================================================================
-fig, ax = plt.subplots(figsize=(10, 6))
-
-x = np.arange(len(cenarios))
-width = 0.35
-
-bars1 = ax.bar(x - width/2, total_requisicoes, width, label='Total de Requisições', 
-               color='#4A90E2', alpha=0.8, edgecolor='black', linewidth=1.2)
-bars2 = ax.bar(x + width/2, total_falhas, width, label='Total de Falhas', 
-               color='#E74C3C', alpha=0.8, edgecolor='black', linewidth=1.2)
-
-ax.set_xlabel('Cenário de Teste', fontweight='bold')
-ax.set_ylabel('Quantidade', fontweight='bold')
-ax.set_title('Total de Requisições vs Falhas - Média de 30 Repetições', fontweight='bold', pad=20)
-ax.set_xticks(x)
-ax.set_xticklabels(cenarios)
-ax.legend(loc='upper left', fontsize=11)
-ax.grid(axis='y', alpha=0.3)
-
-# Adicionar valores nas barras
-for bar in bars1:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height,
-            f'{int(height)}',
-            ha='center', va='bottom', fontweight='bold', fontsize=9)
-
-for bar in bars2:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height,
-            f'{int(height)}',
-            ha='center', va='bottom', fontweight='bold', fontsize=9)
-
-plt.tight_layout()
-plt.savefig('graficos_30rep/requisicoes_falhas_30rep.png', dpi=300, bbox_inches='tight')
-print("✓ Gráfico 4 salvo: requisicoes_falhas_30rep.png")
-plt.close()
+def grafico_requisicoes_falhas(d, caminho):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    x = np.arange(len(d['cenarios']))
+    width = 0.35
+
+    bars1 = ax.bar(x - width/2, d['total_requisicoes'], width, label='Total de Requisições',
+                   color='#4A90E2', alpha=0.8, edgecolor='black', linewidth=1.2)
+    bars2 = ax.bar(x + width/2, d['total_falhas'], width, label='Total de Falhas',
+                   color='#E74C3C', alpha=0.8, edgecolor='black', linewidth=1.2)
+
+    ax.set_xlabel('Cenário de Teste', fontweight='bold')
+    ax.set_ylabel('Quantidade', fontweight='bold')
+    ax.set_title('Total de Requisições vs Falhas - Média de 30 Repetições', fontweight='bold', pad=20)
+    ax.set_xticks(x)
+    ax.set_xticklabels(d['cenarios'])
+    ax.legend(loc='upper left', fontsize=11)
+    ax.grid(axis='y', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for bar in bars1:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height)}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    for bar in bars2:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height)}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.close()
+
 
 # ====================================================================
 # GRÁFICO 5: Eficiência (Throughput por Usuário)
 # ====================================================================
-fig, ax = plt.subplots(figsize=(10, 6))
+def grafico_eficiencia(d, caminho):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    eficiencia = [t / u for t, u in zip(d['throughput'], d['usuarios'])]
 
-eficiencia = [throughput[i]/usuarios[i] for i in range(len(usuarios))]
+    bars = ax.bar(d['cenarios'], eficiencia, color=['#9B59B6', '#3498DB', '#E67E22'],
+                  alpha=0.8, edgecolor='black', linewidth=1.2)
 
-bars = ax.bar(cenarios, eficiencia, color=['#9B59B6', '#3498DB', '#E67E22'], 
-              alpha=0.8, edgecolor='black', linewidth=1.2)
+    ax.set_xlabel('Cenário de Teste', fontweight='bold')
+    ax.set_ylabel('Requisições por Segundo por Usuário', fontweight='bold')
+    ax.set_title('Eficiência do Sistema - Média de 30 Repetições', fontweight='bold', pad=20)
+    ax.grid(axis='y', alpha=0.3)
 
-ax.set_xlabel('Cenário de Teste', fontweight='bold')
-ax.set_ylabel('Requisições por Segundo por Usuário', fontweight='bold')
-ax.set_title('Eficiência do Sistema - Média de 30 Repetições', fontweight='bold', pad=20)
-ax.grid(axis='y', alpha=0.3)
+    # Adicionar valores nas barras
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.3f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=10)
 
-# Adicionar valores nas barras
-for bar in bars:
-    height = bar.get_height()
-    ax.text(bar.get_x() + bar.get_width()/2., height,
-            f'{height:.3f}',
-            ha='center', va='bottom', fontweight='bold', fontsize=10)
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.close()
 
-plt.tight_layout()
-plt.savefig('graficos_30rep/eficiencia_30rep.png', dpi=300, bbox_inches='tight')
-print("✓ Gráfico 5 salvo: eficiencia_30rep.png")
-plt.close()
 
 # ====================================================================
 # GRÁFICO 6: Comparação de Escalabilidade (Usuários vs Throughput)
 # ====================================================================
-fig, ax = plt.subplots(figsize=(10, 6))
-
-ax.plot(usuarios, throughput, marker='o', linewidth=3, markersize=12, 
-        color='#E74C3C', label='Throughput Real', markeredgecolor='black', markeredgewidth=2)
-
-# Linha de escalabilidade ideal (linear)
-throughput_ideal = [throughput[0] * (u/usuarios[0]) for u in usuarios]
-ax.plot(usuarios, throughput_ideal, linestyle='--', linewidth=2, 
-        color='#2ECC71', alpha=0.7, label='Throughput Ideal (Linear)')
-
-ax.set_xlabel('Número de Usuários', fontweight='bold')
-ax.set_ylabel('Throughput (req/s)', fontweight='bold')
-ax.set_title('Escalabilidade do Sistema - Média de 30 Repetições', fontweight='bold', pad=20)
-ax.legend(loc='upper left', fontsize=11)
-ax.grid(True, alpha=0.3)
-
-# Adicionar valores nos pontos
-for i, (u, t) in enumerate(zip(usuarios, throughput)):
-    ax.annotate(f'{t:.2f} req/s', 
-                xy=(u, t), 
-                xytext=(10, 10), 
-                textcoords='offset points',
-                fontweight='bold',
-                bbox=dict(boxstyle='round,pad=0.5', facecolor='yellow', alpha=0.7))
-
-plt.tight_layout()
-plt.savefig('graficos_30rep/escalabilidade_30rep.png', dpi=300, bbox_inches='tight')
-print("✓ Gráfico 6 salvo: escalabilidade_30rep.png")
-plt.close()
-
-print("\n" + "="*60)
-print("TODOS OS GRÁFICOS FORAM GERADOS COM SUCESSO!")
-print("="*60)
-print(f"Local: graficos_30rep/")
-print("\nArquivos gerados:")
-print("  1. tempos_resposta_30rep.png")
-print("  2. throughput_30rep.png")
-print("  3. taxa_sucesso_30rep.png")
-print("  4. requisicoes_falhas_30rep.png")
-print("  5. eficiencia_30rep.png")
-print("  6. escalabilidade_30rep.png")
+def grafico_escalabilidade(d, caminho):
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    usuarios, throughput = d['usuarios'], d['throughput']
+
+    ax.plot(usuarios, throughput, marker='o', linewidth=3, markersize=12,
+            color='#E74C3C', label='Throughput Real', markeredgecolor='black', markeredgewidth=2)
+
+    # Linha de escalabilidade ideal (linear)
+    throughput_ideal = [throughput[0] * (u/usuarios[0]) for u in usuarios]
+    ax.plot(usuarios, throughput_ideal, linestyle='--', linewidth=2,
+            color='#2ECC71', alpha=0.7, label='Throughput Ideal (Linear)')
+
+    # Curva de saturação medida e joelho (maior degrau sustentável)
+    capacidade = d.get('capacidade')
+    if capacidade:
+        ax.plot(capacidade['usuarios'], capacidade['throughput'], marker='s', linewidth=1.5, markersize=6,
+                color='#3498DB', label='Busca de Capacidade')
+        sustentaveis = [(u, t) for u, t, ok in zip(capacidade['usuarios'], capacidade['throughput'],
+                                                   capacidade['sustentavel']) if ok]
+        if sustentaveis:
+            u_max, t_max = max(sustentaveis)
+            ax.axvline(u_max, color='#3498DB', linestyle=':', linewidth=2,
+                       label=f'Capacidade Máx. Sustentável ({u_max} users, {t_max:.1f} req/s)')
+
+    ax.set_xlabel('Número de Usuários', fontweight='bold')
+    ax.set_ylabel('Throughput (req/s)', fontweight='bold')
+    ax.set_title('Escalabilidade do Sistema - Média de 30 Repetições', fontweight='bold', pad=20)
+    ax.legend(loc='upper left', fontsize=11)
+    ax.grid(True, alpha=0.3)
+
+    # Adicionar valores nos pontos
+    for i, (u, t) in enumerate(zip(usuarios, throughput)):
+        ax.annotate(f'{t:.2f} req/s',
+                    xy=(u, t),
+                    xytext=(10, 10),
+                    textcoords='offset points',
+                    fontweight='bold',
+                    bbox=dict(boxstyle='round,pad=0.5', facecolor='yellow', alpha=0.7))
+
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+# (arquivo, função, dados usados) - os dados usados definem quando o gráfico muda
+GRAFICOS = [
+    ('tempos_resposta_30rep.png', grafico_tempos_resposta, ['cenarios', 'tempo_medio', 'tempo_max']),
+    ('throughput_30rep.png', grafico_throughput, ['cenarios', 'throughput']),
+    ('taxa_sucesso_30rep.png', grafico_taxa_sucesso, ['cenarios', 'taxa_sucesso']),
+    ('requisicoes_falhas_30rep.png', grafico_requisicoes_falhas, ['cenarios', 'total_requisicoes', 'total_falhas']),
+    ('eficiencia_30rep.png', grafico_eficiencia, ['cenarios', 'throughput', 'usuarios']),
+    ('escalabilidade_30rep.png', grafico_escalabilidade, ['usuarios', 'throughput', 'capacidade']),
+]
+
+
+def _assinatura(dados, chaves):
+    conteudo = json.dumps({'versao': VERSAO_GRAFICOS, **{k: dados[k] for k in chaves}}, sort_keys=True)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+def _renderizar(tarefa):
+    funcao, dados, caminho = tarefa
+    funcao(dados, caminho)
+    return caminho
+
+
+def gerar_graficos(dados, pasta=PASTA_GRAFICOS, forcar=False, processos=None):
+    """
+    Renderiza em paralelo os gráficos cujos dados mudaram desde a última
+    execução. Retorna (gerados, reaproveitados).
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminho_cache = os.path.join(pasta, os.path.basename(ARQUIVO_CACHE))
+    try:
+        with open(caminho_cache, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    pendentes, reaproveitados, assinaturas = [], [], {}
+    for arquivo, funcao, chaves in GRAFICOS:
+        caminho = os.path.join(pasta, arquivo)
+        assinaturas[arquivo] = _assinatura(dados, chaves)
+        if not forcar and cache.get(arquivo) == assinaturas[arquivo] and os.path.exists(caminho):
+            reaproveitados.append(arquivo)
+        else:
+            pendentes.append((funcao, dados, caminho))
+
+    if len(pendentes) > 1 and processos != 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            gerados = list(pool.map(_renderizar, pendentes))
+    else:
+        gerados = [_renderizar(t) for t in pendentes]
+
+    if gerados:
+        temporario = caminho_cache + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(assinaturas, f, indent=1)
+        os.replace(temporario, caminho_cache)
+
+    return [os.path.basename(g) for g in gerados], reaproveitados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera os gráficos das 30 repetições a partir dos resultados.")
+    parser.add_argument('--forcar', action='store_true', help="renderiza todos os gráficos, mesmo sem mudanças")
+    parser.add_argument('--processos', type=int, help="processos de renderização (padrão: um por núcleo)")
+    args = parser.parse_args()
+
+    print("Gerando gráficos das 30 repetições...")
+
+    dados = carregar_dados()
+    gerados, reaproveitados = gerar_graficos(dados, forcar=args.forcar, processos=args.processos)
+
+    for i, (arquivo, _, _) in enumerate(GRAFICOS, start=1):
+        if arquivo in gerados:
+            print(f"✓ Gráfico {i} salvo: {arquivo}")
+        else:
+            print(f"• Gráfico {i} sem mudanças: {arquivo}")
+
+    print("\n" + "="*60)
+    print("TODOS OS GRÁFICOS ESTÃO ATUALIZADOS!")
+    print("="*60)
+    print(f"Local: {PASTA_GRAFICOS}/")
+    print(f"\n{len(gerados)} gerados, {len(reaproveitados)} reaproveitados")
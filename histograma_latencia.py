@@ -0,0 +1,100 @@
+"""
+Histogramas de latência mescláveis entre execuções.
+
+O Locust já guarda, para cada endpoint, um histograma em
+StatsEntry.response_times: {tempo arredondado em ms: ocorrências}, com
+arredondamento de 2 dígitos significativos (exato até 100 ms, passos de 10 ms
+até 1 s, de 100 ms até 10 s, de 1 s acima disso). O número de chaves é
+limitado independentemente do número de requisições, então somar os
+histogramas de várias execuções dá os percentis exatos (na resolução do
+arredondamento) do conjunto completo, sem média de médias.
+
+Como no RequestStats do Locust, cada histograma é identificado por
+(método, nome): o mesmo nome com métodos diferentes são entradas distintas.
+O agregado fica em AGREGADO.
+"""
+import glob
+import json
+import math
+import os
+
+VERSAO = 2
+AGREGADO = ('', 'Aggregated')
+SUFIXO = '_latencias.json'
+PERCENTIS = [0.50, 0.95, 0.99, 0.999]
+
+
+def exportar(stats, caminho):
+    """Grava os histogramas de cada endpoint e do agregado de um RequestStats."""
+    endpoints = [
+        {'metodo': metodo, 'nome': nome, 'hist': {str(ms): n for ms, n in entrada.response_times.items()}}
+        for (nome, metodo), entrada in stats.entries.items()
+    ]
+    endpoints.append({'metodo': AGREGADO[0], 'nome': AGREGADO[1],
+                      'hist': {str(ms): n for ms, n in stats.total.response_times.items()}})
+
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao': VERSAO, 'endpoints': endpoints}, f)
+    os.replace(temporario, caminho)
+
+
+def carregar(caminho):
+    """
+    Lê um arquivo exportado: {(método, nome): {ms: ocorrências}}. Arquivos da
+    versão 1 (só pelo nome) ficam com método vazio.
+    """
+    with open(caminho, encoding='utf-8') as f:
+        dados = json.load(f)
+    if dados.get('versao', 1) == 1:
+        return {('', nome): {int(ms): n for ms, n in hist.items()} for nome, hist in dados['endpoints'].items()}
+    return {(e['metodo'], e['nome']): {int(ms): n for ms, n in e['hist'].items()} for e in dados['endpoints']}
+
+
+def mesclar(destino, origem):
+    """Soma os histogramas de origem em destino (no lugar) e retorna destino."""
+    for nome, hist in origem.items():
+        acumulado = destino.setdefault(nome, {})
+        for ms, n in hist.items():
+            acumulado[ms] = acumulado.get(ms, 0) + n
+    return destino
+
+
+def diferenca(atual, anterior):
+    """Histograma das ocorrências entre dois instantâneos de um mesmo histograma acumulado."""
+    return {ms: n - anterior.get(ms, 0) for ms, n in atual.items() if n > anterior.get(ms, 0)}
+
+
+def mesclar_arquivos(arquivos):
+    """
+    Mescla os histogramas de vários arquivos, um de cada vez. Entradas de
+    arquivos da versão 1 (sem método) vão para a entrada de mesmo nome
+    quando só um método usa esse nome.
+    """
+    mesclado = {}
+    for arquivo in arquivos:
+        mesclar(mesclado, carregar(arquivo))
+    for chave in [c for c in mesclado if c[0] == '' and c != AGREGADO]:
+        com_metodo = [c for c in mesclado if c[1] == chave[1] and c[0]]
+        if len(com_metodo) == 1:
+            mesclar(mesclado, {com_metodo[0]: mesclado.pop(chave)})
+    return mesclado
+
+
+def percentil(hist, q):
+    """Percentil q (0-1) de um histograma {ms: ocorrências}, no critério do Locust."""
+    total = sum(hist.values())
+    if total == 0:
+        return math.nan
+    alvo = total - int(total * q)
+    acumulado = 0
+    for ms in sorted(hist, reverse=True):
+        acumulado += hist[ms]
+        if acumulado >= alvo:
+            return ms
+    return math.nan
+
+
+def arquivos_cenario(cenario, pasta='results'):
+    """Arquivos de histograma das repetições de um cenário."""
+    return sorted(glob.glob(os.path.join(pasta, f"{cenario}_*{SUFIXO}")))
@@ -0,0 +1,228 @@
+"""
+Armazenamento colunar dos *_stats_history.csv de todas as repetições.
+
+Cada coluna numérica do histórico vira um arquivo .npy em results/historico/
+(lido com mmap), e um índice JSON guarda, para cada (cenário, repetição), o
+intervalo de linhas correspondente. Assim, "p95 ao longo do tempo das 30
+execuções do pico" é apenas uma fatia de um array mapeado em memória.
+
+Só os CSVs novos ou alterados (mtime/tamanho no índice) são lidos de novo.
+
+Uso:
+    python historico_colunar.py            # lê só os CSVs novos ou alterados
+    python historico_colunar.py --forcar   # reconstrói sempre
+"""
+import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+PASTA_RESULTADOS = 'results'
+PASTA_HISTORICO = os.path.join(PASTA_RESULTADOS, 'historico')
+VERSAO = 1
+
+PADRAO_ARQUIVO = re.compile(r'^(?P<cenario>[a-z]+)_(?P<repeticao>\d+)_stats_history\.csv$')
+
+COLUNAS_INTEIRAS = [
+    'Timestamp',
+    'User Count',
+    'Total Request Count',
+    'Total Failure Count',
+]
+COLUNAS_REAIS = [
+    'Requests/s',
+    'Failures/s',
+    '50%', '66%', '75%', '80%', '90%', '95%', '98%', '99%', '99.9%', '99.99%', '100%',
+    'Total Median Response Time',
+    'Total Average Response Time',
+    'Total Min Response Time',
+    'Total Max Response Time',
+    'Total Average Content Size',
+]
+COLUNAS = COLUNAS_INTEIRAS + COLUNAS_REAIS
+
+
+def _nome_arquivo_coluna(coluna):
+    """'99.9%' -> 'p99_9.npy', 'User Count' -> 'user_count.npy'"""
+    if coluna.endswith('%'):
+        return 'p' + coluna[:-1].replace('.', '_') + '.npy'
+    return re.sub(r'[^a-z0-9]+', '_', coluna.lower()).strip('_') + '.npy'
+
+
+def _assinatura(arquivo):
+    st = os.stat(arquivo)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def localizar_historicos(pasta=PASTA_RESULTADOS):
+    """Retorna [(cenario, repeticao, arquivo)] ordenado por cenário e repetição."""
+    encontrados = []
+    for arquivo in glob.glob(os.path.join(pasta, '*_stats_history.csv')):
+        m = PADRAO_ARQUIVO.match(os.path.basename(arquivo))
+        if m:
+            encontrados.append((m.group('cenario'), int(m.group('repeticao')), arquivo))
+    return sorted(encontrados)
+
+
+def ler_historico(arquivo):
+    """Lê um *_stats_history.csv com colunas tipadas ("N/A" vira NaN)."""
+    dtypes = {c: 'float64' for c in COLUNAS_REAIS}
+    dtypes.update({c: 'int64' for c in COLUNAS_INTEIRAS})
+    dtypes['Name'] = 'str'
+    return pd.read_csv(arquivo, usecols=COLUNAS + ['Name'], dtype=dtypes, na_values=['N/A'])
+
+
+def construir_historico(pasta=PASTA_RESULTADOS, destino=PASTA_HISTORICO, forcar=False, processos=None):
+    """
+    Converte os históricos da pasta no armazenamento colunar, lendo só os
+    CSVs novos ou com mtime/tamanho diferentes dos gravados no índice; as
+    linhas das demais execuções são copiadas das colunas já gravadas (cópia
+    binária, sem parse). Execuções cujo CSV sumiu saem do armazenamento.
+    Retorna True quando o armazenamento foi regravado.
+    """
+    historicos = localizar_historicos(pasta)
+    assinaturas = {arquivo: _assinatura(arquivo) for _, _, arquivo in historicos}
+
+    caminho_indice = os.path.join(destino, 'indice.json')
+    indice = None
+    if not forcar and os.path.exists(caminho_indice):
+        with open(caminho_indice, encoding='utf-8') as f:
+            indice = json.load(f)
+        if indice.get('versao') != VERSAO:
+            indice = None
+    if indice is not None and {e['arquivo']: e['assinatura'] for e in indice['execucoes']} == assinaturas:
+        return False
+
+    # Execuções já gravadas cujo CSV não mudou
+    anteriores = {e['arquivo']: e for e in (indice['execucoes'] if indice else [])
+                  if e['assinatura'] == assinaturas.get(e['arquivo'])}
+    pendentes = [arquivo for _, _, arquivo in historicos if arquivo not in anteriores]
+    if len(pendentes) > 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            tabelas = dict(zip(pendentes, pool.map(ler_historico, pendentes, chunksize=4)))
+    else:
+        tabelas = {a: ler_historico(a) for a in pendentes}
+
+    # Os códigos de nome já gravados continuam valendo; nomes novos vão para o fim
+    nomes = list(indice['nomes']) if anteriores else []
+    for df in tabelas.values():
+        nomes += [nome for nome in sorted(df['Name'].unique()) if nome not in nomes]
+    codigo_nome = {nome: i for i, nome in enumerate(nomes)}
+    gravado = HistoricoColunar(destino) if anteriores else None
+
+    execucoes = []
+    inicio = 0
+    for cenario, repeticao, arquivo in historicos:
+        linhas = (anteriores[arquivo]['fim'] - anteriores[arquivo]['inicio'] if arquivo in anteriores
+                  else len(tabelas[arquivo]))
+        execucoes.append({
+            'cenario': cenario,
+            'repeticao': repeticao,
+            'arquivo': arquivo,
+            'assinatura': assinaturas[arquivo],
+            'inicio': inicio,
+            'fim': inicio + linhas,
+        })
+        inicio += linhas
+
+    def partes(coluna, tipo):
+        for _, _, arquivo in historicos:
+            if arquivo in anteriores:
+                e = anteriores[arquivo]
+                yield gravado.coluna(coluna)[e['inicio']:e['fim']]
+            elif coluna == 'Name':
+                yield tabelas[arquivo]['Name'].map(codigo_nome).to_numpy(tipo)
+            else:
+                yield tabelas[arquivo][coluna].to_numpy(tipo)
+
+    os.makedirs(destino, exist_ok=True)
+    for coluna in COLUNAS + ['Name']:
+        tipo = np.int16 if coluna == 'Name' else np.int64 if coluna in COLUNAS_INTEIRAS else np.float64
+        dados = np.concatenate(list(partes(coluna, tipo))) if historicos else np.empty(0, tipo)
+        arquivo = os.path.join(destino, 'nome.npy' if coluna == 'Name' else _nome_arquivo_coluna(coluna))
+        # Temporário + replace: as colunas antigas ainda estão mapeadas em memória
+        temporario = arquivo[:-len('.npy')] + '.tmp.npy'
+        np.save(temporario, dados)
+        os.replace(temporario, arquivo)
+
+    # O índice é gravado por último: só existe se as colunas estiverem completas
+    temporario = caminho_indice + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao': VERSAO, 'colunas': COLUNAS, 'nomes': nomes, 'execucoes': execucoes}, f, indent=1)
+    os.replace(temporario, caminho_indice)
+    return True
+
+
+class HistoricoColunar:
+    """
+    Leitura do armazenamento colunar. As colunas são abertas sob demanda com
+    np.load(mmap_mode='r'), então uma fatia não lê o restante do arquivo.
+    """
+
+    def __init__(self, destino=PASTA_HISTORICO):
+        self.destino = destino
+        with open(os.path.join(destino, 'indice.json'), encoding='utf-8') as f:
+            indice = json.load(f)
+        self.colunas = indice['colunas']
+        self.nomes = indice['nomes']
+        self.execucoes = indice['execucoes']
+        self._abertas = {}
+
+    def coluna(self, coluna):
+        """Array mapeado em memória com a coluna inteira (todas as execuções)."""
+        if coluna not in self._abertas:
+            arquivo = 'nome.npy' if coluna == 'Name' else _nome_arquivo_coluna(coluna)
+            self._abertas[coluna] = np.load(os.path.join(self.destino, arquivo), mmap_mode='r')
+        return self._abertas[coluna]
+
+    def cenarios(self):
+        return sorted({e['cenario'] for e in self.execucoes})
+
+    def repeticoes(self, cenario):
+        return [e['repeticao'] for e in self.execucoes if e['cenario'] == cenario]
+
+    def serie(self, cenario, repeticao, coluna, nome='Aggregated'):
+        """Série temporal de uma coluna para uma execução."""
+        for e in self.execucoes:
+            if e['cenario'] == cenario and e['repeticao'] == repeticao:
+                return self._fatiar(e, coluna, nome)
+        raise KeyError(f"{cenario}_{repeticao} não está no histórico")
+
+    def series(self, cenario, coluna, nome='Aggregated'):
+        """{repetição: série} de uma coluna para todas as execuções do cenário."""
+        return {e['repeticao']: self._fatiar(e, coluna, nome)
+                for e in self.execucoes if e['cenario'] == cenario}
+
+    def _fatiar(self, execucao, coluna, nome):
+        fatia = slice(execucao['inicio'], execucao['fim'])
+        dados = self.coluna(coluna)[fatia]
+        if nome is None or len(self.nomes) == 1:
+            return dados
+        mascara = self.coluna('Name')[fatia] == self.nomes.index(nome)
+        return dados if mascara.all() else dados[mascara]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converte os *_stats_history.csv em armazenamento colunar.")
+    parser.add_argument('--forcar', action='store_true', help="reconstrói mesmo sem mudanças nos CSVs")
+    args = parser.parse_args()
+
+    if not os.path.exists(PASTA_RESULTADOS):
+        print("❌ ERRO: Pasta 'results' não encontrada!")
+        exit(1)
+
+    if construir_historico(forcar=args.forcar):
+        print(f"✓ Histórico colunar gravado em: {PASTA_HISTORICO}")
+    else:
+        print("✓ Histórico colunar já está atualizado")
+
+    historico = HistoricoColunar()
+    for cenario in historico.cenarios():
+        repeticoes = historico.repeticoes(cenario)
+        linhas = sum(len(s) for s in historico.series(cenario, 'Timestamp').values())
+        print(f"  • {cenario}: {len(repeticoes)} execuções, {linhas} amostras")
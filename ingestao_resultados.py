@@ -0,0 +1,146 @@
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Colunas do *_stats.csv realmente usadas no processamento
+COLUNAS_STATS = [
+    'Type',
+    'Name',
+    'Request Count',
+    'Failure Count',
+    'Median Response Time',
+    'Average Response Time',
+    'Max Response Time',
+    'Average Content Size',
+    'Requests/s',
+    '95%',
+]
+
+# Cache dos agregados por arquivo, invalidado por mtime/tamanho
+ARQUIVO_CACHE = os.path.join('results', '.cache_agregados.json')
+VERSAO_CACHE = 4
+
+# Abaixo disso o custo de subir o pool de processos não compensa
+MIN_ARQUIVOS_PARALELO = 8
+
+
+def arquivos_cenario(cenario, pasta='results'):
+    """Lista os *_stats.csv das repetições de um cenário."""
+    return sorted(glob.glob(os.path.join(pasta, f"{cenario}_*_stats.csv")))
+
+
+def ler_stats(arquivo):
+    """
+    Lê apenas as colunas necessárias de um *_stats.csv e retorna
+    {'agregado': linha "Aggregated" (ou None), 'endpoints': {(método, nome): linha}}.
+    O método entra na chave para dois métodos no mesmo caminho não se misturarem.
+    """
+    df = pd.read_csv(arquivo, usecols=COLUNAS_STATS)
+    df['Type'] = df['Type'].fillna('')
+    linhas = {
+        (tipo, nome): {coluna: float(valor) for coluna, valor in zip(COLUNAS_STATS[2:], valores)}
+        for tipo, nome, *valores in df[COLUNAS_STATS].itertuples(index=False)
+    }
+    return {'agregado': linhas.pop(('', 'Aggregated'), None), 'endpoints': linhas}
+
+
+def ler_agregado(arquivo):
+    """Linha "Aggregated" de um *_stats.csv como dicionário (ou None se ela não existir)."""
+    return ler_stats(arquivo)['agregado']
+
+
+def _ler_stats_seguro(arquivo):
+    """Versão para o pool de processos: devolve o erro em vez de propagar."""
+    try:
+        return arquivo, ler_stats(arquivo), None
+    except Exception as e:
+        return arquivo, None, str(e)
+
+
+def _assinatura(arquivo):
+    st = os.stat(arquivo)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _para_cache(stats):
+    """JSON não aceita tupla como chave: endpoints viram [[método, nome, linha], ...]."""
+    return {'agregado': stats['agregado'],
+            'endpoints': [[tipo, nome, linha] for (tipo, nome), linha in stats['endpoints'].items()]}
+
+
+def _do_cache(stats):
+    return {'agregado': stats['agregado'],
+            'endpoints': {(tipo, nome): linha for tipo, nome, linha in stats['endpoints']}}
+
+
+def _carregar_cache(caminho):
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('versao') != VERSAO_CACHE:
+        return {}
+    return cache.get('arquivos', {})
+
+
+def _salvar_cache(caminho, entradas):
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao': VERSAO_CACHE, 'arquivos': entradas}, f)
+    os.replace(temporario, caminho)
+
+
+def carregar_stats(arquivos, cache=ARQUIVO_CACHE, processos=None):
+    """
+    Retorna ({arquivo: ler_stats(arquivo)}, {arquivo: erro}, [arquivos lidos do disco]).
+
+    Arquivos com mtime/tamanho iguais aos do cache não são lidos de novo; os
+    demais são lidos em paralelo (ProcessPoolExecutor) quando são muitos.
+    """
+    entradas = _carregar_cache(cache) if cache else {}
+    dados = {}
+    erros = {}
+    pendentes = []
+
+    for arquivo in arquivos:
+        entrada = entradas.get(arquivo)
+        if entrada is not None and entrada['assinatura'] == _assinatura(arquivo):
+            dados[arquivo] = _do_cache(entrada['stats'])
+        else:
+            pendentes.append(arquivo)
+
+    if len(pendentes) >= MIN_ARQUIVOS_PARALELO and processos != 1:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            lidos = list(pool.map(_ler_stats_seguro, pendentes, chunksize=4))
+    else:
+        lidos = [_ler_stats_seguro(arquivo) for arquivo in pendentes]
+
+    for arquivo, stats, erro in lidos:
+        if erro is not None:
+            erros[arquivo] = erro
+            continue
+        dados[arquivo] = stats
+        entradas[arquivo] = {'assinatura': _assinatura(arquivo), 'stats': _para_cache(stats)}
+
+    if cache and pendentes:
+        # Descarta entradas de arquivos que não existem mais
+        entradas = {a: e for a, e in entradas.items() if os.path.exists(a)}
+        _salvar_cache(cache, entradas)
+
+    return dados, erros, pendentes
+
+
+def carregar_agregados(arquivos, cache=ARQUIVO_CACHE, processos=None):
+    """Como carregar_stats, mas só com a linha "Aggregated" de cada arquivo."""
+    dados, erros, pendentes = carregar_stats(arquivos, cache, processos)
+    return {a: d['agregado'] for a, d in dados.items()}, erros, pendentes
+
+
+def carregar_endpoints(arquivos, cache=ARQUIVO_CACHE, processos=None):
+    """Como carregar_stats, mas só com as linhas por endpoint: {arquivo: {(método, nome): linha}}."""
+    dados, erros, pendentes = carregar_stats(arquivos, cache, processos)
+    return {a: d['endpoints'] for a, d in dados.items()}, erros, pendentes
@@ -1,10 +1,26 @@
-from locust import HttpUser, task, between
+from locust import HttpUser, FastHttpUser, task, between, events
+from locust.runners import WorkerRunner
 import random
 import json
 import logging
+import logging.handlers
+import queue
+import re
+import time
 from datetime import datetime
 from colorama import Fore, Style, init
 import os
+import atexit
+from array import array
+from gevent.lock import Semaphore
+
+import histograma_latencia
+import exportador_metricas
+import controle_parada
+import analisar_falhas
+import analisar_payload
+import monitor_gerador
+import trace_carga
 
 # Inicializa cores no terminal
 init(autoreset=True)
@@ -14,23 +30,120 @@ LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, f"locust_petclinic_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 
+# === Configuração do pipeline de log (variáveis de ambiente) ===
+# LOG_MODO=fila      -> handlers rodam fora do caminho da requisição (fila limitada)
+# LOG_MODO=sincrono  -> comportamento antigo: escrita direta no arquivo e terminal
+LOG_MODO = os.getenv("LOG_MODO", "fila")
+LOG_NIVEL = os.getenv("LOG_NIVEL", "INFO").upper()
+LOG_FILA_MAX = int(os.getenv("LOG_FILA_MAX", "10000"))           # registros pendentes antes de descartar
+LOG_LOTE = int(os.getenv("LOG_LOTE", "500"))                     # linhas por escrita no arquivo
+LOG_FLUSH_S = float(os.getenv("LOG_FLUSH_S", "2"))               # intervalo máximo entre escritas
+LOG_AMOSTRA_SUCESSO = float(os.getenv("LOG_AMOSTRA_SUCESSO", "0.01"))  # fração das linhas de sucesso registradas
+LOG_CONSOLE_MAX_S = float(os.getenv("LOG_CONSOLE_MAX_S", "5"))   # linhas/s no terminal (0 = sem limite)
+
+
+class _FilaLimitadaHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloqueia: com a fila cheia o registro é descartado e contado.
+    A formatação fica para o listener, fora do caminho da requisição.
+    """
+
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+
+class _LoteArquivoHandler(logging.FileHandler):
+    """
+    FileHandler que acumula as linhas formatadas e grava em lotes:
+    uma escrita a cada LOG_LOTE linhas, a cada LOG_FLUSH_S segundos ou em erros.
+    """
+
+    def __init__(self, filename, lote, intervalo, encoding="utf-8"):
+        super().__init__(filename, encoding=encoding)
+        self.lote = lote
+        self.intervalo = intervalo
+        self._buffer = []
+        self._ultimo_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if (len(self._buffer) >= self.lote
+                or record.levelno >= logging.ERROR
+                or time.monotonic() - self._ultimo_flush >= self.intervalo):
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer:
+                # o Locust fecha os handlers existentes ao configurar o logging;
+                # assim como o FileHandler, reabre o arquivo quando necessário
+                if self.stream is None:
+                    self.stream = self._open()
+                self.stream.write("".join(self._buffer))
+                self._buffer.clear()
+            super().flush()
+            self._ultimo_flush = time.monotonic()
+        finally:
+            self.release()
+
+
+class _LimiteTaxaFilter(logging.Filter):
+    """Token bucket para o terminal: ERROR e CRITICAL sempre passam."""
+
+    def __init__(self, por_segundo):
+        super().__init__()
+        self.por_segundo = por_segundo
+        self._fichas = por_segundo
+        self._ultimo = time.monotonic()
+        self.suprimidos = 0
+
+    def filter(self, record):
+        if self.por_segundo <= 0 or record.levelno >= logging.ERROR:
+            return True
+        agora = time.monotonic()
+        self._fichas = min(self.por_segundo, self._fichas + (agora - self._ultimo) * self.por_segundo)
+        self._ultimo = agora
+        if self._fichas >= 1:
+            self._fichas -= 1
+            return True
+        self.suprimidos += 1
+        return False
+
 
 def setup_logger():
     """
     Configura e retorna um logger que grava em arquivo e no terminal (colorido).
-    Evita múltiplos handlers duplicados.
+    No modo "fila" o logger só enfileira; um QueueListener grava em lotes no
+    arquivo e limita a taxa do terminal. Evita múltiplos handlers duplicados.
     """
     logger = logging.getLogger("PetClinicLogger")
-    logger.setLevel(logging.INFO)
+    logger.setLevel(getattr(logging, LOG_NIVEL, logging.INFO))
 
     if not logger.handlers:
         # Formato de log
         formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
 
         # Handler para arquivo
-        file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+        if LOG_MODO == "sincrono":
+            file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+        else:
+            file_handler = _LoteArquivoHandler(LOG_FILE, LOG_LOTE, LOG_FLUSH_S)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
 
         # Handler para terminal (colorido)
         class ColorFormatter(logging.Formatter):
@@ -49,52 +162,258 @@ def setup_logger():
 
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(ColorFormatter("%(asctime)s [%(levelname)s] %(message)s"))
-        logger.addHandler(console_handler)
+        console_handler.addFilter(_LimiteTaxaFilter(LOG_CONSOLE_MAX_S))
+
+        if LOG_MODO == "sincrono":
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
+        else:
+            fila_handler = _FilaLimitadaHandler(queue.Queue(maxsize=LOG_FILA_MAX))
+            listener = logging.handlers.QueueListener(
+                fila_handler.queue, file_handler, console_handler, respect_handler_level=True
+            )
+            listener.start()
+            fila_handler.listener = listener
+            logger.addHandler(fila_handler)
 
     return logger
 
 
+def encerrar_logger():
+    """Esvazia a fila de log e grava o último lote (idempotente)."""
+    for handler in list(logger.handlers):
+        listener = getattr(handler, "listener", None)
+        if listener is None:
+            continue
+        handler.listener = None
+        listener.stop()
+        # Linhas registradas depois disso (ex.: outros listeners de quitting)
+        # vão direto para os destinos
+        logger.removeHandler(handler)
+        for destino in listener.handlers:
+            logger.addHandler(destino)
+        if handler.descartados:
+            logger.warning(f"{handler.descartados} linhas de log descartadas (fila cheia)")
+        for destino in listener.handlers:
+            destino.flush()
+
+
+def separar_log_do_worker():
+    """
+    Nos workers (--processes / --worker) cada processo passa a gravar no seu
+    próprio arquivo e com fila e listener próprios. Com --processes o
+    locustfile é importado antes do fork, então o que veio do processo pai
+    (linhas pendentes, fila e greenlet do listener) é descartado aqui.
+    """
+    base, ext = os.path.splitext(LOG_FILE)
+    arquivo_worker = f"{base}_worker{os.getpid()}{ext}"
+
+    for handler in list(logger.handlers):
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            # O listener herdado fica parado na fila antiga, sem stop(): a
+            # thread copiada no fork não pode terminar nem ser juntada (o
+            # threading falha com KeyError em _delete). As linhas pendentes do
+            # pai saem da fila para ele não gravá-las no arquivo do worker.
+            while not handler.queue.empty():
+                handler.queue.get_nowait()
+        destinos = listener.handlers if listener else (handler,)
+        for destino in destinos:
+            if isinstance(destino, logging.FileHandler):
+                destino.acquire()
+                try:
+                    if isinstance(destino, _LoteArquivoHandler):
+                        destino._buffer.clear()
+                    if destino.stream:
+                        destino.stream.close()
+                    destino.stream = None
+                    destino.baseFilename = os.path.abspath(arquivo_worker)
+                finally:
+                    destino.release()
+        if listener is not None:
+            handler.queue = queue.Queue(maxsize=LOG_FILA_MAX)
+            handler.descartados = 0
+            handler.listener = logging.handlers.QueueListener(
+                handler.queue, *listener.handlers, respect_handler_level=True
+            )
+            handler.listener.start()
+
+
+def log_sucesso(msg, *args):
+    """
+    Registra uma linha de sucesso por requisição, respeitando o nível do logger
+    e a amostragem LOG_AMOSTRA_SUCESSO. Os argumentos só são formatados se a
+    linha for de fato registrada.
+    """
+    if LOG_AMOSTRA_SUCESSO < 1 and random.random() >= LOG_AMOSTRA_SUCESSO:
+        return
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(msg, *args)
+
+
 # Instancia o logger global
 logger = setup_logger()
+atexit.register(encerrar_logger)
+
+# Métricas ao vivo (METRICAS_PORTA / METRICAS_ARQUIVO); sem custo de E/S por requisição
+exportador_metricas.registrar(events, logger)
+# Parada por convergência / aborto por falhas (PARADA_ADAPTATIVA, ABORTO_TAXA_FALHA)
+controle_parada.registrar(events, logger)
+
 
+@events.init.add_listener
+def _ao_iniciar(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        separar_log_do_worker()
 
-class PetClinicUser(HttpUser):
+
+def caminho_artefato(environment, sufixo):
+    """
+    Caminho de um arquivo extra da execução ao lado dos CSVs do Locust
+    (ex.: results/pico_3 + "_latencias.json"). None se rodando sem --csv.
+    """
+    prefixo = getattr(environment.parsed_options, "csv_prefix", None) if environment.parsed_options else None
+    return f"{prefixo}{sufixo}" if prefixo else None
+
+
+# Falhas por segundo, endpoint e assinatura ({prefixo}_falhas_tempo.csv)
+analisar_falhas.registrar(events, caminho_artefato)
+# Bytes, latência e owners da lista por segundo ({prefixo}_payload.csv)
+analisar_payload.registrar(events, caminho_artefato)
+# CPU, memória, lag do loop e atraso de agendamento do gerador ({prefixo}_gerador.csv)
+monitor_gerador.registrar(events, caminho_artefato)
+
+
+@events.quitting.add_listener
+def _ao_encerrar(environment, **kwargs):
+    # Nos workers as estatísticas são parciais; o master/local exporta o total
+    caminho = caminho_artefato(environment, histograma_latencia.SUFIXO)
+    if caminho and not isinstance(environment.runner, WorkerRunner):
+        histograma_latencia.exportar(environment.stats, caminho)
+        logger.info(f"Histogramas de latência salvos em {caminho}")
+    encerrar_logger()
+
+
+class PoolOwnerIds:
+    """
+    Pool de IDs de owners compartilhado por todos os usuários virtuais do processo.
+    Os IDs ficam em um array("q") (8 bytes por ID) e o sorteio é O(1).
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.semeado = False
+        self._trava = Semaphore()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def semear(self, carregar):
+        """
+        Executa carregar() uma única vez por processo. Os usuários que chegam
+        durante a carga aguardam a trava em vez de repetir o GET da lista.
+        """
+        if self.semeado:
+            return
+        with self._trava:
+            if self.semeado:
+                return
+            self.ids.extend(carregar())
+            self.semeado = len(self.ids) > 0
+
+    def adicionar(self, owner_id):
+        self.ids.append(owner_id)
+
+    def sortear(self):
+        return self.ids[random.randrange(len(self.ids))]
+
+
+# Pool único por processo (cada worker do Locust tem o seu)
+POOL_OWNERS = PoolOwnerIds()
+
+# === Perfil do cliente HTTP ===
+# PERFIL_CLIENTE=padrao -> HttpUser (requests), como nas campanhas já realizadas
+# PERFIL_CLIENTE=rapido -> FastHttpUser (geventhttpclient), pool de conexões
+#                          limitado e extração do ID sem decodificar o JSON
+PERFIS_CLIENTE = {"padrao": HttpUser, "rapido": FastHttpUser}
+PERFIL_CLIENTE = os.getenv("PERFIL_CLIENTE", "padrao")
+CONEXOES_MAX = int(os.getenv("CONEXOES_MAX", "10"))   # conexões por usuário (perfil rapido)
+
+if PERFIL_CLIENTE not in PERFIS_CLIENTE:
+    raise ValueError(f"PERFIL_CLIENTE inválido: {PERFIL_CLIENTE} (use {' ou '.join(PERFIS_CLIENTE)})")
+
+_ID_JSON = re.compile(rb'"id"\s*:\s*(\d+)')
+
+
+def id_owner_criado(conteudo):
+    """
+    ID do owner devolvido pelo POST. Um owner recém-criado não tem pets, então
+    o corpo tem um único campo "id" e basta uma busca no corpo bruto.
+    """
+    encontrado = _ID_JSON.search(conteudo)
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def motivo_falha(response):
+    """
+    O que passar ao response.failure(): sem resposta (status 0) é a exceção
+    do cliente (recusa, timeout, reset), para o analisar_falhas separar as
+    causas; com resposta, "Status N".
+    """
+    erro = getattr(response, "error", None)
+    if response.status_code == 0 and erro is not None:
+        return erro
+    return f"Status {response.status_code}"
+
+
+class PetClinicUser(PERFIS_CLIENTE[PERFIL_CLIENTE]):
     """
     Simula um usuário acessando o Spring PetClinic.
     """
 
     wait_time = between(1, 3)
-    owner_ids = []
+    owner_ids = POOL_OWNERS
+
+    # Usados apenas pelo FastHttpUser (perfil rapido)
+    concurrency = CONEXOES_MAX
 
     def on_start(self):
         """Executado quando cada usuário virtual inicia."""
+        self.owner_ids.semear(self._carregar_owner_ids)
+
+    def _carregar_owner_ids(self):
+        """Busca a lista completa de owners e retorna seus IDs."""
         try:
             response = self.client.get("/api/customer/owners")
             if response.status_code == 200:
-                owners = response.json()
-                self.owner_ids = [owner['id'] for owner in owners if 'id' in owner]
-                msg = f"{len(self.owner_ids)} owners carregados para teste"
+                # json.loads direto dos bytes evita a decodificação para texto
+                owners = json.loads(response.content) if PERFIL_CLIENTE == "rapido" else response.json()
+                ids = [owner['id'] for owner in owners if 'id' in owner]
+                msg = f"{len(ids)} owners carregados para teste"
                 print(Fore.GREEN + "✓ " + msg)
                 logger.info(msg)
+                return ids
             else:
                 msg = f"Falha ao carregar owners. Status: {response.status_code}"
                 print(Fore.RED + "✗ " + msg)
                 logger.warning(msg)
+                return []
         except Exception as e:
             msg = f"Erro ao carregar owners: {e}"
             print(Fore.YELLOW + "⚠ " + msg)
             logger.error(msg)
-            self.owner_ids = list(range(1, 11))
+            return list(range(1, 11))
 
     @task(40)
     def get_owners_list(self):
         """GET /api/customer/owners - Lista todos os donos"""
+        trace_carga.gravar(self, trace_carga.LISTA)
         with self.client.get("/api/customer/owners", catch_response=True, name="GET /owners (lista)") as response:
             if response.status_code == 200:
                 response.success()
-                logger.info("GET /owners (lista) - sucesso")
+                log_sucesso("GET /owners (lista) - sucesso")
             else:
-                response.failure(f"Status {response.status_code}")
+                response.failure(motivo_falha(response))
                 logger.warning(f"GET /owners (lista) - falha: {response.status_code}")
 
     @task(30)
@@ -104,35 +423,46 @@ class PetClinicUser(HttpUser):
             logger.warning("Lista de owner_ids vazia, pulando tarefa get_owner_by_id.")
             return
 
-        owner_id = random.choice(self.owner_ids)
+        owner_id = self.owner_ids.sortear()
+        trace_carga.gravar(self, trace_carga.OWNER, owner_id)
+        self.buscar_owner(owner_id)
+
+    def buscar_owner(self, owner_id):
+        """GET /api/customer/owners/{id} de um owner já escolhido (também usado no replay)"""
         with self.client.get(f"/api/customer/owners/{owner_id}",
                              catch_response=True,
                              name="GET /owners/{id}") as response:
             if response.status_code == 200:
                 response.success()
-                logger.info(f"GET /owners/{owner_id} - sucesso")
+                log_sucesso("GET /owners/%s - sucesso", owner_id)
             elif response.status_code == 404:
                 response.failure("Owner não encontrado")
                 logger.warning(f"GET /owners/{owner_id} - não encontrado (404)")
             else:
-                response.failure(f"Status {response.status_code}")
+                response.failure(motivo_falha(response))
                 logger.error(f"GET /owners/{owner_id} - erro {response.status_code}")
 
     @task(20)
     def get_vets(self):
         """GET /api/vet/vets - Lista todos os veterinários"""
+        trace_carga.gravar(self, trace_carga.VETS)
         with self.client.get("/api/vet/vets", catch_response=True, name="GET /vets") as response:
             if response.status_code == 200:
                 response.success()
-                logger.info("GET /vets - sucesso")
+                log_sucesso("GET /vets - sucesso")
             else:
-                response.failure(f"Status {response.status_code}")
+                response.failure(motivo_falha(response))
                 logger.warning(f"GET /vets - falha {response.status_code}")
 
     @task(10)
     def create_owner(self):
         """POST /api/customer/owners - Cria um novo dono"""
         random_id = random.randint(10000, 99999)
+        trace_carga.gravar(self, trace_carga.CRIAR, random_id)
+        self.criar_owner(random_id)
+
+    def criar_owner(self, random_id):
+        """POST /api/customer/owners com o corpo derivado de random_id (também usado no replay)"""
         new_owner = {
             "firstName": f"Teste{random_id}",
             "lastName": f"Silva{random_id}",
@@ -147,14 +477,21 @@ class PetClinicUser(HttpUser):
                               name="POST /owners (criar)") as response:
             if response.status_code in [200, 201]:
                 response.success()
-                logger.info(f"POST /owners - criado com sucesso ({response.status_code})")
+                log_sucesso("POST /owners - criado com sucesso (%s)", response.status_code)
                 try:
-                    created = response.json()
-                    if 'id' in created:
-                        self.owner_ids.append(created['id'])
-                        logger.info(f"Novo owner adicionado à lista: {created['id']}")
+                    if PERFIL_CLIENTE == "rapido":
+                        novo_id = id_owner_criado(response.content)
+                    else:
+                        novo_id = response.json().get('id')
+                    if novo_id is not None:
+                        self.owner_ids.adicionar(novo_id)
+                        log_sucesso("Novo owner adicionado à lista: %s", novo_id)
                 except Exception as e:
                     logger.warning(f"Erro ao interpretar resposta JSON: {e}")
             else:
-                response.failure(f"Status {response.status_code}")
+                response.failure(motivo_falha(response))
                 logger.error(f"POST /owners - falha {response.status_code}")
+
+
+# Fluxo de requisições de cada usuário gravado para replay (TRACE_GRAVAR=results/leve.trc)
+trace_carga.registrar_gravacao(events, PetClinicUser, logger)
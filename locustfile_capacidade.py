@@ -0,0 +1,201 @@
+"""
+Busca da capacidade máxima sustentável (joelho da curva) do PetClinic.
+
+Em vez dos três pontos fixos (50/100/200 usuários), um LoadTestShape sobe a
+carga em degraus de CAP_PASSO usuários, segura cada degrau até o throughput
+estabilizar e mede req/s, p95 e taxa de falha. Um degrau é sustentável se
+respeita os SLOs (p95 e falhas) e se o ganho marginal de throughput por
+usuário adicionado ainda é pelo menos CAP_EFICIENCIA_MIN do throughput por
+usuário do último degrau sustentável. No primeiro degrau que falha, a busca
+passa a bissecção entre os dois até a resolução CAP_RESOLUCAO.
+
+Saídas (com --csv):
+    {prefixo}_saturacao.csv   curva de saturação (um ponto por degrau medido)
+    {prefixo}_capacidade.json usuários e req/s máximos sustentáveis
+
+Uso:
+    locust -f locustfile_capacidade.py --host=http://localhost:8080 \
+        --csv=results/capacidade --headless
+
+Variáveis de ambiente (padrões entre parênteses):
+    CAP_INICIAL (25), CAP_PASSO (25), CAP_MAX (400), CAP_SPAWN_RATE (10),
+    CAP_RESOLUCAO (5)         usuários
+    CAP_ESTABILIZACAO_S (15)  espera após atingir o degrau antes de medir
+    CAP_JANELA_S (10)         janela de medição; o degrau é estável quando
+                              duas janelas seguidas diferem menos que
+    CAP_TOLERANCIA (0.1)      em req/s, ou após CAP_MEDICAO_MAX_S (120)
+    CAP_P95_MS (1000), CAP_FALHA_MAX (0.01), CAP_EFICIENCIA_MIN (0.5)
+"""
+import csv
+import json
+import os
+import time
+
+from locust import LoadTestShape, events
+from locust.runners import WorkerRunner
+
+import histograma_latencia
+import locustfile as base
+from locustfile import PetClinicUser  # noqa: F401 - classe de usuário desta carga
+
+CAP_INICIAL = int(os.getenv("CAP_INICIAL", "25"))
+CAP_PASSO = int(os.getenv("CAP_PASSO", "25"))
+CAP_MAX = int(os.getenv("CAP_MAX", "400"))
+CAP_SPAWN_RATE = float(os.getenv("CAP_SPAWN_RATE", "10"))
+CAP_RESOLUCAO = int(os.getenv("CAP_RESOLUCAO", "5"))
+CAP_ESTABILIZACAO_S = float(os.getenv("CAP_ESTABILIZACAO_S", "15"))
+CAP_JANELA_S = float(os.getenv("CAP_JANELA_S", "10"))
+CAP_TOLERANCIA = float(os.getenv("CAP_TOLERANCIA", "0.1"))
+CAP_MEDICAO_MAX_S = float(os.getenv("CAP_MEDICAO_MAX_S", "120"))
+CAP_P95_MS = float(os.getenv("CAP_P95_MS", "1000"))
+CAP_FALHA_MAX = float(os.getenv("CAP_FALHA_MAX", "0.01"))
+CAP_EFICIENCIA_MIN = float(os.getenv("CAP_EFICIENCIA_MIN", "0.5"))
+
+SUFIXO_CURVA = "_saturacao.csv"
+SUFIXO_RESUMO = "_capacidade.json"
+CAMPOS = ["ordem", "fase", "usuarios", "req_por_segundo", "tempo_medio_ms", "p95_ms",
+          "taxa_falha", "duracao_medicao_s", "sustentavel"]
+
+
+def _instantaneo(total, agora):
+    return (agora, total.num_requests, total.num_failures, total.total_response_time, dict(total.response_times))
+
+
+def _medir(inicio, fim):
+    """Métricas entre dois instantâneos de stats.total."""
+    t0, req0, falhas0, soma0, hist0 = inicio
+    t1, req1, falhas1, soma1, hist1 = fim
+    req = req1 - req0
+    return {
+        "req_por_segundo": req / (t1 - t0) if t1 > t0 else 0.0,
+        "tempo_medio_ms": (soma1 - soma0) / req if req else float("nan"),
+        "p95_ms": histograma_latencia.percentil(histograma_latencia.diferenca(hist1, hist0), 0.95),
+        "taxa_falha": (falhas1 - falhas0) / req if req else 1.0,
+        "duracao_medicao_s": t1 - t0,
+    }
+
+
+def sustentavel(ponto, referencia):
+    """SLOs respeitados e ganho marginal de throughput suficiente em relação à referência."""
+    if not ponto["p95_ms"] <= CAP_P95_MS or ponto["taxa_falha"] > CAP_FALHA_MAX:
+        return False
+    if referencia is None:
+        return ponto["req_por_segundo"] > 0
+    ganho = (ponto["req_por_segundo"] - referencia["req_por_segundo"]) / (ponto["usuarios"] - referencia["usuarios"])
+    return ganho >= CAP_EFICIENCIA_MIN * referencia["req_por_segundo"] / referencia["usuarios"]
+
+
+class BuscaCapacidade(LoadTestShape):
+    """Degraus crescentes até a saturação, depois bissecção até CAP_RESOLUCAO."""
+
+    def __init__(self):
+        super().__init__()
+        self.alvo = CAP_INICIAL
+        self.fase = "subida"
+        self.curva = []
+        self.melhor = None          # último ponto sustentável (limite inferior)
+        self.limite_superior = None
+        self.encerrada = False
+        self._t_degrau = None
+        self._janelas = []          # instantâneos no início de cada janela de medição
+
+    def _novo_degrau(self, usuarios):
+        self.alvo = usuarios
+        self._t_degrau = None
+        self._janelas = []
+
+    def tick(self):
+        if self.encerrada:
+            return None
+        agora = time.monotonic()
+        total = self.runner.stats.total
+
+        if self.runner.user_count != self.alvo:
+            # Ainda criando ou parando usuários
+            self._t_degrau = None
+            return self.alvo, CAP_SPAWN_RATE
+        if self._t_degrau is None:
+            self._t_degrau = agora
+        if agora < self._t_degrau + CAP_ESTABILIZACAO_S:
+            return self.alvo, CAP_SPAWN_RATE
+
+        if not self._janelas:
+            self._janelas.append(_instantaneo(total, agora))
+        elif agora - self._janelas[-1][0] >= CAP_JANELA_S:
+            self._janelas.append(_instantaneo(total, agora))
+            if self._degrau_estavel(agora):
+                self._decidir(agora)
+                if self.encerrada:
+                    return None
+        return self.alvo, CAP_SPAWN_RATE
+
+    def _degrau_estavel(self, agora):
+        if len(self._janelas) < 3:
+            return False
+        anterior = _medir(self._janelas[-3], self._janelas[-2])["req_por_segundo"]
+        atual = _medir(self._janelas[-2], self._janelas[-1])["req_por_segundo"]
+        if anterior > 0 and abs(atual - anterior) / anterior < CAP_TOLERANCIA:
+            return True
+        return agora - self._janelas[0][0] >= CAP_MEDICAO_MAX_S
+
+    def _decidir(self, agora):
+        # O ponto do degrau usa as duas últimas janelas (já estáveis)
+        ponto = {"ordem": len(self.curva) + 1, "fase": self.fase, "usuarios": self.alvo,
+                 **_medir(self._janelas[-3], self._janelas[-1])}
+        ponto["sustentavel"] = sustentavel(ponto, self.melhor)
+        self.curva.append(ponto)
+        base.logger.info(
+            f"Degrau {self.alvo} usuários: {ponto['req_por_segundo']:.1f} req/s, p95 {ponto['p95_ms']} ms, "
+            f"falhas {ponto['taxa_falha']:.1%} → {'sustentável' if ponto['sustentavel'] else 'saturado'}"
+        )
+
+        if ponto["sustentavel"]:
+            self.melhor = ponto
+        else:
+            self.limite_superior = self.alvo
+            self.fase = "bisseccao"
+
+        if self.fase == "subida":
+            if self.alvo + CAP_PASSO > CAP_MAX:
+                self.encerrada = True
+            else:
+                self._novo_degrau(self.alvo + CAP_PASSO)
+            return
+
+        inferior = self.melhor["usuarios"] if self.melhor else 0
+        if self.melhor is None or self.limite_superior - inferior <= CAP_RESOLUCAO:
+            self.encerrada = True
+        else:
+            self._novo_degrau((inferior + self.limite_superior) // 2)
+
+    def resumo(self):
+        return {
+            "usuarios_max_sustentavel": self.melhor["usuarios"] if self.melhor else 0,
+            "req_por_segundo_max_sustentavel": round(self.melhor["req_por_segundo"], 3) if self.melhor else 0.0,
+            "primeiro_degrau_saturado": self.limite_superior,
+            "limite_cap_max_atingido": self.limite_superior is None,
+            "slo": {"p95_ms": CAP_P95_MS, "taxa_falha": CAP_FALHA_MAX, "eficiencia_min": CAP_EFICIENCIA_MIN},
+            "degraus_medidos": len(self.curva),
+        }
+
+
+@events.quitting.add_listener
+def _salvar_capacidade(environment, **kwargs):
+    forma = environment.shape_class
+    if isinstance(environment.runner, WorkerRunner) or not isinstance(forma, BuscaCapacidade):
+        return
+    resumo = forma.resumo()
+    base.logger.info(
+        f"Capacidade máxima sustentável: {resumo['usuarios_max_sustentavel']} usuários, "
+        f"{resumo['req_por_segundo_max_sustentavel']:.1f} req/s"
+    )
+    caminho = base.caminho_artefato(environment, SUFIXO_CURVA)
+    if not caminho:
+        return
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=CAMPOS)
+        escritor.writeheader()
+        for ponto in forma.curva:
+            escritor.writerow({k: round(v, 3) if isinstance(v, float) else v for k, v in ponto.items()})
+    with open(base.caminho_artefato(environment, SUFIXO_RESUMO), "w", encoding="utf-8") as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,122 @@
+"""
+Replay de um trace gravado com TRACE_GRAVAR (ver trace_carga.py).
+
+Cada usuário virtual reproduz o fluxo de um usuário do trace: as mesmas
+requisições, com os mesmos owners e corpos de POST, lidas uma a uma do
+arquivo mapeado em memória. Assim as repetições enviam exatamente a mesma
+sequência, e um trace longo pode ser reproduzido sem carregá-lo inteiro.
+
+TRACE_ESCALA acelera (ou desacelera) o tempo do trace: com 2, cada usuário
+começa e dispara suas requisições na metade do tempo gravado, dobrando a
+taxa de chegada. O número de usuários deve ser o do trace (usuários além
+dele repetem fluxos desde o início).
+
+Uso:
+    TRACE_ARQUIVO=results/leve.trc TRACE_ESCALA=2 locust -f locustfile_replay.py \
+        --host=http://localhost:8080 --users 50 --spawn-rate 50 --run-time 10m \
+        --csv=results/replay_leve_1 --headless
+
+Variáveis de ambiente:
+    TRACE_ARQUIVO    trace a reproduzir (obrigatório)
+    TRACE_ESCALA     fator de aceleração do tempo (padrão 1)
+    TRACE_MODO       "agenda": cada requisição no instante gravado / escala
+                     (atrasos não se acumulam); "espera": a espera gravada
+                     / escala depois de cada resposta, como o PetClinicUser
+                     (padrão agenda)
+    TRACE_REPETIR    1 = ao fim do fluxo recomeça, deslocado pela duração do
+                     trace; 0 = o usuário para (padrão 1)
+    TRACE_PROCESSOS  processos que dividem os usuários do trace (padrão: o
+                     --processes, ou 1); com workers em outras máquinas,
+                     informe o total de workers
+"""
+import os
+import time
+
+import gevent
+from locust import constant, task
+from locust.exception import StopUser
+
+# Importa o módulo (e não a classe) para o Locust não executar também o PetClinicUser
+import locustfile as base
+import trace_carga
+
+TRACE_ARQUIVO = os.getenv("TRACE_ARQUIVO")
+TRACE_ESCALA = float(os.getenv("TRACE_ESCALA", "1"))
+TRACE_MODO = os.getenv("TRACE_MODO", "agenda")
+TRACE_REPETIR = os.getenv("TRACE_REPETIR", "1") == "1"
+
+if not TRACE_ARQUIVO:
+    raise ValueError("Informe o trace em TRACE_ARQUIVO (gravado com TRACE_GRAVAR no locustfile.py)")
+if TRACE_MODO not in ("agenda", "espera"):
+    raise ValueError(f"TRACE_MODO inválido: {TRACE_MODO} (use agenda ou espera)")
+
+TRACE = trace_carga.Trace(TRACE_ARQUIVO)
+DURACAO_S = TRACE.duracao_ms() / 1000
+
+# Estado do processo: instante zero do replay e próximo usuário do trace
+_inicio = None
+_proximo = 0
+
+
+def _processos(environment):
+    valor = os.getenv("TRACE_PROCESSOS")
+    if valor:
+        return int(valor)
+    processos = getattr(environment.parsed_options, "processes", None) if environment.parsed_options else None
+    if processos is not None and processos < 0:
+        return os.cpu_count() or 1
+    return processos or 1
+
+
+class PetClinicReplay(base.PetClinicUser):
+    """
+    Reproduz o fluxo gravado de um usuário do trace com as mesmas funções de
+    requisição do PetClinicUser.
+    """
+
+    wait_time = constant(0)
+
+    def on_start(self):
+        global _inicio, _proximo
+        # Sem super().on_start(): o GET /owners que semeia o pool de IDs não
+        # está no trace (a gravação só começa nas tarefas) e os IDs dos owners
+        # já vêm gravados em cada requisição
+        if _inicio is None:
+            _inicio = time.monotonic()
+        # Em cada processo: usuários índice, índice + P, índice + 2P...
+        indice = max(self.environment.runner.worker_index, 0) + _proximo * _processos(self.environment)
+        _proximo += 1
+        if indice >= len(TRACE):
+            base.logger.warning(f"Mais usuários que o trace ({len(TRACE)}); repetindo o fluxo {indice % len(TRACE)}")
+        self.usuario_trace = indice % len(TRACE)
+
+    def _executar(self, endpoint, parametro):
+        if endpoint == trace_carga.LISTA:
+            self.get_owners_list()
+        elif endpoint == trace_carga.OWNER:
+            self.buscar_owner(parametro)
+        elif endpoint == trace_carga.VETS:
+            self.get_vets()
+        elif endpoint == trace_carga.CRIAR:
+            self.criar_owner(parametro)
+
+    @task
+    def reproduzir(self):
+        """Percorre o fluxo do usuário (e o recomeça, com TRACE_REPETIR)."""
+        deslocamento = 0.0
+        while True:
+            for inicio_ms, endpoint, parametro, espera_ms in TRACE.registros(self.usuario_trace):
+                if TRACE_MODO == "agenda":
+                    espera = _inicio + (deslocamento + inicio_ms / 1000) / TRACE_ESCALA - time.monotonic()
+                    if espera > 0:
+                        gevent.sleep(espera)
+                self._executar(endpoint, parametro)
+                if TRACE_MODO == "espera":
+                    gevent.sleep(espera_ms / 1000 / TRACE_ESCALA)
+            if not TRACE_REPETIR:
+                raise StopUser()
+            deslocamento += DURACAO_S
+
+
+# O UserMeta herda as tarefas do PetClinicUser; aqui o único laço é o replay
+PetClinicReplay.tasks = [PetClinicReplay.reproduzir]
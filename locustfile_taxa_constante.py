@@ -0,0 +1,190 @@
+"""
+Carga em malha aberta (open-loop) para o Spring PetClinic.
+
+O PetClinicUser é de malha fechada: cada usuário espera a resposta e o
+between(1, 3) antes da próxima requisição, então a carga oferecida cai
+quando o servidor fica lento. Aqui as chegadas seguem um relógio: cada
+usuário dispara o mesmo mix 40/30/20/10 numa taxa fixa, sem esperar as
+respostas (cada requisição roda no seu próprio greenlet).
+
+O quanto o gerador fica atrás da taxa alvo é registrado por segundo em
+{prefixo}_taxa_chegada.csv (agendadas, disparadas, descartadas, atraso).
+
+Uso (a taxa é dividida entre os usuários; poucos usuários bastam):
+    TAXA_ALVO=80 locust -f locustfile_taxa_constante.py --host=http://localhost:8080 \
+        --users 10 --spawn-rate 10 --run-time 5m --csv=results/aberto_80_1 --headless
+
+Variáveis de ambiente:
+    TAXA_ALVO   requisições/s somando todos os usuários (padrão 50)
+    CHEGADAS    "constante" (intervalo fixo) ou "poisson" (padrão constante)
+    EM_VOO_MAX  requisições simultâneas por usuário antes de descartar (padrão 1000)
+"""
+import csv
+import os
+import random
+import time
+
+import gevent
+from gevent.pool import Group
+from locust import events, task
+from locust.runners import WorkerRunner
+
+# Importa o módulo (e não a classe) para o Locust não executar também o PetClinicUser
+import locustfile as base
+
+TAXA_ALVO = float(os.getenv("TAXA_ALVO", "50"))
+CHEGADAS = os.getenv("CHEGADAS", "constante")
+EM_VOO_MAX = int(os.getenv("EM_VOO_MAX", "1000"))
+
+SUFIXO = "_taxa_chegada.csv"
+OPCAO_USUARIOS = "usuarios_taxa_constante"   # repassada pelo master aos workers
+CAMPOS = ["agendadas", "disparadas", "descartadas", "soma_atraso_ms", "max_atraso_ms"]
+
+
+class EstatisticasChegada:
+    """
+    Contadores por segundo (timestamp inteiro, alinhado ao stats_history)
+    do escalonador. Nos workers são drenados a cada relatório ao master.
+    """
+
+    def __init__(self):
+        self.segundos = {}
+
+    def registrar(self, disparada, atraso_ms):
+        segundo = int(time.time())
+        c = self.segundos.get(segundo)
+        if c is None:
+            c = self.segundos[segundo] = dict.fromkeys(CAMPOS, 0)
+        c["agendadas"] += 1
+        if disparada:
+            c["disparadas"] += 1
+            c["soma_atraso_ms"] += atraso_ms
+            c["max_atraso_ms"] = max(c["max_atraso_ms"], atraso_ms)
+        else:
+            c["descartadas"] += 1
+
+    def drenar(self):
+        segundos, self.segundos = self.segundos, {}
+        return segundos
+
+    def mesclar(self, segundos):
+        for segundo, origem in segundos.items():
+            c = self.segundos.setdefault(int(segundo), dict.fromkeys(CAMPOS, 0))
+            for campo in CAMPOS:
+                if campo == "max_atraso_ms":
+                    c[campo] = max(c[campo], origem[campo])
+                else:
+                    c[campo] += origem[campo]
+
+    def salvar(self, caminho):
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["Timestamp", "taxa_alvo"] + CAMPOS + ["atraso_medio_ms"])
+            for segundo in sorted(self.segundos):
+                c = self.segundos[segundo]
+                medio = c["soma_atraso_ms"] / c["disparadas"] if c["disparadas"] else 0
+                escritor.writerow([segundo, TAXA_ALVO] + [round(c[k], 3) for k in CAMPOS] + [round(medio, 3)])
+
+    def resumo(self):
+        """Totais e taxa disparada média (sem o primeiro e o último segundo, parciais)."""
+        total = {k: sum(c[k] for c in self.segundos.values()) for k in CAMPOS}
+        segundos = sorted(self.segundos)
+        internos = segundos[1:-1] or segundos
+        disparadas = sum(self.segundos[s]["disparadas"] for s in internos)
+        return total, disparadas / max(len(internos), 1)
+
+
+ESTATISTICAS = EstatisticasChegada()
+
+
+class PetClinicTaxaConstante(base.PetClinicUser):
+    """
+    Mesmo mix de tarefas do PetClinicUser, disparado por um escalonador de
+    taxa fixa que não espera as respostas.
+    """
+
+    # Perfil rapido: o pool do FastHttpUser comporta todas as requisições em
+    # voo, para nenhuma chegada ficar esperando conexão livre (a espera
+    # entraria na latência, mas o servidor veria menos concorrência que a
+    # oferecida); o limite passa a ser só o EM_VOO_MAX, com descarte contado
+    concurrency = max(base.CONEXOES_MAX, EM_VOO_MAX)
+
+    def on_start(self):
+        super().on_start()
+        self._em_voo = Group()
+
+    def on_stop(self):
+        self._em_voo.kill(block=False)
+
+    def _taxa_por_usuario(self):
+        # Total de usuários do teste, vindo do master (um worker só conhece os seus)
+        usuarios = getattr(self.environment.parsed_options, OPCAO_USUARIOS, None)
+        return TAXA_ALVO / (usuarios or self.environment.runner.target_user_count or 1)
+
+    def _executar(self, tarefa):
+        try:
+            tarefa(self)
+        except Exception as e:
+            base.logger.error(f"Erro na chegada agendada ({tarefa.__name__}): {e}")
+
+    @task
+    def chegadas(self):
+        """Laço do escalonador: o k-ésimo disparo é agendado em t0 + soma dos intervalos."""
+        taxa = self._taxa_por_usuario()
+        agendado = time.monotonic()
+        while True:
+            if CHEGADAS == "poisson":
+                agendado += random.expovariate(taxa)
+            else:
+                agendado += 1 / taxa
+            espera = agendado - time.monotonic()
+            if espera > 0:
+                gevent.sleep(espera)
+
+            # Atraso entre o instante agendado e o disparo real (omissão coordenada)
+            atraso_ms = max(0.0, (time.monotonic() - agendado) * 1000)
+            if len(self._em_voo) >= EM_VOO_MAX:
+                ESTATISTICAS.registrar(False, atraso_ms)
+                continue
+            ESTATISTICAS.registrar(True, atraso_ms)
+            self._em_voo.spawn(self._executar, random.choice(base.PetClinicUser.tasks))
+
+
+# O UserMeta herda as tarefas do PetClinicUser; aqui o único laço é o escalonador
+PetClinicTaxaConstante.tasks = [PetClinicTaxaConstante.chegadas]
+
+
+@events.test_start.add_listener
+def _publicar_usuarios(environment, **kwargs):
+    """
+    No master (ou local) o alvo de usuários já está definido no test_start;
+    opções fora das padrão do Locust seguem com cada mensagem de spawn, então
+    os workers recebem o total antes de iniciar os usuários.
+    """
+    if not isinstance(environment.runner, WorkerRunner) and environment.parsed_options is not None:
+        setattr(environment.parsed_options, OPCAO_USUARIOS, environment.runner.target_user_count)
+
+
+@events.report_to_master.add_listener
+def _enviar_ao_master(client_id, data, **kwargs):
+    data["taxa_chegada"] = ESTATISTICAS.drenar()
+
+
+@events.worker_report.add_listener
+def _receber_do_worker(client_id, data, **kwargs):
+    ESTATISTICAS.mesclar(data.get("taxa_chegada", {}))
+
+
+@events.quitting.add_listener
+def _salvar_taxa_chegada(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    total, taxa_real = ESTATISTICAS.resumo()
+    atraso_medio = total["soma_atraso_ms"] / total["disparadas"] if total["disparadas"] else 0
+    base.logger.info(
+        f"Taxa alvo {TAXA_ALVO:.1f} req/s, disparada {taxa_real:.1f} req/s; "
+        f"{total['descartadas']} chegadas descartadas, atraso médio {atraso_medio:.1f} ms"
+    )
+    caminho = base.caminho_artefato(environment, SUFIXO)
+    if caminho:
+        ESTATISTICAS.salvar(caminho)
@@ -0,0 +1,164 @@
+"""
+Recursos do próprio gerador de carga durante a execução.
+
+Um greenlet em cada processo do Locust (local, master e workers) amostra a
+cada MONITOR_INTERVALO_S segundos, descartando o primeiro intervalo
+(partida do processo):
+
+- cpu_percent    CPU do processo (100 = um núcleo inteiro)
+- rss_mb         memória residente
+- lag_loop_ms    tempo entre agendar um callback no loop do gevent e ele rodar
+- atraso_ms      quanto o sleep do amostrador passou do previsto: o mesmo
+                 atraso que os tempos de espera dos usuários sofrem antes de
+                 disparar a próxima requisição
+- conexoes       conexões TCP abertas pelo processo
+
+Os workers enviam as amostras ao master no relatório periódico; o master
+(ou o processo local) grava tudo em {prefixo}_gerador.csv, com o mesmo
+Timestamp inteiro do stats_history.
+
+avaliar() marca a execução como inválida quando o gerador saturou: CPU
+acima de LIMITE_CPU ou atraso acima de LIMITE_ATRASO_MS em mais de
+FRACAO_SATURADA das amostras de algum processo.
+"""
+import csv
+import os
+import time
+
+import gevent
+import psutil
+from gevent.event import Event
+
+SUFIXO = "_gerador.csv"
+MONITOR_INTERVALO_S = float(os.getenv("MONITOR_INTERVALO_S", "1"))
+CAMPOS = ["Timestamp", "processo", "cpu_percent", "rss_mb", "lag_loop_ms", "atraso_ms", "conexoes", "usuarios"]
+
+# Critérios de saturação do gerador
+LIMITE_CPU = 90.0
+LIMITE_ATRASO_MS = 100.0
+FRACAO_SATURADA = 0.10
+
+
+def _lag_loop():
+    """ms até um callback recém-agendado rodar no loop do gevent."""
+    rodou = Event()
+    inicio = time.perf_counter()
+    gevent.get_hub().loop.run_callback(rodou.set)
+    rodou.wait()
+    return (time.perf_counter() - inicio) * 1000
+
+
+class MonitorGerador:
+    """Amostrador de um processo; `amostras` é drenado a cada relatório nos workers."""
+
+    def __init__(self, nome_processo, runner=None):
+        self.nome = nome_processo
+        self.runner = runner
+        self.processo = psutil.Process()
+        self.processo.cpu_percent(None)  # a primeira leitura só inicia a contagem
+        self.amostras = []
+
+    def amostrar(self, atraso_ms):
+        try:
+            conexoes = len(self.processo.net_connections(kind="tcp"))
+        except psutil.Error:
+            conexoes = -1
+        self.amostras.append([
+            int(time.time()),
+            self.nome,
+            round(self.processo.cpu_percent(None), 1),
+            round(self.processo.memory_info().rss / 2**20, 1),
+            round(_lag_loop(), 3),
+            round(atraso_ms, 3),
+            conexoes,
+            self.runner.user_count if self.runner else 0,
+        ])
+
+    def laco(self):
+        # O primeiro intervalo cai na partida do processo (nos workers o loop
+        # chega a atrasar ~200 ms): não vira amostra e reinicia a contagem de CPU
+        gevent.sleep(MONITOR_INTERVALO_S)
+        self.processo.cpu_percent(None)
+        while True:
+            previsto = time.perf_counter() + MONITOR_INTERVALO_S
+            gevent.sleep(MONITOR_INTERVALO_S)
+            self.amostrar(max(0.0, (time.perf_counter() - previsto) * 1000))
+
+    def drenar(self):
+        amostras, self.amostras = self.amostras, []
+        return amostras
+
+    def salvar(self, caminho):
+        with open(caminho, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(CAMPOS)
+            escritor.writerows(sorted(self.amostras, key=lambda a: (a[0], a[1])))
+
+
+def avaliar(caminho):
+    """
+    Resumo de um {prefixo}_gerador.csv: {'saturado', 'motivo', 'cpu_max_p95',
+    'atraso_max_p95_ms', 'amostras'}, com p95 do pior processo.
+    """
+    por_processo = {}
+    with open(caminho, newline="", encoding="utf-8") as f:
+        for linha in csv.DictReader(f):
+            por_processo.setdefault(linha["processo"], []).append(
+                (float(linha["cpu_percent"]), float(linha["atraso_ms"])))
+
+    def p95(valores):
+        valores = sorted(valores)
+        return valores[min(len(valores) - 1, int(0.95 * len(valores)))] if valores else 0.0
+
+    motivos = []
+    cpu_p95 = atraso_p95 = 0.0
+    for processo, amostras in por_processo.items():
+        cpu = [a[0] for a in amostras]
+        atraso = [a[1] for a in amostras]
+        cpu_p95, atraso_p95 = max(cpu_p95, p95(cpu)), max(atraso_p95, p95(atraso))
+        if sum(c >= LIMITE_CPU for c in cpu) > FRACAO_SATURADA * len(cpu):
+            motivos.append(f"CPU ≥ {LIMITE_CPU:.0f}% em {processo}")
+        if sum(a >= LIMITE_ATRASO_MS for a in atraso) > FRACAO_SATURADA * len(atraso):
+            motivos.append(f"atraso ≥ {LIMITE_ATRASO_MS:.0f} ms em {processo}")
+    return {
+        "saturado": bool(motivos),
+        "motivo": "; ".join(motivos),
+        "cpu_max_p95": cpu_p95,
+        "atraso_max_p95_ms": atraso_p95,
+        "amostras": sum(len(a) for a in por_processo.values()),
+    }
+
+
+def registrar(events, caminho_artefato):
+    """Inicia o amostrador em cada processo e grava {prefixo}_gerador.csv no master/local."""
+    from locust.runners import MasterRunner, WorkerRunner
+
+    estado = {}
+
+    @events.init.add_listener
+    def _iniciar_monitor(environment, **kwargs):
+        runner = environment.runner
+        if isinstance(runner, WorkerRunner):
+            nome = f"worker{os.getpid()}"
+        elif caminho_artefato(environment, SUFIXO):
+            nome = "master" if isinstance(runner, MasterRunner) else "local"
+        else:
+            return
+        estado["monitor"] = MonitorGerador(nome, runner)
+        gevent.spawn(estado["monitor"].laco)
+
+    @events.report_to_master.add_listener
+    def _enviar_ao_master(client_id, data, **kwargs):
+        if "monitor" in estado:
+            data["gerador"] = estado["monitor"].drenar()
+
+    @events.worker_report.add_listener
+    def _receber_do_worker(client_id, data, **kwargs):
+        if "monitor" in estado:
+            estado["monitor"].amostras.extend(data.get("gerador", []))
+
+    @events.quitting.add_listener
+    def _salvar_monitor(environment, **kwargs):
+        caminho = caminho_artefato(environment, SUFIXO)
+        if caminho and "monitor" in estado and not isinstance(environment.runner, WorkerRunner):
+            estado["monitor"].salvar(caminho)
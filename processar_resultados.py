@@ -1,7 +1,30 @@
 import pandas as pd
-import glob
+import argparse
+import json
 import os
+import sys
+from datetime import datetime
 from pathlib import Path
+from statistics import median
+
+import analisar_payload
+import histograma_latencia
+import monitor_gerador
+from cenarios import CENARIOS
+from estatistica import holm, intervalo_confianca, mann_whitney
+from historico_colunar import HistoricoColunar, construir_historico
+from ingestao_resultados import arquivos_cenario, carregar_agregados, carregar_endpoints
+from regime_permanente import analisar_todos
+
+ARQUIVO_BASELINE = os.path.join('results', 'baseline_endpoints.json')
+
+# Métricas por endpoint: coluna do stats.csv e se um aumento é uma piora
+METRICAS_ENDPOINT = {
+    'tempo_medio_ms': ('Average Response Time', True),
+    'mediana_ms': ('Median Response Time', True),
+    'p95_ms': ('95%', True),
+    'req_por_segundo': ('Requests/s', False),
+}
 
 def processar_resultados_locust():
     """
@@ -13,49 +36,53 @@ def processar_resultados_locust():
     print("="*60)
     
     # Dicionário para armazenar resultados
-    resultados = {
-        'leve': [],
-        'moderado': [],
-        'pico': []
-    }
+    resultados = {cenario: [] for cenario in CENARIOS}
+    
+    # Localizar os arquivos de todos os cenários e ler só o que mudou
+    arquivos_por_cenario = {c: arquivos_cenario(c) for c in resultados}
+    todos = [a for arquivos in arquivos_por_cenario.values() for a in arquivos]
+    agregados, erros, lidos = carregar_agregados(todos)
+    print(f"\n✓ {len(lidos)} arquivos lidos do disco, {len(todos) - len(lidos)} reaproveitados do cache")
+    
+    # Execuções em que o próprio gerador saturou não entram nas médias
+    invalidas = processar_gerador(todos)
     
     # Processar cada tipo de cenário
-    for cenario in ['leve', 'moderado', 'pico']:
+    for cenario in CENARIOS:
         print(f"\n📊 Processando cenário: {cenario.upper()}")
         
-        # Buscar todos os arquivos CSV do cenário
-        pattern = f"results/{cenario}_*_stats.csv"
-        arquivos = glob.glob(pattern)
+        arquivos = arquivos_por_cenario[cenario]
         
         if not arquivos:
-            print(f"⚠ Nenhum arquivo encontrado para o padrão: {pattern}")
+            print(f"⚠ Nenhum arquivo encontrado para o padrão: results/{cenario}_*_stats.csv")
             continue
         
         print(f"✓ {len(arquivos)} execuções encontradas")
         
         # Processar cada arquivo
         for arquivo in arquivos:
-            try:
-                df = pd.read_csv(arquivo)
-                
-                # Filtrar apenas a linha "Aggregated" (resumo total)
-                agregado = df[df['Name'] == 'Aggregated']
-                
-                if not agregado.empty:
-                    resultado = {
-                        'cenario': cenario,
-                        'tempo_medio_ms': agregado['Average Response Time'].values[0],
-                        'tempo_max_ms': agregado['Max Response Time'].values[0],
-                        'req_por_segundo': agregado['Requests/s'].values[0],
-                        'total_requisicoes': agregado['Request Count'].values[0],
-                        'total_falhas': agregado['Failure Count'].values[0],
-                        'percentual_sucesso': (1 - agregado['Failure Count'].values[0] / 
-                                              agregado['Request Count'].values[0]) * 100
-                    }
-                    resultados[cenario].append(resultado)
-                    
-            except Exception as e:
-                print(f"✗ Erro ao processar {arquivo}: {e}")
+            if arquivo in erros:
+                print(f"✗ Erro ao processar {arquivo}: {erros[arquivo]}")
+                continue
+            if arquivo in invalidas:
+                print(f"⚠ {arquivo} descartado: gerador saturado")
+                continue
+            
+            # Apenas a linha "Aggregated" (resumo total)
+            agregado = agregados.get(arquivo)
+            
+            if agregado:
+                resultado = {
+                    'cenario': cenario,
+                    'tempo_medio_ms': agregado['Average Response Time'],
+                    'tempo_max_ms': agregado['Max Response Time'],
+                    'req_por_segundo': agregado['Requests/s'],
+                    'total_requisicoes': agregado['Request Count'],
+                    'total_falhas': agregado['Failure Count'],
+                    'percentual_sucesso': (1 - agregado['Failure Count'] / 
+                                          agregado['Request Count']) * 100
+                }
+                resultados[cenario].append(resultado)
     
     # Calcular médias e gerar relatório
     print("\n" + "="*60)
@@ -64,7 +91,7 @@ def processar_resultados_locust():
     
     resumo_final = []
     
-    for cenario in ['leve', 'moderado', 'pico']:
+    for cenario in CENARIOS:
         if not resultados[cenario]:
             print(f"\n⚠ Sem dados para cenário {cenario}")
             continue
@@ -73,7 +100,7 @@ def processar_resultados_locust():
         
         media = {
             'Cenário': cenario.upper(),
-            'Usuários': {'leve': 50, 'moderado': 100, 'pico': 200}[cenario],
+            'Usuários': CENARIOS[cenario]['usuarios'],
             'Tempo Médio (ms)': df_cenario['tempo_medio_ms'].mean(),
             'Tempo Máximo (ms)': df_cenario['tempo_max_ms'].mean(),
             'Req/s': df_cenario['req_por_segundo'].mean(),
@@ -96,11 +123,22 @@ def processar_resultados_locust():
         print(f"Total de Falhas: {media['Total Falhas']:.0f}")
         print(f"Taxa de Sucesso: {media['% Sucesso']:.2f}%")
     
+    # Recalcular as métricas apenas na janela em regime permanente
+    processar_regime_permanente(invalidas)
+    
+    # Percentis do conjunto das repetições (histogramas mesclados)
+    processar_percentis_agregados(invalidas)
+    
+    # Médias por endpoint com intervalos de confiança entre repetições
+    amostras_endpoints = processar_endpoints(invalidas)
+    
+    # Latência por KB e throughput em bytes/s
+    processar_payload(invalidas)
+    
     # Salvar resumo em CSV
     if resumo_final:
-        df_resumo = pd.DataFrame(resumo_final)
         arquivo_saida = "results/resumo_final.csv"
-        df_resumo.to_csv(arquivo_saida, index=False)
+        salvar_csv_atomico(pd.DataFrame(resumo_final), arquivo_saida)
         print(f"\n✓ Resumo salvo em: {arquivo_saida}")
         
         # Criar análise comparativa
@@ -140,29 +178,381 @@ def processar_resultados_locust():
         print("\n" + "="*60)
         print("TABELA PARA O ARTIGO (copie para o LaTeX)")
         print("="*60)
-        print("\n\\begin{table}[h]")
-        print("\\centering")
-        print("\\caption{Resultados Médios dos Testes de Carga}")
-        print("\\begin{tabular}{|l|c|c|c|}")
-        print("\\hline")
-        print("\\textbf{Métrica} & \\textbf{Leve} & \\textbf{Moderado} & \\textbf{Pico} \\\\")
-        print("\\hline")
-        
-        if len(resumo_final) >= 3:
-            print(f"Usuários & {resumo_final[0]['Usuários']} & {resumo_final[1]['Usuários']} & {resumo_final[2]['Usuários']} \\\\")
-            print(f"Tempo Médio (ms) & {resumo_final[0]['Tempo Médio (ms)']:.2f} & {resumo_final[1]['Tempo Médio (ms)']:.2f} & {resumo_final[2]['Tempo Médio (ms)']:.2f} \\\\")
-            print(f"Req/s & {resumo_final[0]['Req/s']:.2f} & {resumo_final[1]['Req/s']:.2f} & {resumo_final[2]['Req/s']:.2f} \\\\")
-            print(f"Taxa Sucesso (\\%) & {resumo_final[0]['% Sucesso']:.2f} & {resumo_final[1]['% Sucesso']:.2f} & {resumo_final[2]['% Sucesso']:.2f} \\\\")
-        
-        print("\\hline")
-        print("\\end{tabular}")
-        print("\\end{table}\n")
+        print("\n" + tabela_latex(resumo_final))
     
     print("\n" + "="*60)
     print("PROCESSAMENTO CONCLUÍDO!")
     print("="*60)
+    
+    return amostras_endpoints
+
+def tabela_latex(resumo_final):
+    """Tabela de resultados médios para o artigo, a partir das linhas do resumo_final."""
+    linhas = [
+        "\\begin{table}[h]",
+        "\\centering",
+        "\\caption{Resultados Médios dos Testes de Carga}",
+        "\\begin{tabular}{|l|c|c|c|}",
+        "\\hline",
+        "\\textbf{Métrica} & \\textbf{Leve} & \\textbf{Moderado} & \\textbf{Pico} \\\\",
+        "\\hline",
+    ]
+    
+    if len(resumo_final) >= 3:
+        r = resumo_final
+        linhas += [
+            f"Usuários & {r[0]['Usuários']} & {r[1]['Usuários']} & {r[2]['Usuários']} \\\\",
+            f"Tempo Médio (ms) & {r[0]['Tempo Médio (ms)']:.2f} & {r[1]['Tempo Médio (ms)']:.2f} & {r[2]['Tempo Médio (ms)']:.2f} \\\\",
+            f"Req/s & {r[0]['Req/s']:.2f} & {r[1]['Req/s']:.2f} & {r[2]['Req/s']:.2f} \\\\",
+            f"Taxa Sucesso (\\%) & {r[0]['% Sucesso']:.2f} & {r[1]['% Sucesso']:.2f} & {r[2]['% Sucesso']:.2f} \\\\",
+        ]
+    
+    linhas += ["\\hline", "\\end{tabular}", "\\end{table}"]
+    return "\n".join(linhas) + "\n"
+
+
+def salvar_csv_atomico(df, arquivo):
+    """Grava o CSV num temporário e troca de uma vez (quem lê nunca vê o arquivo pela metade)."""
+    temporario = arquivo + '.tmp'
+    df.to_csv(temporario, index=False)
+    os.replace(temporario, arquivo)
+
+
+def processar_regime_permanente(invalidas=frozenset()):
+    """
+    Recalcula throughput, sucesso e latência descartando a rampa de usuários
+    e o aquecimento de cada cenário (ver cenarios.py), a partir dos
+    *_stats_history.csv, sem as execuções em `invalidas` (gerador saturado).
+    Salva results/resumo_regime.csv.
+    """
+    print("\n" + "="*60)
+    print("RESULTADOS EM REGIME PERMANENTE (SEM RAMPA E AQUECIMENTO)")
+    print("="*60)
+    
+    construir_historico()
+    df = analisar_todos(HistoricoColunar())
+    
+    if df.empty:
+        print("\n⚠ Nenhum stats_history encontrado")
+        return []
+    
+    saturadas = {Path(a).name for a in invalidas}
+    df['gerador_saturado'] = [f"{c}_{r}_stats.csv" in saturadas for c, r in zip(df['cenario'], df['repeticao'])]
+    
+    resumo_regime = []
+    
+    for cenario in CENARIOS:
+        df_cenario = df[(df['cenario'] == cenario) & df['valida'] & ~df['gerador_saturado']]
+        fora_do_alvo = int(((df['cenario'] == cenario) & ~df['valida']).sum())
+        saturado = int(((df['cenario'] == cenario) & df['valida'] & df['gerador_saturado']).sum())
+        if df_cenario.empty:
+            print(f"\n⚠ Sem dados em regime permanente para cenário {cenario}")
+            continue
+        
+        media = {
+            'Cenário': cenario.upper(),
+            'Usuários': CENARIOS[cenario]['usuarios'],
+            'Aquecimento (s)': CENARIOS[cenario]['aquecimento_s'],
+            'Execuções Válidas': len(df_cenario),
+            'Janela (s)': df_cenario['duracao_janela_s'].mean(),
+            'Tempo Médio (ms)': df_cenario['tempo_medio_ms'].mean(),
+            'p50 (ms)': df_cenario['p50_ms'].mean(),
+            'p95 (ms)': df_cenario['p95_ms'].mean(),
+            'p99 (ms)': df_cenario['p99_ms'].mean(),
+            'Req/s': df_cenario['req_por_segundo'].mean(),
+            '% Sucesso': df_cenario['percentual_sucesso'].mean()
+        }
+        resumo_regime.append(media)
+        
+        print(f"\n{'─'*60}")
+        print(f"CENÁRIO {cenario.upper()}")
+        print(f"{'─'*60}")
+        print(f"Execuções válidas: {media['Execuções Válidas']}" +
+              (f" ({fora_do_alvo} descartadas: não atingiram a carga alvo)" if fora_do_alvo else "") +
+              (f" ({saturado} descartadas: gerador saturado)" if saturado else ""))
+        print(f"Janela média: {media['Janela (s)']:.0f} s (após {media['Aquecimento (s)']} s de aquecimento)")
+        print(f"Tempo Médio de Resposta: {media['Tempo Médio (ms)']:.2f} ms")
+        print(f"p50 / p95 / p99: {media['p50 (ms)']:.0f} / {media['p95 (ms)']:.0f} / {media['p99 (ms)']:.0f} ms")
+        print(f"Requisições por Segundo: {media['Req/s']:.2f} req/s")
+        print(f"Taxa de Sucesso: {media['% Sucesso']:.2f}%")
+    
+    if resumo_regime:
+        arquivo_saida = "results/resumo_regime.csv"
+        pd.DataFrame(resumo_regime).to_csv(arquivo_saida, index=False)
+        print(f"\n✓ Resumo em regime permanente salvo em: {arquivo_saida}")
+    
+    return resumo_regime
+
+
+def processar_percentis_agregados(invalidas=frozenset()):
+    """
+    Mescla os histogramas de latência (*_latencias.json) de todas as
+    repetições, sem as execuções em `invalidas`, e calcula os percentis
+    reais do conjunto, por cenário e endpoint. Salva results/percentis_agregados.csv.
+    """
+    print("\n" + "="*60)
+    print("PERCENTIS DO CONJUNTO DAS REPETIÇÕES (HISTOGRAMAS MESCLADOS)")
+    print("="*60)
+    
+    linhas = []
+    saturadas = {Path(a).name[:-len('_stats.csv')] + histograma_latencia.SUFIXO for a in invalidas}
+    
+    for cenario in CENARIOS:
+        arquivos = [a for a in histograma_latencia.arquivos_cenario(cenario) if Path(a).name not in saturadas]
+        if not arquivos:
+            print(f"\n⚠ Sem histogramas para cenário {cenario} (execuções anteriores ao export)")
+            continue
+        
+        mesclado = histograma_latencia.mesclar_arquivos(arquivos)
+        
+        print(f"\n{'─'*60}")
+        print(f"CENÁRIO {cenario.upper()} ({len(arquivos)} execuções)")
+        print(f"{'─'*60}")
+        print(f"{'Método':<7} {'Endpoint':<24} {'Req':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'p99.9':>7}")
+        
+        # Agregado por último, como no stats.csv do Locust
+        for chave in sorted(mesclado, key=lambda c: (c == histograma_latencia.AGREGADO, c[1], c[0])):
+            hist = mesclado[chave]
+            metodo, nome = chave
+            linha = {
+                'Cenário': cenario.upper(),
+                'Método': metodo,
+                'Endpoint': nome,
+                'Requisições': sum(hist.values()),
+            }
+            for q in histograma_latencia.PERCENTIS:
+                linha[f"p{q * 100:g} (ms)"] = histograma_latencia.percentil(hist, q)
+            linhas.append(linha)
+            
+            print(f"{metodo:<7} {nome:<24} {linha['Requisições']:>9} {linha['p50 (ms)']:>7} {linha['p95 (ms)']:>7} "
+                  f"{linha['p99 (ms)']:>7} {linha['p99.9 (ms)']:>7}")
+    
+    if linhas:
+        arquivo_saida = "results/percentis_agregados.csv"
+        pd.DataFrame(linhas).to_csv(arquivo_saida, index=False)
+        print(f"\n✓ Percentis agregados salvos em: {arquivo_saida}")
+    
+    return linhas
+
+
+def processar_gerador(arquivos_stats):
+    """
+    Avalia o {prefixo}_gerador.csv de cada execução (CPU e atraso de
+    agendamento do gerador, ver monitor_gerador.py). Salva
+    results/validacao_gerador.csv e retorna o conjunto de stats.csv cujas
+    execuções são inválidas porque o gerador saturou. Execuções sem o
+    arquivo (anteriores ao monitor) são consideradas válidas.
+    """
+    print("\n" + "="*60)
+    print("VALIDAÇÃO DO GERADOR DE CARGA")
+    print("="*60)
+    
+    linhas = []
+    invalidas = set()
+    for arquivo in arquivos_stats:
+        caminho = arquivo[:-len('_stats.csv')] + monitor_gerador.SUFIXO
+        if not os.path.exists(caminho):
+            continue
+        avaliacao = monitor_gerador.avaliar(caminho)
+        linhas.append({'Execução': Path(arquivo).name[:-len('_stats.csv')],
+                       'CPU p95 (%)': avaliacao['cpu_max_p95'],
+                       'Atraso p95 (ms)': avaliacao['atraso_max_p95_ms'],
+                       'Saturado': avaliacao['saturado'],
+                       'Motivo': avaliacao['motivo']})
+        if avaliacao['saturado']:
+            invalidas.add(arquivo)
+            print(f"✗ {linhas[-1]['Execução']}: {avaliacao['motivo']}")
+    
+    if not linhas:
+        print("\n⚠ Nenhum *_gerador.csv encontrado (execuções sem monitor do gerador)")
+        return invalidas
+    
+    print(f"\n✓ {len(linhas) - len(invalidas)} de {len(linhas)} execuções com gerador abaixo dos limites "
+          f"(CPU < {monitor_gerador.LIMITE_CPU:.0f}%, atraso < {monitor_gerador.LIMITE_ATRASO_MS:.0f} ms)")
+    arquivo_saida = "results/validacao_gerador.csv"
+    pd.DataFrame(linhas).to_csv(arquivo_saida, index=False)
+    print(f"✓ Validação salva em: {arquivo_saida}")
+    
+    return invalidas
+
+
+def processar_endpoints(invalidas=frozenset()):
+    """
+    Média e IC de 95% entre as repetições de cada endpoint (linhas do
+    stats.csv além do Aggregated), sem as execuções em `invalidas`.
+    Salva results/resumo_endpoints.csv e retorna as amostras
+    {cenario: {(método, nome): {métrica: [um valor por execução]}}}.
+    """
+    print("\n" + "="*60)
+    print("RESULTADOS POR ENDPOINT (MÉDIA ± IC 95% ENTRE REPETIÇÕES)")
+    print("="*60)
+    
+    arquivos_por_cenario = {c: arquivos_cenario(c) for c in CENARIOS}
+    endpoints, _, _ = carregar_endpoints([a for arquivos in arquivos_por_cenario.values() for a in arquivos])
+    
+    amostras = {}
+    linhas = []
+    
+    for cenario, arquivos in arquivos_por_cenario.items():
+        por_endpoint = {}
+        for arquivo in arquivos:
+            if arquivo in invalidas:
+                continue
+            for chave, linha in (endpoints.get(arquivo) or {}).items():
+                destino = por_endpoint.setdefault(chave, {m: [] for m in METRICAS_ENDPOINT})
+                for metrica, (coluna, _) in METRICAS_ENDPOINT.items():
+                    destino[metrica].append(linha[coluna])
+                destino.setdefault('taxa_falha', []).append(
+                    linha['Failure Count'] / linha['Request Count'] if linha['Request Count'] else 0.0)
+        if not por_endpoint:
+            continue
+        amostras[cenario] = por_endpoint
+        
+        print(f"\n{'─'*60}")
+        print(f"CENÁRIO {cenario.upper()}")
+        print(f"{'─'*60}")
+        print(f"{'Método':<7} {'Endpoint':<24} {'N':>3} {'Tempo Médio (ms)':>18} {'p95 (ms)':>16} {'Req/s':>14}")
+        
+        for (metodo, nome), valores in sorted(por_endpoint.items(), key=lambda x: (x[0][1], x[0][0])):
+            linha = {'Cenário': cenario.upper(), 'Método': metodo, 'Endpoint': nome,
+                     'Execuções': len(valores['req_por_segundo'])}
+            for metrica in METRICAS_ENDPOINT:
+                media, ic = intervalo_confianca(valores[metrica])
+                linha[metrica] = media
+                linha[f"{metrica}_ic95"] = ic
+            linha['% Falhas'] = sum(valores['taxa_falha']) / len(valores['taxa_falha']) * 100
+            linhas.append(linha)
+            
+            print(f"{metodo:<7} {nome:<24} {linha['Execuções']:>3} "
+                  f"{linha['tempo_medio_ms']:>9.2f} ± {linha['tempo_medio_ms_ic95']:>6.2f} "
+                  f"{linha['p95_ms']:>7.0f} ± {linha['p95_ms_ic95']:>6.0f} "
+                  f"{linha['req_por_segundo']:>6.2f} ± {linha['req_por_segundo_ic95']:>5.2f}")
+    
+    if linhas:
+        arquivo_saida = "results/resumo_endpoints.csv"
+        pd.DataFrame(linhas).to_csv(arquivo_saida, index=False)
+        print(f"\n✓ Resumo por endpoint salvo em: {arquivo_saida}")
+    
+    return amostras
+
+
+def processar_payload(invalidas=frozenset()):
+    """
+    Latência normalizada pelo tamanho da resposta (ms/KB) e throughput em
+    bytes/s, por cenário e endpoint, sem as execuções em `invalidas`.
+    Salva results/payload_resumo.csv (detalhes e regressão latência × KB
+    em analisar_payload.py).
+    """
+    print("\n" + "="*60)
+    print("PAYLOAD: LATÊNCIA POR KB E THROUGHPUT EM BYTES/S")
+    print("="*60)
+    
+    linhas, _ = analisar_payload.resumo_stats(excluir=invalidas)
+    if not linhas:
+        print("\n⚠ Nenhum stats.csv encontrado")
+        return []
+    
+    print(f"\n{'Cenário':<10} {'Endpoint':<24} {'KB médio':>9} {'ms/KB':>8} {'KB/s':>9}")
+    for l in linhas:
+        if l['Endpoint'] in (analisar_payload.ENDPOINT_LISTA, 'Aggregated'):
+            print(f"{l['Cenário']:<10} {l['Endpoint']:<24} {l['Bytes Médios'] / 1024:>9.1f} "
+                  f"{l['ms por KB']:>8.2f} {l['KB/s']:>9.1f}")
+    
+    arquivo_saida = "results/payload_resumo.csv"
+    pd.DataFrame(linhas).to_csv(arquivo_saida, index=False)
+    print(f"\n✓ Payload por endpoint salvo em: {arquivo_saida}")
+    
+    return linhas
+
+
+def salvar_baseline(amostras, arquivo=ARQUIVO_BASELINE):
+    """Guarda as amostras por endpoint desta campanha como referência."""
+    # v2: endpoints como lista de {metodo, nome, valores} (JSON não aceita tupla como chave)
+    serializadas = {
+        cenario: [{'metodo': metodo, 'nome': nome, 'valores': valores}
+                  for (metodo, nome), valores in por_endpoint.items()]
+        for cenario, por_endpoint in amostras.items()
+    }
+    temporario = arquivo + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'versao': 2, 'criado_em': datetime.now().isoformat(timespec='seconds'),
+                   'amostras': serializadas}, f, ensure_ascii=False)
+    os.replace(temporario, arquivo)
+    print(f"\n✓ Baseline salvo em: {arquivo}")
+
+
+def comparar_baseline(amostras, arquivo=ARQUIVO_BASELINE, alfa=0.05, tolerancia=0.05):
+    """
+    Compara cada endpoint/métrica com o baseline pelo teste de Mann-Whitney
+    (valores-p ajustados por Holm). É regressão quando a diferença é
+    significativa, piora a métrica e a mediana muda mais que `tolerancia`.
+    Salva results/comparacao_baseline.csv e retorna o número de regressões.
+    """
+    print("\n" + "="*60)
+    print("COMPARAÇÃO COM O BASELINE")
+    print("="*60)
+    
+    with open(arquivo, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"Baseline: {arquivo} (criado em {baseline.get('criado_em', '?')})")
+    
+    linhas = []
+    for cenario, por_endpoint in amostras.items():
+        do_cenario = baseline['amostras'].get(cenario, {})
+        if baseline.get('versao', 1) >= 2:
+            do_cenario = {(e['metodo'], e['nome']): e['valores'] for e in do_cenario}
+        for (metodo, nome), valores in por_endpoint.items():
+            # Baseline v1 (só o nome) vale para o endpoint de qualquer método
+            referencia = do_cenario.get((metodo, nome)) if baseline.get('versao', 1) >= 2 else do_cenario.get(nome)
+            if referencia is None:
+                continue
+            for metrica, (_, aumento_piora) in METRICAS_ENDPOINT.items():
+                novo, antigo = valores[metrica], referencia[metrica]
+                if len(novo) < 3 or len(antigo) < 3:
+                    continue
+                _, p = mann_whitney(novo, antigo)
+                mediana_nova, mediana_antiga = median(novo), median(antigo)
+                variacao = (mediana_nova - mediana_antiga) / mediana_antiga if mediana_antiga else 0.0
+                linhas.append({
+                    'Cenário': cenario.upper(), 'Método': metodo, 'Endpoint': nome, 'Métrica': metrica,
+                    'Mediana Baseline': mediana_antiga, 'Mediana Atual': mediana_nova,
+                    'Variação (%)': variacao * 100, 'p': p,
+                    'piora': variacao > tolerancia if aumento_piora else variacao < -tolerancia,
+                })
+    
+    if not linhas:
+        print("\n⚠ Nenhum endpoint em comum com o baseline")
+        return 0
+    
+    for linha, p_ajustado in zip(linhas, holm([l['p'] for l in linhas])):
+        linha['p ajustado (Holm)'] = p_ajustado
+        linha['Regressão'] = bool(linha.pop('piora') and p_ajustado < alfa)
+    
+    regressoes = [l for l in linhas if l['Regressão']]
+    for l in regressoes:
+        print(f"✗ {l['Cenário']:<9} {l['Método']:<7} {l['Endpoint']:<24} {l['Métrica']:<16} "
+              f"{l['Mediana Baseline']:>9.2f} → {l['Mediana Atual']:>9.2f} "
+              f"({l['Variação (%)']:+.1f}%, p={l['p ajustado (Holm)']:.4f})")
+    
+    arquivo_saida = "results/comparacao_baseline.csv"
+    pd.DataFrame(linhas).to_csv(arquivo_saida, index=False)
+    print(f"\n{len(linhas)} comparações, {len(regressoes)} regressões (α={alfa}, tolerância {tolerancia:.0%})")
+    print(f"✓ Comparação salva em: {arquivo_saida}")
+    
+    return len(regressoes)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Processa os CSVs do Locust e resume as 30 repetições.")
+    parser.add_argument('--salvar-baseline', nargs='?', const=ARQUIVO_BASELINE, metavar='ARQUIVO',
+                        help="guarda as amostras por endpoint desta campanha como baseline")
+    parser.add_argument('--comparar-baseline', nargs='?', const=ARQUIVO_BASELINE, metavar='ARQUIVO',
+                        help="compara com o baseline e sai com código 1 se houver regressão")
+    parser.add_argument('--alfa', type=float, default=0.05, help="nível de significância (após Holm)")
+    parser.add_argument('--tolerancia', type=float, default=0.05,
+                        help="variação relativa mínima da mediana para contar como regressão")
+    args = parser.parse_args()
+    
     # Verificar se o pandas está instalado
     try:
         import pandas as pd
@@ -178,4 +568,14 @@ if __name__ == "__main__":
         exit(1)
     
     # Processar resultados
-    processar_resultados_locust()
\ No newline at end of file
+    amostras_endpoints = processar_resultados_locust()
+    
+    if args.salvar_baseline:
+        salvar_baseline(amostras_endpoints, args.salvar_baseline)
+    
+    if args.comparar_baseline:
+        if not os.path.exists(args.comparar_baseline):
+            print(f"❌ ERRO: Baseline '{args.comparar_baseline}' não encontrado!")
+            sys.exit(2)
+        if comparar_baseline(amostras_endpoints, args.comparar_baseline, args.alfa, args.tolerancia):
+            sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Análise em regime permanente sobre o histórico colunar (historico_colunar.py).
+
+Para cada execução: localiza o instante em que User Count atinge o alvo do
+cenário, descarta o aquecimento configurado em cenarios.py e recalcula
+throughput, taxa de sucesso e latência apenas na janela restante. Todas as
+repetições de um cenário são processadas de uma vez, como uma matriz
+execuções × segundos.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from cenarios import CENARIOS
+
+
+def _matriz(series, tipo=np.float64):
+    """Empilha as séries (uma por execução) numa matriz preenchida com NaN."""
+    comprimento = max((len(s) for s in series), default=0)
+    matriz = np.full((len(series), comprimento), np.nan, dtype=tipo)
+    for i, s in enumerate(series):
+        matriz[i, :len(s)] = s
+    return matriz
+
+
+def analisar_cenario(historico, cenario, usuarios=None, aquecimento_s=None):
+    """
+    Retorna um DataFrame com uma linha por repetição e as métricas da janela
+    em regime permanente. Execuções que nunca atingem o alvo, ou terminam
+    durante o aquecimento, ficam com 'valida' = False e métricas NaN.
+    """
+    config = CENARIOS[cenario]
+    usuarios = config['usuarios'] if usuarios is None else usuarios
+    aquecimento_s = config['aquecimento_s'] if aquecimento_s is None else aquecimento_s
+
+    repeticoes = historico.repeticoes(cenario)
+    if not repeticoes:
+        return pd.DataFrame()
+
+    def carregar(coluna):
+        return _matriz([historico.series(cenario, coluna)[r] for r in repeticoes])
+
+    ts = carregar('Timestamp')
+    usuarios_ativos = carregar('User Count')
+    total_req = carregar('Total Request Count')
+    total_falhas = carregar('Total Failure Count')
+    media_acumulada = carregar('Total Average Response Time')
+
+    linhas = np.arange(len(repeticoes))
+    colunas = np.arange(ts.shape[1])
+
+    # Instante em que a carga alvo foi atingida
+    no_alvo = usuarios_ativos >= usuarios
+    valida = no_alvo.any(axis=1)
+    t_alvo = ts[linhas, no_alvo.argmax(axis=1)]
+
+    # Início da janela: primeiro segundo após o aquecimento
+    apos_aquecimento = ts >= (t_alvo + aquecimento_s)[:, None]
+    valida &= apos_aquecimento.any(axis=1)
+    ini = apos_aquecimento.argmax(axis=1)
+    fim = (~np.isnan(ts)).sum(axis=1) - 1
+    valida &= fim > ini
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        duracao = ts[linhas, fim] - ts[linhas, ini]
+        req = total_req[linhas, fim] - total_req[linhas, ini]
+        falhas = total_falhas[linhas, fim] - total_falhas[linhas, ini]
+
+        # Média exata da janela a partir da média acumulada do Locust
+        soma_fim = media_acumulada[linhas, fim] * total_req[linhas, fim]
+        soma_ini = media_acumulada[linhas, ini] * total_req[linhas, ini]
+        tempo_medio = (soma_fim - soma_ini) / req
+
+        janela = (colunas >= ini[:, None]) & (colunas <= fim[:, None])
+        percentis = {}
+        for coluna in ['50%', '95%', '99%']:
+            valores = np.where(janela, carregar(coluna), np.nan)
+            with warnings.catch_warnings():
+                # execuções inválidas não têm amostras na janela
+                warnings.simplefilter('ignore', RuntimeWarning)
+                percentis[coluna] = np.nanmean(valores, axis=1)
+
+        resultado = pd.DataFrame({
+            'cenario': cenario,
+            'repeticao': repeticoes,
+            'valida': valida,
+            'inicio_janela_s': ts[linhas, ini] - ts[:, 0],
+            'duracao_janela_s': duracao,
+            'tempo_medio_ms': tempo_medio,
+            'p50_ms': percentis['50%'],
+            'p95_ms': percentis['95%'],
+            'p99_ms': percentis['99%'],
+            'req_por_segundo': req / duracao,
+            'total_requisicoes': req,
+            'total_falhas': falhas,
+            'percentual_sucesso': (1 - falhas / req) * 100,
+        })
+
+    metricas = resultado.columns[3:]
+    resultado.loc[~resultado['valida'], metricas] = np.nan
+    return resultado
+
+
+def analisar_todos(historico, cenarios=None):
+    """Concatena analisar_cenario() para todos os cenários presentes no histórico."""
+    cenarios = cenarios or [c for c in CENARIOS if historico.repeticoes(c)]
+    tabelas = [analisar_cenario(historico, c) for c in cenarios]
+    return pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame()
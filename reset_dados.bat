@@ -8,7 +8,7 @@ echo   • customers-service (owners/pets)
 echo   • vets-service (veterinários)
 echo   • visits-service (visitas)
 echo.
-echo Tempo estimado: 2 minutos
+echo Tempo estimado: até o gateway responder (sem espera fixa)
 echo.
 pause
 
@@ -19,31 +19,23 @@ if not exist "spring-petclinic-microservices" (
     exit /b 1
 )
 
-cd spring-petclinic-microservices
-
-echo.
-echo [1/2] Reiniciando serviços de dados...
-echo ────────────────────────────────────────────────────────
-docker-compose restart customers-service vets-service visits-service
-echo ✓ Serviços reiniciados
 echo.
-
-echo [2/2] Aguardando serviços ficarem prontos (2 minutos)...
+echo Reiniciando serviços, aguardando prontidão e recriando o conjunto de dados...
 echo ────────────────────────────────────────────────────────
-timeout /t 60 /nobreak
-echo   [■■□□] 50%...
-timeout /t 60 /nobreak
-echo   [■■■■] 100% - Concluído!
+python reset_semear.py --resetar
+if errorlevel 1 (
+    echo ✗ Dados diferentes da referência ou sistema indisponível
+    pause
+    exit /b 1
+)
 echo.
 
-cd ..
-
 echo.
 echo ================================================================================
 echo DADOS RESETADOS COM SUCESSO!
 echo ================================================================================
 echo.
-echo Os serviços de dados foram reiniciados e voltaram ao estado padrão.
+echo Os serviços de dados foram reiniciados e o conjunto determinístico foi recriado.
 echo Outros serviços (gateway, discovery, etc.) continuam rodando.
 echo.
 echo Teste agora:
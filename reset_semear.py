@@ -0,0 +1,224 @@
+"""
+Reset e carga de dados do PetClinic para que toda repetição comece igual.
+
+O create_owner do locustfile cria owners a cada execução, então a lista de
+GET /owners cresce de uma repetição para a outra. Este script:
+
+1. reinicia os serviços com dados (opcional, --resetar; o HSQLDB em memória
+   volta ao estado inicial) e espera o gateway responder, em vez de dormir
+   um tempo fixo;
+2. cria um conjunto determinístico de owners e pets (mesma semente = mesmos
+   nomes, endereços e pets) com requisições concorrentes numa sessão com
+   pool de conexões;
+3. confere o número de owners e o tamanho em bytes da lista contra a
+   referência gravada na primeira preparação (results/referencia_dados.json).
+
+Uso:
+    python reset_semear.py --resetar                 # reset + carga + verificação
+    python reset_semear.py --owners 50 --pets-por-owner 2
+    python reset_semear.py --apenas-verificar
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SERVICOS_DADOS = ['customers-service', 'vets-service', 'visits-service']
+PASTA_COMPOSE = 'spring-petclinic-microservices'
+ARQUIVO_REFERENCIA = os.path.join('results', 'referencia_dados.json')
+ENDPOINTS_PRONTIDAO = ['/api/customer/owners', '/api/vet/vets']
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Heitor', 'Isabel', 'João',
+         'Karina', 'Lucas', 'Marina', 'Nicolas', 'Olívia', 'Paulo', 'Raquel', 'Samuel', 'Tânia', 'Vitor']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira',
+              'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Araújo']
+CIDADES = ['Picos', 'Teresina', 'Parnaíba', 'Floriano', 'Oeiras']
+PETS = ['Rex', 'Mimi', 'Thor', 'Luna', 'Bob', 'Mel', 'Nina', 'Toby', 'Belinha', 'Fred']
+
+
+def conjunto_deterministico(owners, pets_por_owner, semente=42):
+    """Lista de (owner, [pets]) sempre igual para a mesma semente."""
+    aleatorio = random.Random(semente)
+    dados = []
+    for i in range(1, owners + 1):
+        owner = {
+            "firstName": aleatorio.choice(NOMES),
+            "lastName": f"{aleatorio.choice(SOBRENOMES)}{i:04d}",
+            "address": f"Rua {aleatorio.randint(1, 999)}, Centro",
+            "city": aleatorio.choice(CIDADES),
+            "telephone": f"89{aleatorio.randint(10000000, 99999999)}",
+        }
+        pets = [
+            {"name": f"{aleatorio.choice(PETS)}{i}_{p}",
+             "birthDate": f"{aleatorio.randint(2012, 2023)}-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}",
+             "typeId": aleatorio.randint(1, 6)}
+            for p in range(pets_por_owner)
+        ]
+        dados.append((owner, pets))
+    return dados
+
+
+def criar_sessao(conexoes):
+    """Session com pool do tamanho do número de threads (sem reabrir conexões)."""
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=conexoes, max_retries=2)
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    return sessao
+
+
+def reiniciar_servicos(pasta=PASTA_COMPOSE, servicos=SERVICOS_DADOS):
+    """docker compose restart dos serviços com dados (docker-compose legado como alternativa)."""
+    for base in (['docker', 'compose'], ['docker-compose']):
+        try:
+            resultado = subprocess.run(base + ['restart'] + servicos, cwd=pasta)
+        except FileNotFoundError:
+            continue
+        if resultado.returncode == 0:
+            return True
+    return False
+
+
+def aguardar_pronto(host, timeout=300, intervalo=2, consecutivas=3):
+    """Espera todos os ENDPOINTS_PRONTIDAO responderem 200 em `consecutivas` verificações seguidas."""
+    inicio = time.monotonic()
+    seguidas = 0
+    while time.monotonic() - inicio < timeout:
+        try:
+            prontos = all(requests.get(host + e, timeout=5).status_code == 200 for e in ENDPOINTS_PRONTIDAO)
+        except requests.RequestException:
+            prontos = False
+        seguidas = seguidas + 1 if prontos else 0
+        if seguidas >= consecutivas:
+            return time.monotonic() - inicio
+        time.sleep(intervalo)
+    return None
+
+
+def existentes(sessao, host):
+    """Chaves (firstName, lastName) dos owners já cadastrados."""
+    resposta = sessao.get(f"{host}/api/customer/owners", timeout=30)
+    resposta.raise_for_status()
+    return {(o.get('firstName'), o.get('lastName')) for o in resposta.json()}
+
+
+def semear(host, dados, threads=16):
+    """
+    Cria em paralelo os owners que ainda não existem e depois seus pets.
+    O conjunto de owners e pets é sempre o mesmo; só a atribuição dos IDs
+    pode variar com a ordem de chegada, o que não muda contagem nem bytes.
+    Retorna (owners criados, pets criados).
+    """
+    sessao = criar_sessao(threads)
+    ja_existem = existentes(sessao, host)
+    pendentes = [(o, p) for o, p in dados if (o['firstName'], o['lastName']) not in ja_existem]
+
+    def criar_owner(owner):
+        resposta = sessao.post(f"{host}/api/customer/owners", json=owner, timeout=30)
+        resposta.raise_for_status()
+        return resposta.json()['id']
+
+    def criar_pet(tarefa):
+        owner_id, pet = tarefa
+        resposta = sessao.post(f"{host}/api/customer/owners/{owner_id}/pets", json=pet, timeout=30)
+        resposta.raise_for_status()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        ids = list(pool.map(criar_owner, [owner for owner, _ in pendentes]))
+        tarefas = [(owner_id, pet) for owner_id, (_, pets) in zip(ids, pendentes) for pet in pets]
+        list(pool.map(criar_pet, tarefas))
+    return len(ids), len(tarefas)
+
+
+def estado_dados(host):
+    """Número de owners e tamanho em bytes do corpo de GET /api/customer/owners."""
+    resposta = requests.get(f"{host}/api/customer/owners", timeout=30)
+    resposta.raise_for_status()
+    return {'owners': len(resposta.json()), 'bytes_lista': len(resposta.content)}
+
+
+def verificar(estado, arquivo=ARQUIVO_REFERENCIA, tolerancia_bytes=0):
+    """
+    Compara o estado com a referência. Sem referência, grava a atual.
+    Retorna (ok, referência).
+    """
+    if not os.path.exists(arquivo):
+        os.makedirs(os.path.dirname(arquivo) or '.', exist_ok=True)
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, indent=2)
+        # Tudo o que vier depois é comparado com este estado: se o banco não
+        # estava limpo, apague o arquivo e prepare de novo
+        print(f"⚠ Nova referência criada em {arquivo}: {estado['owners']} owners, "
+              f"{estado['bytes_lista']} bytes (confira se o banco estava no estado inicial)")
+        return True, estado
+    with open(arquivo, encoding='utf-8') as f:
+        referencia = json.load(f)
+    ok = (estado['owners'] == referencia['owners']
+          and abs(estado['bytes_lista'] - referencia['bytes_lista']) <= tolerancia_bytes)
+    return ok, referencia
+
+
+def preparar(host, owners=50, pets_por_owner=2, semente=42, threads=16, resetar=False,
+             pasta_compose=PASTA_COMPOSE, referencia=ARQUIVO_REFERENCIA, tolerancia_bytes=0):
+    """Reset (opcional), carga e verificação. Retorna (ok, estado)."""
+    if resetar:
+        print(f"▶ Reiniciando {', '.join(SERVICOS_DADOS)}...")
+        if not reiniciar_servicos(pasta_compose):
+            print("✗ Falha ao reiniciar os serviços (docker compose)")
+            return False, None
+    espera = aguardar_pronto(host)
+    if espera is None:
+        print(f"✗ {host} não ficou pronto")
+        return False, None
+    print(f"✓ Sistema pronto em {espera:.0f} s")
+
+    inicio = time.monotonic()
+    criados, pets = semear(host, conjunto_deterministico(owners, pets_por_owner, semente), threads)
+    print(f"✓ {criados} owners e {pets} pets criados em {time.monotonic() - inicio:.1f} s")
+
+    estado = estado_dados(host)
+    ok, ref = verificar(estado, referencia, tolerancia_bytes)
+    simbolo = "✓" if ok else "✗"
+    print(f"{simbolo} {estado['owners']} owners, lista com {estado['bytes_lista']} bytes "
+          f"(referência: {ref['owners']} owners, {ref['bytes_lista']} bytes)")
+    return ok, estado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reset, carga determinística e verificação dos dados do PetClinic.")
+    parser.add_argument('--host', default='http://localhost:8080')
+    parser.add_argument('--resetar', action='store_true', help="reinicia os serviços com dados antes da carga")
+    parser.add_argument('--pasta-compose', default=PASTA_COMPOSE)
+    parser.add_argument('--owners', type=int, default=50)
+    parser.add_argument('--pets-por-owner', type=int, default=2)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--referencia', default=ARQUIVO_REFERENCIA)
+    parser.add_argument('--tolerancia-bytes', type=int, default=0)
+    parser.add_argument('--apenas-verificar', action='store_true')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("RESET E CARGA DE DADOS - PETCLINIC")
+    print("=" * 60)
+
+    if args.apenas_verificar:
+        estado = estado_dados(args.host)
+        ok, ref = verificar(estado, args.referencia, args.tolerancia_bytes)
+        print(f"{'✓' if ok else '✗'} {estado['owners']} owners, {estado['bytes_lista']} bytes "
+              f"(referência: {ref['owners']} owners, {ref['bytes_lista']} bytes)")
+    else:
+        ok, _ = preparar(args.host, args.owners, args.pets_por_owner, args.semente, args.threads,
+                         args.resetar, args.pasta_compose, args.referencia, args.tolerancia_bytes)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
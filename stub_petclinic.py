@@ -0,0 +1,152 @@
+"""
+Stub local da API do Spring PetClinic para medir o gerador de carga offline.
+
+Responde aos mesmos endpoints usados pelo locustfile, com uma lista de owners
+de tamanho configurável (serializada uma vez e reaproveitada até o próximo
+POST), sem nenhuma latência artificial.
+
+Uso:
+    python stub_petclinic.py --porta 8089 --owners 500
+"""
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VETS = [
+    {"id": i, "firstName": f"Vet{i}", "lastName": "Stub", "specialties": [{"id": 1, "name": "radiology"}]}
+    for i in range(1, 7)
+]
+
+
+class DadosStub:
+    """Owners em memória e o corpo JSON da lista já serializado."""
+
+    def __init__(self, owners, pets_por_owner):
+        self.trava = threading.Lock()
+        self.owners = {}
+        for i in range(1, owners + 1):
+            self.owners[i] = {
+                "id": i,
+                "firstName": f"Owner{i}",
+                "lastName": f"Stub{i}",
+                "address": f"Rua Stub, {i}",
+                "city": "Picos",
+                "telephone": f"8999{i:06d}"[:10],
+                "pets": [
+                    {"id": i * 10 + p, "name": f"Pet{i}_{p}", "birthDate": "2020-01-01",
+                     "type": {"id": 1, "name": "cat"}, "visits": []}
+                    for p in range(pets_por_owner)
+                ],
+            }
+        self.proximo_id = owners + 1
+        self._lista = None
+
+    def lista(self):
+        with self.trava:
+            if self._lista is None:
+                self._lista = json.dumps(list(self.owners.values())).encode()
+            return self._lista
+
+    def criar_pet(self, owner_id, pet):
+        with self.trava:
+            owner = self.owners.get(owner_id)
+            if owner is None:
+                return None
+            pet = {"id": owner_id * 10 + len(owner["pets"]), "name": pet.get("name"),
+                   "birthDate": pet.get("birthDate"), "type": {"id": pet.get("typeId", 1)}, "visits": []}
+            owner["pets"].append(pet)
+            self._lista = None
+            return pet
+
+    def criar(self, owner):
+        with self.trava:
+            owner = dict(owner, id=self.proximo_id, pets=[])
+            self.owners[self.proximo_id] = owner
+            self.proximo_id += 1
+            self._lista = None
+            return owner
+
+
+def criar_servidor(porta, owners=500, pets_por_owner=1, host="127.0.0.1"):
+    dados = DadosStub(owners, pets_por_owner)
+    corpo_vets = json.dumps(VETS).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Cabeçalho e corpo saem em writes separados: sem TCP_NODELAY, o Nagle
+        # com o ACK atrasado do cliente soma ~40 ms a cada requisição sequencial
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, corpo):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            if self.path == "/api/customer/owners":
+                self._responder(200, dados.lista())
+            elif self.path.startswith("/api/customer/owners/"):
+                try:
+                    owner = dados.owners.get(int(self.path.rsplit("/", 1)[1]))
+                except ValueError:
+                    owner = None
+                if owner is None:
+                    self._responder(404, b'{"error": "not found"}')
+                else:
+                    self._responder(200, json.dumps(owner).encode())
+            elif self.path == "/api/vet/vets":
+                self._responder(200, corpo_vets)
+            else:
+                self._responder(404, b'{"error": "not found"}')
+
+        def do_POST(self):
+            tamanho = int(self.headers.get("Content-Length", 0))
+            corpo = self.rfile.read(tamanho)
+            try:
+                dados_post = json.loads(corpo)
+            except ValueError:
+                self._responder(400, b'{"error": "invalid json"}')
+                return
+            if self.path == "/api/customer/owners":
+                self._responder(201, json.dumps(dados.criar(dados_post)).encode())
+                return
+            partes = self.path.strip("/").split("/")
+            if len(partes) == 5 and partes[:3] == ["api", "customer", "owners"] and partes[4] == "pets":
+                pet = dados.criar_pet(int(partes[3]) if partes[3].isdigit() else -1, dados_post)
+                if pet is not None:
+                    self._responder(201, json.dumps(pet).encode())
+                    return
+            self._responder(404, b'{"error": "not found"}')
+
+    class Servidor(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            # Cliente que desconecta no meio da resposta (BrokenPipe, reset) não é erro do stub
+            if not isinstance(sys.exc_info()[1], ConnectionError):
+                super().handle_error(request, client_address)
+
+    servidor = Servidor((host, porta), Handler)
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub local da API do PetClinic.")
+    parser.add_argument("--porta", type=int, default=8089)
+    parser.add_argument("--owners", type=int, default=500, help="tamanho da lista de owners")
+    parser.add_argument("--pets-por-owner", type=int, default=1)
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.porta, args.owners, args.pets_por_owner)
+    print(f"✓ Stub do PetClinic em http://127.0.0.1:{args.porta} ({args.owners} owners)", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,239 @@
+"""
+Gravação e leitura de traces de carga (record-and-replay).
+
+O mix do PetClinicUser é sorteado (pesos das tarefas, owner sorteado do
+pool, random.randint do POST), então duas repetições nunca enviam a mesma
+sequência. Com TRACE_GRAVAR=<arquivo>, o locustfile grava o fluxo de cada
+usuário: instante, endpoint, parâmetro (ID do owner ou semente do corpo do
+POST) e tempo de espera sorteado depois da requisição. O locustfile_replay.py
+reproduz o arquivo, opcionalmente acelerado.
+
+Formato binário (little-endian):
+
+    cabeçalho   16 bytes   magia "PCT1", versão, reservado, usuários, registros
+    índice       8 bytes   por usuário: primeiro registro, quantidade
+    registros   16 bytes   usuário, início (ms desde o início da gravação),
+                           parâmetro, espera (ms), endpoint, reservado
+
+Os registros de cada usuário ficam contíguos e em ordem de início, então a
+leitura (com mmap) percorre só o trecho do usuário, sem carregar o arquivo.
+Durante a gravação os registros vão para {arquivo}.bruto na ordem em que
+acontecem; no fim do teste são ordenados e gravados no formato final. Com
+workers, cada processo grava {arquivo}.{pid}; junte as partes com:
+
+    python trace_carga.py juntar results/leve.trc results/leve.trc.*
+    python trace_carga.py info results/leve.trc
+"""
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+MAGIA = b"PCT1"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sHHII")
+INDICE = struct.Struct("<II")
+REGISTRO = struct.Struct("<IIIHBx")
+DTYPE_REGISTRO = np.dtype([("usuario", "<u4"), ("inicio_ms", "<u4"), ("parametro", "<u4"),
+                           ("espera_ms", "<u2"), ("endpoint", "u1"), ("reservado", "u1")])
+
+# Código gravado no campo endpoint -> tarefa do PetClinicUser
+ENDPOINTS = ["get_owners_list", "get_owner_by_id", "get_vets", "create_owner"]
+LISTA, OWNER, VETS, CRIAR = range(len(ENDPOINTS))
+
+TRACE_GRAVAR = os.getenv("TRACE_GRAVAR")
+
+_gravador = None
+
+
+# ====================================================================
+# Gravação (usada pelo locustfile)
+# ====================================================================
+class GravadorTrace:
+    """Acrescenta registros ao arquivo bruto; o registro de cada requisição é
+    completado com a espera sorteada logo depois dela."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.arquivo = open(caminho + ".bruto", "wb", buffering=1 << 16)
+        self.inicio = time.monotonic()
+        self.ids = itertools.count()
+        self.registros = 0
+
+    def registrar(self, usuario, endpoint, parametro):
+        # Tarefa seguida de outra sem espera (ex.: chamada direta): espera 0
+        self.concluir(usuario, 0.0)
+        ident = usuario.__dict__.get("_trace_id")
+        if ident is None:
+            ident = usuario._trace_id = next(self.ids)
+        usuario._trace_pendente = (ident, int((time.monotonic() - self.inicio) * 1000), parametro, endpoint)
+
+    def concluir(self, usuario, espera_s):
+        pendente = usuario.__dict__.pop("_trace_pendente", None)
+        if pendente is not None:
+            ident, inicio_ms, parametro, endpoint = pendente
+            self.arquivo.write(REGISTRO.pack(ident, inicio_ms, parametro, min(int(espera_s * 1000), 0xFFFF), endpoint))
+            self.registros += 1
+
+    def fechar(self):
+        self.arquivo.close()
+        finalizar([self.caminho + ".bruto"], self.caminho)
+        os.remove(self.caminho + ".bruto")
+
+
+def gravar(usuario, endpoint, parametro=0):
+    """Chamada pelas tarefas do locustfile; não faz nada sem TRACE_GRAVAR."""
+    if _gravador is not None:
+        _gravador.registrar(usuario, endpoint, parametro)
+
+
+def registrar_gravacao(events, classe_usuario, logger):
+    """Com TRACE_GRAVAR, envolve o wait_time da classe e grava o trace nos processos com usuários."""
+    if not TRACE_GRAVAR:
+        return
+    from locust.runners import MasterRunner, WorkerRunner
+
+    espera_original = classe_usuario.wait_time
+
+    def wait_time(usuario):
+        espera = espera_original(usuario)
+        if _gravador is not None:
+            _gravador.concluir(usuario, espera)
+        return espera
+
+    classe_usuario.wait_time = wait_time
+
+    @events.init.add_listener
+    def _iniciar_gravacao(environment, **kwargs):
+        global _gravador
+        if isinstance(environment.runner, MasterRunner):
+            return
+        caminho = TRACE_GRAVAR
+        if isinstance(environment.runner, WorkerRunner):
+            caminho = f"{caminho}.{os.getpid()}"
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        _gravador = GravadorTrace(caminho)
+
+    @events.quitting.add_listener
+    def _finalizar_gravacao(environment, **kwargs):
+        global _gravador
+        if _gravador is not None:
+            gravador, _gravador = _gravador, None
+            gravador.fechar()
+            logger.info(f"Trace com {gravador.registros} requisições salvo em {gravador.caminho}")
+
+
+# ====================================================================
+# Formato final
+# ====================================================================
+def _escrever(registros, destino):
+    """Renumera os usuários, agrupa os registros por usuário e grava de forma atômica."""
+    ordem = np.lexsort((registros["inicio_ms"], registros["usuario"]))
+    registros = registros[ordem]
+    _, registros["usuario"] = np.unique(registros["usuario"], return_inverse=True)
+    quantidades = np.bincount(registros["usuario"]).astype("<u4")
+    primeiros = (np.cumsum(quantidades) - quantidades).astype("<u4")
+
+    temporario = destino + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(CABECALHO.pack(MAGIA, VERSAO, 0, len(quantidades), len(registros)))
+        f.write(np.column_stack((primeiros, quantidades)).astype("<u4").tobytes())
+        f.write(registros.tobytes())
+    os.replace(temporario, destino)
+
+
+def finalizar(brutos, destino):
+    """Arquivos brutos da gravação -> trace final."""
+    _escrever(np.concatenate([np.fromfile(b, dtype=DTYPE_REGISTRO) for b in brutos]), destino)
+
+
+def juntar(partes, destino):
+    """Junta traces finais (ex.: um por worker), com usuários distintos em cada parte."""
+    todos, deslocamento = [], 0
+    for parte in partes:
+        trace = Trace(parte)
+        registros = trace.todos().copy()
+        registros["usuario"] += deslocamento
+        deslocamento += len(trace)
+        todos.append(registros)
+        trace.fechar()
+    _escrever(np.concatenate(todos), destino)
+
+
+class Trace:
+    """Leitura preguiçosa de um trace final via mmap."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        with open(caminho, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, versao, _, self.usuarios, self.total = CABECALHO.unpack_from(self.mm, 0)
+        if magia != MAGIA or versao != VERSAO:
+            raise ValueError(f"{caminho} não é um trace de carga (versão {VERSAO})")
+        self.inicio_registros = CABECALHO.size + self.usuarios * INDICE.size
+
+    def __len__(self):
+        return self.usuarios
+
+    def registros(self, usuario):
+        """(início_ms, endpoint, parâmetro, espera_ms) do usuário, lidos um a um do mmap."""
+        primeiro, quantidade = INDICE.unpack_from(self.mm, CABECALHO.size + usuario * INDICE.size)
+        posicao = self.inicio_registros + primeiro * REGISTRO.size
+        for _ in range(quantidade):
+            _, inicio_ms, parametro, espera_ms, endpoint = REGISTRO.unpack_from(self.mm, posicao)
+            posicao += REGISTRO.size
+            yield inicio_ms, endpoint, parametro, espera_ms
+
+    def todos(self):
+        """Todos os registros como array estruturado (visão do mmap, sem cópia)."""
+        return np.frombuffer(self.mm, dtype=DTYPE_REGISTRO, count=self.total, offset=self.inicio_registros)
+
+    def duracao_ms(self):
+        return int(self.todos()["inicio_ms"].max()) if self.total else 0
+
+    def fechar(self):
+        self.mm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Utilitários dos traces de carga gravados com TRACE_GRAVAR.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    info = comandos.add_parser("info", help="resumo de um trace")
+    info.add_argument("arquivo")
+    unir = comandos.add_parser("juntar", help="junta os traces de cada worker num só")
+    unir.add_argument("destino")
+    unir.add_argument("partes", nargs="+")
+    args = parser.parse_args()
+
+    if args.comando == "juntar":
+        partes = [p for p in args.partes if p != args.destino and not p.endswith((".bruto", ".tmp"))]
+        juntar(partes, args.destino)
+        print(f"✓ {len(partes)} partes juntadas em {args.destino}")
+        args.arquivo = args.destino
+
+    trace = Trace(args.arquivo)
+    registros = trace.todos()
+    duracao_s = trace.duracao_ms() / 1000
+    print("=" * 60)
+    print(f"TRACE {args.arquivo}")
+    print("=" * 60)
+    print(f"Usuários: {len(trace)}   Requisições: {trace.total}   "
+          f"Duração: {duracao_s:.0f} s   Tamanho: {os.path.getsize(args.arquivo) / 1024:.0f} KB")
+    if trace.total:
+        print(f"Taxa média: {trace.total / max(duracao_s, 1e-3):.1f} req/s   "
+              f"Espera média: {registros['espera_ms'].mean():.0f} ms")
+        contagem = np.bincount(registros["endpoint"], minlength=len(ENDPOINTS))
+        for codigo, nome in enumerate(ENDPOINTS):
+            print(f"  {nome:<18} {contagem[codigo]:>8} ({contagem[codigo] / trace.total:.1%})")
+    del registros  # a visão do mmap precisa sair antes de fechá-lo
+    trace.fechar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())